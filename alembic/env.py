@@ -9,18 +9,23 @@ from sqlalchemy import pool
 
 from alembic import context
 
-from app.database import Base, SQLALCHEMY_DATABASE_URL
+from app.database import Base, SYNC_DATABASE_URL
+import app.models.models  # noqa: F401  (registers tables on Base.metadata)
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
 
-database_url = os.getenv("SQLALCHEMY_DATABASE_URL", SQLALCHEMY_DATABASE_URL)
+# EN: Always migrate through the blocking driver, even when the app runs on aiosqlite
+# BR: Sempre migrar pelo driver bloqueante, mesmo quando a app usa aiosqlite
+database_url = SYNC_DATABASE_URL.render_as_string(hide_password=False)
 config.set_main_option("sqlalchemy.url", database_url)
 
 # Interpret the config file for Python logging.
 # This line sets up loggers basically.
-if config.config_file_name is not None:
+# EN: Not when the app runs the upgrade itself (app/startup.py): it owns logging
+# BR: Não quando a app roda o upgrade (app/startup.py): ela controla o logging
+if config.config_file_name is not None and "connection" not in config.attributes:
     fileConfig(config.config_file_name)
 
 # add your model's MetaData object here
@@ -29,6 +34,20 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+# EN: Tables autogenerate must never touch: the FTS5 index and its shadow tables
+# (Observations_fts, _data, _idx, _docsize, _config) are created by 0004_observation_fts
+# with raw DDL and are not on Base.metadata
+# BR: Tabelas que o autogenerate nunca deve tocar: o índice FTS5 e suas tabelas sombra,
+# criados por 0004_observation_fts com DDL bruto e fora do Base.metadata
+EXCLUDED_TABLE_PREFIXES = ("Observations_fts",)
+
+
+def include_name(name, type_, parent_names):
+    if type_ == "table":
+        return not name.startswith(EXCLUDED_TABLE_PREFIXES)
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -51,6 +70,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_name=include_name,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -66,6 +86,15 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
+    # EN: Connection handed over by app/startup.py, already inside BEGIN IMMEDIATE
+    # BR: Conexão entregue por app/startup.py, já dentro de BEGIN IMMEDIATE
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        context.configure(connection=connection, target_metadata=target_metadata, include_name=include_name)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
@@ -74,7 +103,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_name=include_name
         )
 
         with context.begin_transaction():
@@ -0,0 +1,92 @@
+"""baseline schema
+
+Revision ID: 0001_baseline
+Revises:
+Create Date: 2026-10-18 09:00:00
+
+EN: Schema as previously created by Base.metadata.create_all. Existing
+databases created that way should be stamped, not upgraded:
+``alembic stamp 0001_baseline`` (app startup does this when the tables match).
+BR: Esquema como criado antes por Base.metadata.create_all. Bancos existentes
+criados assim devem ser marcados, não atualizados: ``alembic stamp 0001_baseline``
+(a partida da app faz isso quando as tabelas batem).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_baseline"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "Departments",
+        sa.Column("Department_ID", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("Department_Name", sa.String(128), nullable=False, unique=True),
+    )
+    op.create_table(
+        "Users",
+        sa.Column("User_ID", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("User_Forename", sa.String(64), nullable=False),
+        sa.Column("User_Surname", sa.String(64), nullable=False),
+        sa.Column("User_Email", sa.String(256), nullable=False, unique=True),
+    )
+    op.create_index("ix_Users_User_ID", "Users", ["User_ID"])
+    op.create_table(
+        "FocusAreas",
+        sa.Column("FocusArea_ID", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("FocusArea_Name", sa.String(64), nullable=False),
+    )
+    op.create_index("ix_FocusAreas_FocusArea_ID", "FocusAreas", ["FocusArea_ID"])
+    op.create_index("ix_FocusAreas_FocusArea_Name", "FocusAreas", ["FocusArea_Name"], unique=True)
+    op.create_table(
+        "Observations",
+        sa.Column("Observation_ID", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("Observation_Date", sa.DateTime(), server_default=sa.func.now(), nullable=False),
+        sa.Column("Observation_Department", sa.Integer(), sa.ForeignKey("Departments.Department_ID"), nullable=False),
+        sa.Column("Observation_Teacher", sa.Integer(), sa.ForeignKey("Users.User_ID"), nullable=False),
+        sa.Column("Observation_Class", sa.String(16), nullable=False),
+        sa.Column("Observation_Focus", sa.Integer(), sa.ForeignKey("FocusAreas.FocusArea_ID"), nullable=False),
+        sa.Column("Observation_Strengths", sa.String(1000)),
+        sa.Column("Observation_Weaknesses", sa.String(1000)),
+        sa.Column("Observation_Comments", sa.String(1000)),
+    )
+    op.create_index("ix_Observations_Observation_ID", "Observations", ["Observation_ID"])
+    op.create_index("ix_Observations_Observation_Department", "Observations", ["Observation_Department"])
+    op.create_index("ix_Observations_Observation_Teacher", "Observations", ["Observation_Teacher"])
+    op.create_index("ix_Observations_Observation_Focus", "Observations", ["Observation_Focus"])
+    op.create_table(
+        "FlagTypes",
+        sa.Column("FlagType_ID", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("FlagType_Name", sa.String(64), nullable=False, unique=True),
+    )
+    op.create_index("ix_FlagTypes_FlagType_ID", "FlagTypes", ["FlagType_ID"])
+    op.create_table(
+        "Flags",
+        sa.Column("Flag_ID", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("Observation", sa.Integer(), sa.ForeignKey("Observations.Observation_ID"), nullable=False),
+        sa.Column("FlagType", sa.Integer(), sa.ForeignKey("FlagTypes.FlagType_ID"), nullable=False),
+        sa.Column("FocusArea", sa.Integer(), sa.ForeignKey("FocusAreas.FocusArea_ID"), nullable=False),
+        sa.Column("Is_Open", sa.Boolean(), nullable=False),
+    )
+    op.create_index("ix_Flags_Flag_ID", "Flags", ["Flag_ID"])
+    op.create_index("ix_Flags_Observation", "Flags", ["Observation"])
+    op.create_index("ix_Flags_FlagType", "Flags", ["FlagType"])
+    op.create_index("ix_Flags_FocusArea", "Flags", ["FocusArea"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("Flags")
+    op.drop_table("FlagTypes")
+    op.drop_table("Observations")
+    op.drop_table("FocusAreas")
+    op.drop_table("Users")
+    op.drop_table("Departments")
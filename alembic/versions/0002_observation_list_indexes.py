@@ -0,0 +1,51 @@
+"""composite indexes for the observation list
+
+Revision ID: 0002_observation_list_indexes
+Revises: 0001_baseline
+Create Date: 2026-10-18 09:10:00
+
+EN: The list filters by teacher/department/focus and orders by
+(Observation_Date, Observation_ID). Each filter column gets a
+(column, Observation_Date) index; the rowid primary key is implicitly the last
+index column, so every filter combination walks an index in list order with no
+temp B-tree sort. They supersede the single-column FK indexes.
+BR: A listagem filtra por professor/departamento/foco e ordena por
+(Observation_Date, Observation_ID). Cada coluna de filtro ganha um índice
+(coluna, Observation_Date); a chave rowid é a última coluna implícita, então
+toda combinação de filtros percorre um índice na ordem da lista, sem ordenação
+em B-tree temporária. Substituem os índices de coluna única das FKs.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_observation_list_indexes"
+down_revision: Union[str, Sequence[str], None] = "0001_baseline"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index("ix_Observations_Date", "Observations", ["Observation_Date"])
+    op.create_index("ix_Observations_Teacher_Date", "Observations", ["Observation_Teacher", "Observation_Date"])
+    op.create_index("ix_Observations_Department_Date", "Observations", ["Observation_Department", "Observation_Date"])
+    op.create_index("ix_Observations_Focus_Date", "Observations", ["Observation_Focus", "Observation_Date"])
+    op.drop_index("ix_Observations_Observation_Teacher", table_name="Observations")
+    op.drop_index("ix_Observations_Observation_Department", table_name="Observations")
+    op.drop_index("ix_Observations_Observation_Focus", table_name="Observations")
+    # EN: Refresh planner statistics / BR: Atualizar estatísticas do planejador
+    op.execute("ANALYZE Observations")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index("ix_Observations_Observation_Focus", "Observations", ["Observation_Focus"])
+    op.create_index("ix_Observations_Observation_Department", "Observations", ["Observation_Department"])
+    op.create_index("ix_Observations_Observation_Teacher", "Observations", ["Observation_Teacher"])
+    op.drop_index("ix_Observations_Focus_Date", table_name="Observations")
+    op.drop_index("ix_Observations_Department_Date", table_name="Observations")
+    op.drop_index("ix_Observations_Teacher_Date", table_name="Observations")
+    op.drop_index("ix_Observations_Date", table_name="Observations")
@@ -0,0 +1,47 @@
+"""mail outbox
+
+Revision ID: 0003_mail_outbox
+Revises: 0002_observation_list_indexes
+Create Date: 2026-10-18 10:00:00
+
+EN: Durable outbox for mailer notifications (see app/mailer_client.py).
+BR: Outbox durável para notificações do mailer (ver app/mailer_client.py).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_mail_outbox"
+down_revision: Union[str, Sequence[str], None] = "0002_observation_list_indexes"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "MailOutbox",
+        sa.Column("Outbox_ID", sa.Integer(), primary_key=True, autoincrement=True),
+        sa.Column("Observation_ID", sa.Integer(), nullable=False),
+        sa.Column("Idempotency_Key", sa.String(128), unique=True),
+        sa.Column("Payload", sa.Text(), nullable=False),
+        sa.Column("Status", sa.String(16), nullable=False),
+        sa.Column("Attempts", sa.Integer(), nullable=False),
+        sa.Column("Next_Attempt_At", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("Locked_Until", sa.DateTime()),
+        sa.Column("Claim_Token", sa.String(32)),
+        sa.Column("Created_At", sa.DateTime(), nullable=False, server_default=sa.func.now()),
+        sa.Column("Sent_At", sa.DateTime()),
+        sa.Column("Last_Error", sa.String(500)),
+    )
+    op.create_index("ix_MailOutbox_Observation_ID", "MailOutbox", ["Observation_ID"])
+    op.create_index("ix_MailOutbox_Claim_Token", "MailOutbox", ["Claim_Token"])
+    op.create_index("ix_MailOutbox_Status_Next_Attempt", "MailOutbox", ["Status", "Next_Attempt_At"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("MailOutbox")
@@ -0,0 +1,62 @@
+"""full-text search over observation feedback
+
+Revision ID: 0004_observation_fts
+Revises: 0003_mail_outbox
+Create Date: 2026-10-18 11:00:00
+
+EN: FTS5 external-content index over strengths/weaknesses/comments, kept in
+sync by triggers, then filled from existing rows. The SQL is frozen here on
+purpose (app/search.py keeps the live copy for create_all databases).
+BR: Índice FTS5 de conteúdo externo sobre pontos fortes/fracos/comentários,
+sincronizado por gatilhos e preenchido com as linhas existentes. O SQL fica
+congelado aqui de propósito (app/search.py mantém a cópia viva para create_all).
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_observation_fts"
+down_revision: Union[str, Sequence[str], None] = "0003_mail_outbox"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+FTS_DDL = [
+    'CREATE VIRTUAL TABLE IF NOT EXISTS "Observations_fts" USING fts5('
+    '"Observation_Strengths", "Observation_Weaknesses", "Observation_Comments", '
+    "content='Observations', content_rowid='Observation_ID', tokenize='porter unicode61')",
+    'CREATE TRIGGER IF NOT EXISTS "Observations_fts_ai" AFTER INSERT ON "Observations" BEGIN '
+    'INSERT INTO "Observations_fts"(rowid, "Observation_Strengths", "Observation_Weaknesses", "Observation_Comments") '
+    'VALUES (new."Observation_ID", new."Observation_Strengths", new."Observation_Weaknesses", new."Observation_Comments"); END',
+    'CREATE TRIGGER IF NOT EXISTS "Observations_fts_ad" AFTER DELETE ON "Observations" BEGIN '
+    'INSERT INTO "Observations_fts"("Observations_fts", rowid, "Observation_Strengths", "Observation_Weaknesses", "Observation_Comments") '
+    "VALUES ('delete', old.\"Observation_ID\", old.\"Observation_Strengths\", old.\"Observation_Weaknesses\", old.\"Observation_Comments\"); END",
+    'CREATE TRIGGER IF NOT EXISTS "Observations_fts_au" '
+    'AFTER UPDATE OF "Observation_Strengths", "Observation_Weaknesses", "Observation_Comments" ON "Observations" BEGIN '
+    'INSERT INTO "Observations_fts"("Observations_fts", rowid, "Observation_Strengths", "Observation_Weaknesses", "Observation_Comments") '
+    "VALUES ('delete', old.\"Observation_ID\", old.\"Observation_Strengths\", old.\"Observation_Weaknesses\", old.\"Observation_Comments\"); "
+    'INSERT INTO "Observations_fts"(rowid, "Observation_Strengths", "Observation_Weaknesses", "Observation_Comments") '
+    'VALUES (new."Observation_ID", new."Observation_Strengths", new."Observation_Weaknesses", new."Observation_Comments"); END',
+]
+FTS_REBUILD = 'INSERT INTO "Observations_fts"("Observations_fts") VALUES (\'rebuild\')'
+FTS_DROP = [
+    'DROP TRIGGER IF EXISTS "Observations_fts_au"',
+    'DROP TRIGGER IF EXISTS "Observations_fts_ad"',
+    'DROP TRIGGER IF EXISTS "Observations_fts_ai"',
+    'DROP TABLE IF EXISTS "Observations_fts"',
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for stmt in FTS_DDL:
+        op.execute(stmt)
+    op.execute(FTS_REBUILD)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for stmt in FTS_DROP:
+        op.execute(stmt)
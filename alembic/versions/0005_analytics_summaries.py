@@ -0,0 +1,61 @@
+"""analytics summaries
+
+Revision ID: 0005_analytics_summaries
+Revises: 0004_observation_fts
+Create Date: 2026-10-18 12:00:00
+
+EN: Pre-aggregated weekly counts and teacher coverage (see app/analytics.py),
+filled from the existing observations. The fill SQL is a frozen copy of
+app/analytics.REBUILD_SQL as of this revision.
+BR: Contagens semanais e cobertura de professores pré-agregadas (ver
+app/analytics.py), preenchidas com as observações existentes. O SQL de
+preenchimento é uma cópia congelada de app/analytics.REBUILD_SQL.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_analytics_summaries"
+down_revision: Union[str, Sequence[str], None] = "0004_observation_fts"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+FILL_SQL = [
+    'INSERT INTO "ObservationWeeklyCounts" ("Department_ID", "FocusArea_ID", "Week_Start", "Observation_Count") '
+    'SELECT "Observation_Department", "Observation_Focus", date("Observation_Date", \'weekday 0\', \'-6 days\'), count(*) '
+    'FROM "Observations" GROUP BY 1, 2, 3',
+    'INSERT INTO "TeacherCoverage" ("Teacher_ID", "FocusArea_ID", "Observation_Count", "Last_Observed") '
+    'SELECT "Observation_Teacher", "Observation_Focus", count(*), max("Observation_Date") '
+    'FROM "Observations" GROUP BY 1, 2',
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "ObservationWeeklyCounts",
+        sa.Column("Department_ID", sa.Integer(), primary_key=True),
+        sa.Column("FocusArea_ID", sa.Integer(), primary_key=True),
+        sa.Column("Week_Start", sa.Date(), primary_key=True),
+        sa.Column("Observation_Count", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_ObservationWeeklyCounts_Week", "ObservationWeeklyCounts", ["Week_Start"])
+    op.create_table(
+        "TeacherCoverage",
+        sa.Column("Teacher_ID", sa.Integer(), primary_key=True),
+        sa.Column("FocusArea_ID", sa.Integer(), primary_key=True),
+        sa.Column("Observation_Count", sa.Integer(), nullable=False),
+        sa.Column("Last_Observed", sa.DateTime()),
+    )
+    for stmt in FILL_SQL:
+        op.execute(stmt)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("TeacherCoverage")
+    op.drop_table("ObservationWeeklyCounts")
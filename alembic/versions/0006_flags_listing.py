@@ -0,0 +1,48 @@
+"""flags listing: Flag_Date and open-flag partial indexes
+
+Revision ID: 0006_flags_listing
+Revises: 0005_analytics_summaries
+Create Date: 2026-10-18 13:00:00
+
+EN: SQLite cannot ADD COLUMN with a CURRENT_TIMESTAMP default, so Flags is
+rebuilt in batch mode; existing flags take their observation's date.
+BR: O SQLite não faz ADD COLUMN com padrão CURRENT_TIMESTAMP, então Flags é
+recriada em modo batch; indicadores existentes herdam a data da observação.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_flags_listing"
+down_revision: Union[str, Sequence[str], None] = "0005_analytics_summaries"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_OPEN = sa.text('"Is_Open" = 1')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table("Flags", recreate="always") as batch_op:
+        batch_op.add_column(sa.Column("Flag_Date", sa.DateTime(), nullable=False, server_default=sa.func.now()))
+    op.execute(
+        'UPDATE "Flags" SET "Flag_Date" = (SELECT "Observation_Date" FROM "Observations" '
+        'WHERE "Observation_ID" = "Flags"."Observation") '
+        'WHERE EXISTS (SELECT 1 FROM "Observations" WHERE "Observation_ID" = "Flags"."Observation")'
+    )
+    op.create_index("ix_Flags_Open", "Flags", ["Flag_ID"], sqlite_where=_OPEN)
+    op.create_index("ix_Flags_Open_Type", "Flags", ["FlagType", "Flag_ID"], sqlite_where=_OPEN)
+    op.create_index("ix_Flags_Open_Focus", "Flags", ["FocusArea", "Flag_ID"], sqlite_where=_OPEN)
+    op.execute("ANALYZE")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_Flags_Open_Focus", table_name="Flags")
+    op.drop_index("ix_Flags_Open_Type", table_name="Flags")
+    op.drop_index("ix_Flags_Open", table_name="Flags")
+    with op.batch_alter_table("Flags", recreate="always") as batch_op:
+        batch_op.drop_column("Flag_Date")
@@ -0,0 +1,77 @@
+"""cache versions: shared ref-data version bumped by triggers
+
+Revision ID: 0007_cache_versions
+Revises: 0006_flags_listing
+Create Date: 2026-10-18 15:00:00
+
+EN: One counter row per cached data set. Triggers on Users, Departments,
+FocusAreas and FlagTypes bump "ref_data" inside the writing transaction, so
+every worker process can tell its lookup cache is stale. The trigger DDL is a
+frozen copy of app/ref_cache.REF_VERSION_DDL as of this revision.
+BR: Uma linha de contador por conjunto em cache. Gatilhos em Users, Departments,
+FocusAreas e FlagTypes incrementam "ref_data" na própria transação de escrita,
+para cada processo worker saber que seu cache de consultas ficou velho. O DDL
+dos gatilhos é uma cópia congelada de app/ref_cache.REF_VERSION_DDL.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_cache_versions"
+down_revision: Union[str, Sequence[str], None] = "0006_flags_listing"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_BUMP = 'BEGIN UPDATE "CacheVersions" SET "Version" = "Version" + 1 WHERE "Name" = \'ref_data\'; END'
+VERSION_DDL = [
+    'INSERT OR IGNORE INTO "CacheVersions" ("Name", "Version") VALUES (\'ref_data\', 0)',
+    'CREATE TRIGGER IF NOT EXISTS "Users_ref_ai" AFTER INSERT ON "Users" ' + _BUMP,
+    'CREATE TRIGGER IF NOT EXISTS "Users_ref_au" AFTER UPDATE ON "Users" ' + _BUMP,
+    'CREATE TRIGGER IF NOT EXISTS "Users_ref_ad" AFTER DELETE ON "Users" ' + _BUMP,
+    'CREATE TRIGGER IF NOT EXISTS "Departments_ref_ai" AFTER INSERT ON "Departments" ' + _BUMP,
+    'CREATE TRIGGER IF NOT EXISTS "Departments_ref_au" AFTER UPDATE ON "Departments" ' + _BUMP,
+    'CREATE TRIGGER IF NOT EXISTS "Departments_ref_ad" AFTER DELETE ON "Departments" ' + _BUMP,
+    'CREATE TRIGGER IF NOT EXISTS "FocusAreas_ref_ai" AFTER INSERT ON "FocusAreas" ' + _BUMP,
+    'CREATE TRIGGER IF NOT EXISTS "FocusAreas_ref_au" AFTER UPDATE ON "FocusAreas" ' + _BUMP,
+    'CREATE TRIGGER IF NOT EXISTS "FocusAreas_ref_ad" AFTER DELETE ON "FocusAreas" ' + _BUMP,
+    'CREATE TRIGGER IF NOT EXISTS "FlagTypes_ref_ai" AFTER INSERT ON "FlagTypes" ' + _BUMP,
+    'CREATE TRIGGER IF NOT EXISTS "FlagTypes_ref_au" AFTER UPDATE ON "FlagTypes" ' + _BUMP,
+    'CREATE TRIGGER IF NOT EXISTS "FlagTypes_ref_ad" AFTER DELETE ON "FlagTypes" ' + _BUMP,
+]
+VERSION_DROP = [
+    'DROP TRIGGER IF EXISTS "Users_ref_ai"',
+    'DROP TRIGGER IF EXISTS "Users_ref_au"',
+    'DROP TRIGGER IF EXISTS "Users_ref_ad"',
+    'DROP TRIGGER IF EXISTS "Departments_ref_ai"',
+    'DROP TRIGGER IF EXISTS "Departments_ref_au"',
+    'DROP TRIGGER IF EXISTS "Departments_ref_ad"',
+    'DROP TRIGGER IF EXISTS "FocusAreas_ref_ai"',
+    'DROP TRIGGER IF EXISTS "FocusAreas_ref_au"',
+    'DROP TRIGGER IF EXISTS "FocusAreas_ref_ad"',
+    'DROP TRIGGER IF EXISTS "FlagTypes_ref_ai"',
+    'DROP TRIGGER IF EXISTS "FlagTypes_ref_au"',
+    'DROP TRIGGER IF EXISTS "FlagTypes_ref_ad"',
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "CacheVersions",
+        sa.Column("Name", sa.String(length=64), nullable=False),
+        sa.Column("Version", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("Name"),
+    )
+    for stmt in VERSION_DDL:
+        op.execute(stmt)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for stmt in VERSION_DROP:
+        op.execute(stmt)
+    op.drop_table("CacheVersions")
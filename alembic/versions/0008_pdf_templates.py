@@ -0,0 +1,40 @@
+"""pdf templates: named Jinja2 layouts for the PDF HTML
+
+Revision ID: 0008_pdf_templates
+Revises: 0007_cache_versions
+Create Date: 2026-10-18 16:00:00
+
+EN: Template records point at files in app/templates. The default row is
+seeded by app/seeds/seed_core.py (seed version 2), not here.
+BR: Registros de template apontam para arquivos em app/templates. A linha padrão
+é inserida por app/seeds/seed_core.py (versão de seed 2), não aqui.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_pdf_templates"
+down_revision: Union[str, Sequence[str], None] = "0007_cache_versions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "Templates",
+        sa.Column("Template_ID", sa.Integer(), nullable=False),
+        sa.Column("Template_Name", sa.String(length=64), nullable=False),
+        sa.Column("Template_File", sa.String(length=128), nullable=False),
+        sa.Column("Is_Default", sa.Boolean(), nullable=False),
+        sa.PrimaryKeyConstraint("Template_ID"),
+        sa.UniqueConstraint("Template_Name"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("Templates")
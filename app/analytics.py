@@ -0,0 +1,290 @@
+"""EN: Pre-aggregated observation counts for the leadership dashboards.
+
+ObservationWeeklyCounts (department x focus area x week) and TeacherCoverage
+(teacher x focus area) are kept in step with Observations by `apply()`, called
+in the same transaction as each create/edit/delete, so dashboard reads never
+scan the fact table. `rebuild()` recomputes both from scratch:
+
+    python -m app.analytics rebuild   # EN: recompute / BR: recalcular
+    python -m app.analytics check     # EN: exit 1 on drift / BR: sai com 1 se divergir
+
+BR: Contagens pré-agregadas de observações para os painéis da liderança,
+mantidas por `apply()` na mesma transação de cada criação/edição/exclusão.
+"""
+import sys
+import argparse
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import and_, delete, desc, event, func, select, text, update
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.orm import Session
+
+from .database import Base
+from .models.models import Department, FocusArea, Observation, ObservationWeeklyCount, TeacherCoverage, User
+
+
+class ObservationKey(NamedTuple):
+    """EN: The fields the summaries are keyed on / BR: Os campos que indexam os resumos"""
+    teacher_id: int
+    department_id: int
+    focus_area_id: int
+    observed_at: datetime
+
+
+def snapshot(ob: Observation) -> ObservationKey:
+    """EN: Capture before an edit/delete / BR: Capturar antes de editar/apagar"""
+    return ObservationKey(ob.Observation_Teacher, ob.Observation_Department, ob.Observation_Focus, ob.Observation_Date)
+
+
+def week_start(when: datetime) -> date:
+    """EN: Monday of the week (same rule as the SQL rebuild) / BR: Segunda-feira da semana (mesma regra do rebuild SQL)"""
+    day = when.date() if isinstance(when, datetime) else when
+    return day - timedelta(days=day.weekday())
+
+
+def _add(s: Session, key: ObservationKey) -> None:
+    weekly = insert(ObservationWeeklyCount).values(
+        Department_ID=key.department_id,
+        FocusArea_ID=key.focus_area_id,
+        Week_Start=week_start(key.observed_at),
+        Observation_Count=1,
+    )
+    s.execute(weekly.on_conflict_do_update(
+        index_elements=["Department_ID", "FocusArea_ID", "Week_Start"],
+        set_={"Observation_Count": ObservationWeeklyCount.Observation_Count + 1},
+    ))
+    coverage = insert(TeacherCoverage).values(
+        Teacher_ID=key.teacher_id,
+        FocusArea_ID=key.focus_area_id,
+        Observation_Count=1,
+        Last_Observed=key.observed_at,
+    )
+    s.execute(coverage.on_conflict_do_update(
+        index_elements=["Teacher_ID", "FocusArea_ID"],
+        set_={
+            "Observation_Count": TeacherCoverage.Observation_Count + 1,
+            "Last_Observed": func.max(func.coalesce(TeacherCoverage.Last_Observed, coverage.excluded.Last_Observed), coverage.excluded.Last_Observed),
+        },
+    ))
+
+
+def _remove(s: Session, key: ObservationKey) -> None:
+    weekly = and_(
+        ObservationWeeklyCount.Department_ID == key.department_id,
+        ObservationWeeklyCount.FocusArea_ID == key.focus_area_id,
+        ObservationWeeklyCount.Week_Start == week_start(key.observed_at),
+    )
+    s.execute(update(ObservationWeeklyCount).where(weekly).values(Observation_Count=ObservationWeeklyCount.Observation_Count - 1))
+    s.execute(delete(ObservationWeeklyCount).where(weekly, ObservationWeeklyCount.Observation_Count <= 0))
+
+    # EN: Last_Observed only moves back when the latest row went; ix_Observations_Teacher_Date finds the new one
+    # BR: Last_Observed só recua se a linha mais recente saiu; ix_Observations_Teacher_Date acha a nova
+    coverage = and_(TeacherCoverage.Teacher_ID == key.teacher_id, TeacherCoverage.FocusArea_ID == key.focus_area_id)
+    latest = (
+        select(Observation.Observation_Date)
+        .where(Observation.Observation_Teacher == key.teacher_id, Observation.Observation_Focus == key.focus_area_id)
+        .order_by(desc(Observation.Observation_Date))
+        .limit(1)
+        .scalar_subquery()
+    )
+    s.execute(update(TeacherCoverage).where(coverage).values(Observation_Count=TeacherCoverage.Observation_Count - 1))
+    s.execute(delete(TeacherCoverage).where(coverage, TeacherCoverage.Observation_Count <= 0))
+    s.execute(update(TeacherCoverage).where(coverage, TeacherCoverage.Last_Observed <= key.observed_at).values(Last_Observed=latest))
+
+
+def apply(s: Session, before: Optional[ObservationKey], after: Optional[ObservationKey]) -> None:
+    """EN: Move one observation between summary buckets inside the caller's
+    transaction (no commit): before=None for a create, after=None for a delete.
+    BR: Move uma observação entre os grupos do resumo dentro da transação do
+    chamador (sem commit): before=None ao criar, after=None ao apagar."""
+    if before == after:
+        return
+    # EN: The fact-table change must be visible to the Last_Observed lookup
+    # BR: A mudança na tabela de fatos precisa estar visível para o Last_Observed
+    s.flush()
+    if before is not None:
+        _remove(s, before)
+    if after is not None:
+        _add(s, after)
+
+
+def add_many(s: Session, keys: Iterable[ObservationKey]) -> None:
+    """EN: Count a batch of new observations (bulk import) with one upsert per
+    summary row instead of one per observation; no commit.
+    BR: Conta um lote de observações novas (importação em massa) com um upsert
+    por linha do resumo em vez de um por observação; sem commit."""
+    weekly: Counter = Counter()
+    coverage: Dict[Tuple[int, int], list] = {}
+    for key in keys:
+        weekly[(key.department_id, key.focus_area_id, week_start(key.observed_at))] += 1
+        entry = coverage.setdefault((key.teacher_id, key.focus_area_id), [0, key.observed_at])
+        entry[0] += 1
+        entry[1] = max(entry[1], key.observed_at)
+    if not weekly:
+        return
+
+    stmt = insert(ObservationWeeklyCount)
+    s.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["Department_ID", "FocusArea_ID", "Week_Start"],
+            set_={"Observation_Count": ObservationWeeklyCount.Observation_Count + stmt.excluded.Observation_Count},
+        ),
+        [
+            {"Department_ID": dept, "FocusArea_ID": focus, "Week_Start": week, "Observation_Count": count}
+            for (dept, focus, week), count in weekly.items()
+        ],
+    )
+    stmt = insert(TeacherCoverage)
+    s.execute(
+        stmt.on_conflict_do_update(
+            index_elements=["Teacher_ID", "FocusArea_ID"],
+            set_={
+                "Observation_Count": TeacherCoverage.Observation_Count + stmt.excluded.Observation_Count,
+                "Last_Observed": func.max(func.coalesce(TeacherCoverage.Last_Observed, stmt.excluded.Last_Observed), stmt.excluded.Last_Observed),
+            },
+        ),
+        [
+            {"Teacher_ID": teacher, "FocusArea_ID": focus, "Observation_Count": count, "Last_Observed": last}
+            for (teacher, focus), (count, last) in coverage.items()
+        ],
+    )
+
+
+# EN: Full recompute; same Monday rule as week_start() / BR: Recalcular tudo; mesma regra de segunda-feira de week_start()
+REBUILD_SQL = [
+    'DELETE FROM "ObservationWeeklyCounts"',
+    'INSERT INTO "ObservationWeeklyCounts" ("Department_ID", "FocusArea_ID", "Week_Start", "Observation_Count") '
+    'SELECT "Observation_Department", "Observation_Focus", date("Observation_Date", \'weekday 0\', \'-6 days\'), count(*) '
+    'FROM "Observations" GROUP BY 1, 2, 3',
+    'DELETE FROM "TeacherCoverage"',
+    'INSERT INTO "TeacherCoverage" ("Teacher_ID", "FocusArea_ID", "Observation_Count", "Last_Observed") '
+    'SELECT "Observation_Teacher", "Observation_Focus", count(*), max("Observation_Date") '
+    'FROM "Observations" GROUP BY 1, 2',
+]
+
+
+# EN: create_all adding the tables to an existing database fills them (migration 0005 covers Alembic)
+# BR: create_all ao criar as tabelas num banco existente as preenche (migração 0005 cobre o Alembic)
+@event.listens_for(Base.metadata, "after_create")
+def _fill_new_summaries(_target, connection, tables=(), **_kw):
+    if ObservationWeeklyCount.__table__ in tables or TeacherCoverage.__table__ in tables:
+        for stmt in REBUILD_SQL:
+            connection.exec_driver_sql(stmt)
+
+
+def rebuild(s: Session) -> None:
+    """EN: Recompute both summaries in one transaction / BR: Recalcular os dois resumos numa transação"""
+    for stmt in REBUILD_SQL:
+        s.execute(text(stmt))
+    s.commit()
+
+
+def _summary_rows(s: Session) -> tuple:
+    weekly = s.execute(
+        select(ObservationWeeklyCount.Department_ID, ObservationWeeklyCount.FocusArea_ID,
+               ObservationWeeklyCount.Week_Start, ObservationWeeklyCount.Observation_Count)
+        .order_by(ObservationWeeklyCount.Department_ID, ObservationWeeklyCount.FocusArea_ID, ObservationWeeklyCount.Week_Start)
+    ).all()
+    coverage = s.execute(
+        select(TeacherCoverage.Teacher_ID, TeacherCoverage.FocusArea_ID,
+               TeacherCoverage.Observation_Count, TeacherCoverage.Last_Observed)
+        .order_by(TeacherCoverage.Teacher_ID, TeacherCoverage.FocusArea_ID)
+    ).all()
+    return weekly, coverage
+
+
+def check(s: Session) -> bool:
+    """EN: True if the maintained summaries match a fresh rebuild (rolled back)
+    BR: True se os resumos mantidos batem com um rebuild novo (desfeito)"""
+    current = _summary_rows(s)
+    for stmt in REBUILD_SQL:
+        s.execute(text(stmt))
+    fresh = _summary_rows(s)
+    s.rollback()
+    return current == fresh
+
+
+def weekly_counts(
+    s: Session,
+    department_id: Optional[int] = None,
+    focus_area_id: Optional[int] = None,
+    from_week: Optional[date] = None,
+    to_week: Optional[date] = None,
+) -> List[dict]:
+    """EN: Dashboard series, read straight from the summary / BR: Série do painel, lida direto do resumo"""
+    q = (
+        select(
+            ObservationWeeklyCount.Week_Start,
+            ObservationWeeklyCount.Department_ID,
+            Department.Department_Name,
+            ObservationWeeklyCount.FocusArea_ID,
+            FocusArea.FocusArea_Name,
+            ObservationWeeklyCount.Observation_Count,
+        )
+        .outerjoin(Department, Department.Department_ID == ObservationWeeklyCount.Department_ID)
+        .outerjoin(FocusArea, FocusArea.FocusArea_ID == ObservationWeeklyCount.FocusArea_ID)
+    )
+    if department_id is not None:
+        q = q.where(ObservationWeeklyCount.Department_ID == department_id)
+    if focus_area_id is not None:
+        q = q.where(ObservationWeeklyCount.FocusArea_ID == focus_area_id)
+    if from_week is not None:
+        q = q.where(ObservationWeeklyCount.Week_Start >= week_start(from_week))
+    if to_week is not None:
+        q = q.where(ObservationWeeklyCount.Week_Start <= to_week)
+    q = q.order_by(ObservationWeeklyCount.Week_Start, ObservationWeeklyCount.Department_ID, ObservationWeeklyCount.FocusArea_ID)
+    return [dict(row._mapping) for row in s.execute(q)]
+
+
+def teacher_coverage(s: Session, focus_area_id: Optional[int] = None) -> List[dict]:
+    """EN: Every teacher, including never-observed ones (count 0), least observed first
+    BR: Todos os professores, inclusive nunca observados (contagem 0), menos observados primeiro"""
+    cov = select(
+        TeacherCoverage.Teacher_ID,
+        func.sum(TeacherCoverage.Observation_Count).label("Observation_Count"),
+        func.count(TeacherCoverage.FocusArea_ID).label("Focus_Areas_Covered"),
+        func.max(TeacherCoverage.Last_Observed).label("Last_Observed"),
+    )
+    if focus_area_id is not None:
+        cov = cov.where(TeacherCoverage.FocusArea_ID == focus_area_id)
+    cov = cov.group_by(TeacherCoverage.Teacher_ID).subquery()
+
+    observations = func.coalesce(cov.c.Observation_Count, 0)
+    q = (
+        select(
+            User.User_ID.label("Teacher_ID"),
+            User.User_Forename.label("Teacher_Forename"),
+            User.User_Surname.label("Teacher_Surname"),
+            observations.label("Observation_Count"),
+            func.coalesce(cov.c.Focus_Areas_Covered, 0).label("Focus_Areas_Covered"),
+            cov.c.Last_Observed,
+        )
+        .outerjoin(cov, cov.c.Teacher_ID == User.User_ID)
+        .order_by(observations, User.User_Surname, User.User_Forename)
+    )
+    return [dict(row._mapping) for row in s.execute(q)]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.analytics", description="Maintain the analytics summaries")
+    parser.add_argument("command", choices=("rebuild", "check"))
+    args = parser.parse_args(argv)
+
+    from .database import SessionLocal
+
+    with SessionLocal() as s:
+        if args.command == "rebuild":
+            rebuild(s)
+            print("analytics summaries rebuilt")
+            return 0
+        if check(s):
+            print("analytics summaries match the observations")
+            return 0
+        print("analytics summaries have drifted; run: python -m app.analytics rebuild")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
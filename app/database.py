@@ -1,24 +1,132 @@
 import os
-from sqlalchemy import create_engine
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, TypeVar, Union
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
+
+T = TypeVar("T")
 
 # EN: Database URL for SQLite
 # BR: URL do banco de dados para SQLite
 SQLALCHEMY_DATABASE_URL = os.getenv("SQLALCHEMY_DATABASE_URL", "sqlite:///./focused.db")
 
+# EN: An async driver in the URL (e.g. "sqlite+aiosqlite://") selects the async path
+# BR: Um driver assíncrono na URL (ex.: "sqlite+aiosqlite://") seleciona o caminho assíncrono
+_url = make_url(SQLALCHEMY_DATABASE_URL)
+ASYNC_DB = bool(getattr(_url.get_dialect(), "is_async", False))
+
+# EN: Sync URL for seeding, streaming and Alembic (same file, blocking driver)
+# BR: URL síncrona para seed, streaming e Alembic (mesmo arquivo, driver bloqueante)
+SYNC_DATABASE_URL = _url.set(drivername=_url.get_backend_name()) if ASYNC_DB else _url
+
+# EN: SQLite connection profile, applied on every new connection ("off" disables it)
+# BR: Perfil de conexão SQLite, aplicado a cada nova conexão ("off" desativa)
+SQLITE_PROFILE = os.getenv("SQLITE_PROFILE", "production").lower()
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),  # EN: negative = KiB / BR: negativo = KiB
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+}
+
+# EN: Connection pool sizing (file databases only) / BR: Tamanho do pool (apenas bancos em arquivo)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+_IN_MEMORY = _url.database in (None, "", ":memory:") or "mode=memory" in str(_url)
+
+
+def _engine_kwargs(is_async: bool = False) -> dict:
+    """EN: Shared engine options; file databases get an explicitly sized queue pool
+    BR: Opções compartilhadas; bancos em arquivo recebem um pool de fila dimensionado"""
+    kwargs: dict = {"connect_args": {"check_same_thread": False}}
+    if not _IN_MEMORY:
+        kwargs.update(
+            poolclass=AsyncAdaptedQueuePool if is_async else QueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+    return kwargs
+
+
+def install_sqlite_profile(target: Engine, pragmas: dict = SQLITE_PRAGMAS) -> None:
+    """EN: Run the PRAGMAs on each new DBAPI connection of a sync engine. WAL lets
+    readers proceed while a writer commits; busy_timeout waits instead of failing
+    with "database is locked".
+    BR: Executa os PRAGMAs em cada nova conexão DBAPI de um mecanismo síncrono. WAL
+    permite leituras durante uma escrita; busy_timeout espera em vez de falhar com
+    "database is locked"."""
+    pragmas = dict(pragmas)
+    if _IN_MEMORY:
+        pragmas.pop("journal_mode", None)
+        pragmas.pop("mmap_size", None)
+
+    @event.listens_for(target, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, _connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+@contextmanager
+def immediate_transaction(target: Engine) -> Iterator[Connection]:
+    """EN: A connection inside BEGIN IMMEDIATE, committed on exit. It takes SQLite's
+    write lock up front, so concurrent workers queue on busy_timeout instead of
+    racing check-then-write.
+    BR: Uma conexão dentro de BEGIN IMMEDIATE, confirmada na saída. Pega o lock de
+    escrita do SQLite logo de início, então workers concorrentes esperam no
+    busy_timeout em vez de competir no verificar-e-escrever."""
+    with target.connect() as conn:
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+
 # EN: Create an engine for SQLite
 # BR: Crie um mecanismo para SQLite
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+engine = create_engine(SYNC_DATABASE_URL, **_engine_kwargs())
+if SQLITE_PROFILE != "off":
+    install_sqlite_profile(engine)
 
 # EN: Create a session local to interact with the database
 # BR: Crie uma sessão local para interagir com o banco de dados
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# EN: Async engine/sessions, only when the URL asks for them
+# BR: Mecanismo/sessões assíncronos, apenas quando a URL pede
+async_engine = create_async_engine(_url, **_engine_kwargs(is_async=True)) if ASYNC_DB else None
+if async_engine is not None and SQLITE_PROFILE != "off":
+    install_sqlite_profile(async_engine.sync_engine)
+AsyncSessionLocal = (
+    async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False) if ASYNC_DB else None
+)
+
 # EN: Define the base class for the ORM models
 # BR: Defina a classe base para os modelos ORM
 Base = declarative_base()
 
+# EN: Either kind of session, as handed to routes
+# BR: Qualquer tipo de sessão, como entregue às rotas
+DBSession = Union[Session, AsyncSession]
+
 # EN: Dependency for getting a database session
 # BR: Dependência para obter uma sessão de banco de dados
 def get_db():
@@ -27,3 +135,22 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# EN: Async dependency (aiosqlite) / BR: Dependência assíncrona (aiosqlite)
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# EN: Dependency used by the routes, chosen by the URL scheme
+# BR: Dependência usada pelas rotas, escolhida pelo esquema da URL
+get_session = get_async_db if ASYNC_DB else get_db
+
+
+async def run_db(db: DBSession, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """EN: Run sync ORM code without blocking the event loop: through
+    AsyncSession.run_sync on the async path, or in the threadpool otherwise.
+    BR: Executa código ORM síncrono sem bloquear o event loop: via
+    AsyncSession.run_sync no caminho assíncrono, ou no threadpool."""
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
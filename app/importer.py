@@ -0,0 +1,296 @@
+"""EN: Bulk import of historical observations from CSV or NDJSON.
+
+Rows are read as a stream and validated against `Import_Observation`
+(`Create_Observation` plus an optional `Observation_Date`) in chunks of
+IMPORT_CHUNK_SIZE. Teachers, departments and focus areas may be given as IDs
+or by name (teachers also by email, or "Forename Surname"); names resolve
+through maps loaded once per import, so a row costs no lookup queries. Each
+chunk is one executemany insert plus one batched analytics update in its own
+transaction. A chunk the database rejects is retried row by row, so one bad
+row never aborts the load; every rejected row is reported with its line
+number.
+
+    POST /api/observations/import?format=csv|ndjson[&dry_run=true]
+    python -m app.importer observations.csv [--dry-run] [--chunk-size 1000]
+
+BR: Importação em massa de observações históricas (CSV ou NDJSON). As linhas
+são lidas em fluxo, validadas em lotes e inseridas com executemany, um lote
+por transação; nomes viram IDs por mapas carregados uma vez. Linhas inválidas
+são relatadas sem abortar a carga.
+"""
+import io
+import os
+import csv
+import sys
+import json
+import time
+import logging
+import argparse
+from datetime import datetime, timezone
+from typing import IO, Dict, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from . import analytics
+from .database import SessionLocal
+from .models.models import Department, FocusArea, Observation, User
+from .schemas import Import_Observation
+
+logger = logging.getLogger("focused.importer")
+
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", "1000"))
+# EN: Rejected rows listed in the report (all are counted) / BR: Linhas rejeitadas listadas no relatório (todas são contadas)
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+# EN: Upload cap for the endpoint; bodies over IMPORT_SPOOL_BYTES are spooled to disk
+# BR: Limite de upload do endpoint; corpos acima de IMPORT_SPOOL_BYTES vão para o disco
+IMPORT_MAX_BYTES = int(os.getenv("IMPORT_MAX_BYTES", str(100 * 1024 * 1024)))
+IMPORT_SPOOL_BYTES = int(os.getenv("IMPORT_SPOOL_BYTES", str(8 * 1024 * 1024)))
+
+FORMATS = ("csv", "ndjson")
+_CONTENT_TYPES = {
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/x-ndjson": "ndjson",
+    "application/ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+}
+
+# EN: Accepted column names per field, first match wins / BR: Nomes de coluna aceitos por campo, vale o primeiro
+_COLUMNS = {
+    "Observation_Teacher": ("Observation_Teacher", "Teacher_ID", "Teacher", "Teacher_Email"),
+    "Observation_Department": ("Observation_Department", "Department_ID", "Department"),
+    "Observation_Focus": ("Observation_Focus", "FocusArea_ID", "Focus", "Focus_Area"),
+    "Observation_Class": ("Observation_Class", "Class"),
+    "Observation_Date": ("Observation_Date", "Date"),
+    "Observation_Strengths": ("Observation_Strengths", "Strengths"),
+    "Observation_Weaknesses": ("Observation_Weaknesses", "Weaknesses"),
+    "Observation_Comments": ("Observation_Comments", "Comments"),
+}
+
+
+def format_from_content_type(content_type: Optional[str]) -> Optional[str]:
+    """EN: "csv"/"ndjson" for a request Content-Type, else None / BR: "csv"/"ndjson" pelo Content-Type, senão None"""
+    if not content_type:
+        return None
+    return _CONTENT_TYPES.get(content_type.split(";")[0].strip().lower())
+
+
+def _key(value: str) -> str:
+    return " ".join(value.split()).casefold()
+
+
+class Lookups:
+    """EN: ID sets and name -> ID maps, loaded once per import / BR: Conjuntos de IDs e mapas nome -> ID, carregados uma vez"""
+
+    def __init__(self, s: Session):
+        self.ids: Dict[str, set] = {}
+        self.names: Dict[str, Dict[str, Optional[int]]] = {}
+
+        teachers: Dict[str, Optional[int]] = {}
+        teacher_ids = set()
+        for user_id, forename, surname, email in s.execute(select(User.User_ID, User.User_Forename, User.User_Surname, User.User_Email)):
+            teacher_ids.add(user_id)
+            teachers[_key(email)] = user_id
+            full_name = _key(f"{forename} {surname}")
+            # EN: Two teachers with one name resolve to None (ambiguous) / BR: Dois professores com o mesmo nome viram None (ambíguo)
+            teachers[full_name] = None if full_name in teachers and teachers[full_name] != user_id else user_id
+        self.ids["Observation_Teacher"], self.names["Observation_Teacher"] = teacher_ids, teachers
+
+        rows = s.execute(select(Department.Department_ID, Department.Department_Name)).all()
+        self.ids["Observation_Department"] = {row[0] for row in rows}
+        self.names["Observation_Department"] = {_key(row[1]): row[0] for row in rows}
+
+        rows = s.execute(select(FocusArea.FocusArea_ID, FocusArea.FocusArea_Name)).all()
+        self.ids["Observation_Focus"] = {row[0] for row in rows}
+        self.names["Observation_Focus"] = {_key(row[1]): row[0] for row in rows}
+
+    def resolve(self, field: str, value) -> int:
+        """EN: ID or name -> ID; ValueError if unknown or ambiguous / BR: ID ou nome -> ID; ValueError se desconhecido ou ambíguo"""
+        if isinstance(value, int) or (isinstance(value, str) and value.strip().isdigit()):
+            found = int(value)
+            if found not in self.ids[field]:
+                raise ValueError(f"unknown ID {found}")
+            return found
+        if not isinstance(value, str):
+            raise ValueError("expected an ID or a name")
+        key = _key(value)
+        if key not in self.names[field]:
+            raise ValueError(f"unknown name {value!r}")
+        found = self.names[field][key]
+        if found is None:
+            raise ValueError(f"ambiguous name {value!r}; use the ID or email")
+        return found
+
+
+def read_rows(stream: IO[bytes], fmt: str) -> Iterator[Tuple[int, object]]:
+    """EN: (line number, dict or error message) per record, read incrementally
+    BR: (número da linha, dict ou mensagem de erro) por registro, lido aos poucos"""
+    # EN: utf-8-sig drops the BOM spreadsheet tools add / BR: utf-8-sig remove o BOM que as planilhas adicionam
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for record in reader:
+            # EN: reader.line_num is the record's last physical line / BR: reader.line_num é a última linha física do registro
+            if None in record:
+                yield reader.line_num, "more values than header columns"
+            else:
+                yield reader.line_num, record
+        return
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_number, f"invalid JSON: {e}"
+            continue
+        yield line_number, record if isinstance(record, dict) else "expected a JSON object"
+
+
+def _prepare(record: dict, lookups: Lookups, imported_at: datetime) -> Tuple[Optional[dict], List[str]]:
+    """EN: Map columns, resolve names and validate one record / BR: Mapear colunas, resolver nomes e validar um registro"""
+    data, problems = {}, []
+    for field, columns in _COLUMNS.items():
+        for column in columns:
+            value = record.get(column)
+            if isinstance(value, str):
+                value = value.strip() or None
+            if value is not None:
+                data[field] = value
+                break
+    for field in ("Observation_Teacher", "Observation_Department", "Observation_Focus"):
+        if field in data:
+            try:
+                data[field] = lookups.resolve(field, data[field])
+            except ValueError as e:
+                problems.append(f"{field}: {e}")
+    if problems:
+        return None, problems
+    try:
+        row = Import_Observation.model_validate(data).model_dump()
+    except ValidationError as e:
+        return None, [f"{'.'.join(str(p) for p in err['loc']) or 'row'}: {err['msg']}" for err in e.errors()]
+    # EN: executemany needs the same keys on every row / BR: executemany precisa das mesmas chaves em toda linha
+    if row["Observation_Date"] is None:
+        row["Observation_Date"] = imported_at
+    return row, []
+
+
+def _key_of(row: dict) -> analytics.ObservationKey:
+    return analytics.ObservationKey(row["Observation_Teacher"], row["Observation_Department"], row["Observation_Focus"], row["Observation_Date"])
+
+
+def _insert_chunk(s: Session, rows: List[Tuple[int, dict]], report: dict) -> None:
+    """EN: One executemany + one analytics batch, committed together; row by row
+    if the database rejects the batch
+    BR: Um executemany + um lote de analytics, com um commit; linha a linha se o
+    banco rejeitar o lote"""
+    try:
+        s.execute(insert(Observation), [row for _line, row in rows])
+        analytics.add_many(s, (_key_of(row) for _line, row in rows))
+        s.commit()
+        report["inserted"] += len(rows)
+        return
+    except SQLAlchemyError:
+        s.rollback()
+
+    # EN: A failed statement only undoes itself in SQLite, the transaction stays open
+    # (pysqlite SAVEPOINTs outside an explicit BEGIN would commit each row instead)
+    # BR: Uma instrução que falha só desfaz a si mesma no SQLite, a transação continua
+    # aberta (SAVEPOINTs do pysqlite fora de um BEGIN explícito gravariam cada linha)
+    inserted = []
+    for line, row in rows:
+        try:
+            s.execute(insert(Observation), [row])
+            inserted.append(row)
+        except SQLAlchemyError as e:
+            _reject(report, line, [f"database: {e.orig if getattr(e, 'orig', None) else e}"])
+    analytics.add_many(s, (_key_of(row) for row in inserted))
+    s.commit()
+    report["inserted"] += len(inserted)
+
+
+def _reject(report: dict, line: int, problems: List[str]) -> None:
+    report["failed"] += 1
+    if len(report["errors"]) < IMPORT_MAX_ERRORS:
+        report["errors"].append({"line": line, "errors": problems})
+
+
+def import_observations(stream: IO[bytes], fmt: str, dry_run: bool = False, chunk_size: int = IMPORT_CHUNK_SIZE) -> dict:
+    """EN: Import a CSV/NDJSON byte stream on its own session; returns the report
+    BR: Importa um fluxo de bytes CSV/NDJSON numa sessão própria; retorna o relatório"""
+    if fmt not in FORMATS:
+        raise ValueError(f"format must be one of {', '.join(FORMATS)}")
+    started = time.perf_counter()
+    report = {"format": fmt, "dry_run": dry_run, "received": 0, "valid": 0, "inserted": 0, "failed": 0, "chunks": 0, "errors": []}
+    # EN: Undated rows share one timestamp, like a server_default at load time
+    # BR: Linhas sem data compartilham um horário, como um server_default no momento da carga
+    imported_at = datetime.now(timezone.utc).replace(tzinfo=None)
+
+    with SessionLocal() as s:
+        lookups = Lookups(s)
+        s.rollback()
+        chunk: List[Tuple[int, dict]] = []
+
+        def flush() -> None:
+            if not chunk:
+                return
+            report["valid"] += len(chunk)
+            report["chunks"] += 1
+            if not dry_run:
+                _insert_chunk(s, chunk, report)
+            chunk.clear()
+
+        try:
+            for line, record in read_rows(stream, fmt):
+                report["received"] += 1
+                if isinstance(record, str):
+                    _reject(report, line, [record])
+                    continue
+                row, problems = _prepare(record, lookups, imported_at)
+                if problems:
+                    _reject(report, line, problems)
+                    continue
+                chunk.append((line, row))
+                if len(chunk) >= chunk_size:
+                    flush()
+        except (UnicodeDecodeError, csv.Error) as e:
+            # EN: Unreadable input stops the load; earlier chunks stay committed
+            # BR: Entrada ilegível encerra a carga; os lotes anteriores continuam gravados
+            report["aborted"] = f"unreadable input after {report['received']} records: {e}"
+        flush()
+
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    logger.info(
+        "observation import finished",
+        extra={k: report[k] for k in ("format", "dry_run", "received", "valid", "inserted", "failed", "chunks", "seconds")},
+    )
+    return report
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.importer", description="Bulk import observations from CSV or NDJSON")
+    parser.add_argument("path", help='CSV/NDJSON file, or "-" for stdin')
+    parser.add_argument("--format", choices=FORMATS, help="defaults to the file extension")
+    parser.add_argument("--dry-run", action="store_true", help="validate only, insert nothing")
+    parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson" if args.path != "-" else None)
+    if fmt is None:
+        parser.error("--format is required when reading stdin")
+    stream = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+    try:
+        report = import_observations(stream, fmt, dry_run=args.dry_run, chunk_size=args.chunk_size)
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+    print(json.dumps(report, indent=2, default=str))
+    return 1 if report["failed"] or "aborted" in report else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""EN: Optional in-process PDF engine (WeasyPrint) behind a process pool.
+
+Used by renderer.render_pdf as a fallback when the remote renderer is failing or
+slow (LOCAL_RENDERER=fallback). WeasyPrint is not in requirements.txt: it needs
+Pango on the host (see requirements-local-renderer.txt and the Dockerfile's
+LOCAL_RENDERER build arg). Without it the fallback stays off and a warning is
+logged at startup. Rendering is CPU-bound, so it runs in LOCAL_RENDERER_WORKERS
+spawned processes that import WeasyPrint once, and never on the event loop.
+
+BR: Motor de PDF opcional em processo (WeasyPrint) num pool de processos. Usado por
+renderer.render_pdf como alternativa quando o renderer remoto falha ou está lento
+(LOCAL_RENDERER=fallback). O WeasyPrint não está no requirements.txt: precisa do
+Pango no host. Sem ele a alternativa fica desligada e um aviso é registrado.
+"""
+import os
+import logging
+import importlib.util
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+logger = logging.getLogger("focused.local_renderer")
+
+# EN: off | fallback / BR: off | fallback
+LOCAL_RENDERER = os.getenv("LOCAL_RENDERER", "off").lower()
+LOCAL_RENDERER_WORKERS = int(os.getenv("LOCAL_RENDERER_WORKERS", "1"))
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def available() -> bool:
+    """EN: WeasyPrint is importable / BR: O WeasyPrint pode ser importado"""
+    return importlib.util.find_spec("weasyprint") is not None
+
+
+def enabled() -> bool:
+    return _pool is not None
+
+
+def _warm() -> None:
+    """EN: Pool initializer: pay the WeasyPrint import once per process
+    BR: Inicializador do pool: pagar o import do WeasyPrint uma vez por processo"""
+    import weasyprint  # noqa: F401
+
+
+def _render(html: str) -> bytes:
+    """EN: Runs in a pool process / BR: Roda num processo do pool"""
+    from weasyprint import HTML
+    return HTML(string=html).write_pdf()
+
+
+def _new_pool() -> ProcessPoolExecutor:
+    # EN: spawn, not fork: the parent has an event loop, threads and DB connections
+    # BR: spawn, não fork: o pai tem event loop, threads e conexões de banco
+    pool = ProcessPoolExecutor(
+        max_workers=LOCAL_RENDERER_WORKERS,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_warm,
+    )
+    # EN: Start the workers now rather than during an incident / BR: Subir os workers agora, não durante um incidente
+    for _ in range(LOCAL_RENDERER_WORKERS):
+        pool.submit(_warm)
+    return pool
+
+
+async def start() -> None:
+    """EN: Create the pool when enabled and WeasyPrint is installed (startup)
+    BR: Criar o pool quando habilitado e o WeasyPrint estiver instalado (startup)"""
+    global _pool
+    if LOCAL_RENDERER == "off" or _pool is not None:
+        return
+    if not available():
+        logger.warning("weasyprint is not installed; local renderer disabled", extra={"local_renderer": LOCAL_RENDERER})
+        return
+    _pool = _new_pool()
+    logger.info("local renderer started", extra={"workers": LOCAL_RENDERER_WORKERS})
+
+
+async def stop() -> None:
+    """EN: Stop the pool without waiting for running renders (shutdown)
+    BR: Parar o pool sem esperar renderizações em andamento (shutdown)"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+    _pool = None
+
+
+def submit(html: str) -> Future:
+    """EN: Queue a render; a crashed pool (e.g. a worker killed for memory) is replaced
+    BR: Enfileirar uma renderização; um pool quebrado (ex.: worker morto por memória) é substituído"""
+    global _pool
+    try:
+        return _pool.submit(_render, html)
+    except BrokenProcessPool:
+        logger.warning("local renderer pool broken; restarting it")
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = _new_pool()
+        return _pool.submit(_render, html)
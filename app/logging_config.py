@@ -0,0 +1,56 @@
+import os
+import json
+import logging
+from datetime import datetime, timezone
+
+# EN: LogRecord attributes that are not user-supplied `extra` fields
+# BR: Atributos do LogRecord que não são campos `extra` do usuário
+_RESERVED = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """EN: One JSON object per line; `extra={...}` fields become top-level keys
+    BR: Um objeto JSON por linha; campos de `extra={...}` viram chaves de topo"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """EN: Human-readable, extras appended as key=value / BR: Legível, extras no fim como chave=valor"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        extras = " ".join(f"{k}={v}" for k, v in vars(record).items() if k not in _RESERVED and not k.startswith("_"))
+        return f"{line} {extras}" if extras else line
+
+
+def configure_logging() -> None:
+    """EN: Idempotent; call once at startup / BR: Idempotente; chamar uma vez no startup"""
+    logger = logging.getLogger("focused")
+    if getattr(logger, "_configured", False):
+        return
+    # EN: Read env here, after .env is loaded; DEBUG lines cost nothing at INFO
+    # BR: Ler env aqui, após carregar o .env; linhas DEBUG não custam nada em INFO
+    level = os.getenv("LOG_LEVEL", "INFO").upper()
+    fmt = os.getenv("LOG_FORMAT", "json").lower()
+    handler = logging.StreamHandler()
+    if fmt == "text":
+        handler.setFormatter(TextFormatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    else:
+        handler.setFormatter(JsonFormatter())
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+    logger._configured = True
@@ -1,21 +1,272 @@
 import os
-import requests
+import json
+import logging
+import random
+import asyncio
+import uuid
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
 
-def notify_observation(payload: dict) -> None:
-    print("[mailer] task started") # Debug
-    MAILER_URL = os.getenv("MAILER_URL", "http://127.0.0.1:8001")
-    MAILER_API_KEY = os.getenv("MAILER_API_KEY", "")
+import httpx
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-    if not MAILER_API_KEY:
-        print("[mailer] WARNING: MAILER_API_KEY is empty despite .env loading")
-    try:
-        url = f"{MAILER_URL.rstrip('/')}/mail/observation"
+from .database import SessionLocal
+from .metrics import mailer_latency, observe_call
+from .models.outbox import MailOutbox
+
+logger = logging.getLogger("focused.mailer")
+
+# EN: Outbox worker settings / BR: Configuração do worker da outbox
+OUTBOX_WORKER = os.getenv("OUTBOX_WORKER", "1") != "0"
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "20"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "5"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "8"))
+OUTBOX_BACKOFF_BASE = float(os.getenv("OUTBOX_BACKOFF_BASE", "2"))
+OUTBOX_BACKOFF_MAX = float(os.getenv("OUTBOX_BACKOFF_MAX", "600"))
+OUTBOX_LEASE_SECONDS = float(os.getenv("OUTBOX_LEASE_SECONDS", "60"))
+MAILER_TIMEOUT = float(os.getenv("MAILER_TIMEOUT", "10"))
+
+
+def _utcnow() -> datetime:
+    """EN: Naive UTC, as SQLite CURRENT_TIMESTAMP stores it / BR: UTC ingênuo, como o SQLite guarda"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def enqueue_observation_email(db: Session, observation_id: int, payload: dict) -> MailOutbox:
+    """EN: Add a notification to the caller's transaction (no commit here). A still
+    pending message for the same observation is replaced rather than duplicated,
+    unless a worker holds its lease (it may be sending it right now).
+    BR: Adiciona uma notificação à transação do chamador (sem commit aqui). Uma
+    mensagem ainda pendente da mesma observação é substituída, não duplicada, a menos
+    que um worker a tenha reservado (pode estar enviando agora)."""
+    now = _utcnow()
+    row = (
+        db.query(MailOutbox)
+        .filter(
+            MailOutbox.Observation_ID == observation_id,
+            MailOutbox.Status == "pending",
+            MailOutbox.Attempts == 0,
+            (MailOutbox.Locked_Until.is_(None)) | (MailOutbox.Locked_Until < now),
+        )
+        .first()
+    )
+    if row is None:
+        row = MailOutbox(Observation_ID=observation_id, Status="pending", Attempts=0, Created_At=now)
+        db.add(row)
+    row.Payload = json.dumps(payload)
+    row.Next_Attempt_At = now
+    db.flush()
+    # EN: Stable across retries, so the mailer can drop duplicates
+    # BR: Estável entre tentativas, para o mailer descartar duplicatas
+    row.Idempotency_Key = f"observation-{observation_id}-{row.Outbox_ID}"
+    return row
+
+
+def _backoff(attempts: int) -> float:
+    """EN: Exponential backoff with jitter / BR: Recuo exponencial com variação"""
+    delay = min(OUTBOX_BACKOFF_MAX, OUTBOX_BACKOFF_BASE ** attempts)
+    return delay * random.uniform(0.8, 1.2)
+
+
+def _claim_batch(limit: int) -> List[dict]:
+    """EN: Lease due rows in one UPDATE, safe across processes sharing the SQLite file
+    BR: Reserva linhas vencidas num único UPDATE, seguro entre processos no mesmo SQLite"""
+    token = uuid.uuid4().hex
+    now = _utcnow()
+    with SessionLocal() as db:
+        due = (
+            select(MailOutbox.Outbox_ID)
+            .where(
+                MailOutbox.Status == "pending",
+                MailOutbox.Next_Attempt_At <= now,
+                (MailOutbox.Locked_Until.is_(None)) | (MailOutbox.Locked_Until < now),
+            )
+            .order_by(MailOutbox.Next_Attempt_At)
+            .limit(limit)
+        )
+        db.execute(
+            update(MailOutbox)
+            .where(MailOutbox.Outbox_ID.in_(due.scalar_subquery()))
+            .values(Locked_Until=now + timedelta(seconds=OUTBOX_LEASE_SECONDS), Claim_Token=token)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        rows = db.query(MailOutbox).filter(MailOutbox.Claim_Token == token).all()
+        return [
+            {
+                "id": r.Outbox_ID,
+                "token": token,
+                "key": r.Idempotency_Key,
+                "payload": r.Payload,
+                "attempts": r.Attempts,
+                "created_at": r.Created_At,
+            }
+            for r in rows
+        ]
+
+
+def _record_results(results: List[dict]) -> None:
+    """EN: Mark sent / schedule retry / give up, in one transaction. Each UPDATE only
+    matches while the row still carries our Claim_Token: if the lease expired and the
+    row was claimed again, the newer claim owns it and our outcome is dropped.
+    BR: Marcar enviado / agendar nova tentativa / desistir, numa transação. Cada UPDATE
+    só casa enquanto a linha tem nosso Claim_Token: se a reserva expirou e a linha foi
+    reservada de novo, a reserva mais nova manda e nosso resultado é descartado."""
+    now = _utcnow()
+    with SessionLocal() as db:
+        for res in results:
+            values = {"Locked_Until": None, "Claim_Token": None}
+            if res["ok"]:
+                values.update(Status="sent", Sent_At=now, Last_Error=None)
+            else:
+                attempts = res["attempts"] + 1
+                values.update(Attempts=attempts, Last_Error=(res["error"] or "")[:500])
+                if res["permanent"] or attempts >= OUTBOX_MAX_ATTEMPTS:
+                    values["Status"] = "failed"
+                else:
+                    values["Next_Attempt_At"] = now + timedelta(seconds=_backoff(attempts))
+            db.execute(
+                update(MailOutbox)
+                .where(MailOutbox.Outbox_ID == res["id"], MailOutbox.Claim_Token == res["token"])
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+        db.commit()
+
+
+def _queue_depth() -> dict:
+    with SessionLocal() as db:
+        pending, oldest = db.execute(
+            select(func.count(MailOutbox.Outbox_ID), func.min(MailOutbox.Created_At)).where(MailOutbox.Status == "pending")
+        ).one()
+        failed = db.execute(select(func.count(MailOutbox.Outbox_ID)).where(MailOutbox.Status == "failed")).scalar_one()
+    oldest_age = (_utcnow() - oldest).total_seconds() if oldest else 0.0
+    return {"pending": pending, "failed": failed, "oldest_pending_age_s": round(oldest_age, 3)}
+
+
+class OutboxWorker:
+    """EN: Drains MailOutbox over a pooled client: claim a batch, deliver it
+    concurrently, record outcomes, repeat; sleeps until woken or the poll interval.
+    BR: Esvazia a MailOutbox com um cliente em pool: reserva um lote, entrega em
+    paralelo, registra resultados e repete; dorme até ser acordado ou o intervalo."""
+
+    def __init__(self):
+        self._client: Optional[httpx.AsyncClient] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+        # EN: Recent enqueue->sent latencies (s) / BR: Latências recentes fila->envio (s)
+        self._latencies: deque = deque(maxlen=1000)
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        # EN: Read env at startup, after .env is loaded / BR: Ler env no startup, após carregar o .env
+        self.url = f"{os.getenv('MAILER_URL', 'http://127.0.0.1:8001').rstrip('/')}/mail/observation"
+        self.api_key = os.getenv("MAILER_API_KEY", "")
+        if not self.api_key:
+            logger.warning("MAILER_API_KEY is empty despite .env loading")
+        limits = httpx.Limits(max_connections=OUTBOX_BATCH_SIZE, max_keepalive_connections=OUTBOX_BATCH_SIZE)
+        self._client = httpx.AsyncClient(timeout=MAILER_TIMEOUT, limits=limits)
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._client is not None:
+            await self._client.aclose()
+        self._task = self._client = self._wake = None
+
+    def wake(self) -> None:
+        """EN: Deliver promptly after an enqueue commit / BR: Entregar logo após o commit de um enfileiramento"""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                delivered = await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("outbox worker error")
+                delivered = 0
+            if delivered:
+                continue
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=OUTBOX_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+    async def drain_once(self) -> int:
+        """EN: One claim/deliver/record cycle; returns how many rows were attempted
+        BR: Um ciclo de reserva/entrega/registro; retorna quantas linhas foram tentadas"""
+        batch = await run_in_threadpool(_claim_batch, OUTBOX_BATCH_SIZE)
+        if not batch:
+            return 0
+        results = await asyncio.gather(*(self._deliver(item) for item in batch))
+        await run_in_threadpool(_record_results, list(results))
+        return len(batch)
+
+    async def _deliver(self, item: dict) -> dict:
         headers = {
-            "X-API-KEY": MAILER_API_KEY, 
+            "X-API-KEY": self.api_key,
+            "Idempotency-Key": item["key"],
             "Content-Type": "application/json",
         }
-        r = requests.post(url, json=payload, headers=headers, timeout=10)
-        print(f"[mailer] POST {url} status={r.status_code} body={r.text[:200]}")
-    
-    except Exception as e:
-        print(f"[mailer] EXCEPTION {e}")
\ No newline at end of file
+        with observe_call(mailer_latency, "sent") as call:
+            try:
+                r = await self._client.post(self.url, content=item["payload"], headers=headers)
+            except httpx.RequestError as e:
+                call["outcome"] = "unreachable"
+                return self._failure(item, False, f"unreachable: {e}")
+            if r.status_code >= 300:
+                call["outcome"] = f"status_{r.status_code // 100}xx"
+
+        if r.status_code < 300:
+            self.sent += 1
+            created = item["created_at"]
+            if created is not None:
+                self._latencies.append((_utcnow() - created).total_seconds())
+            return {"id": item["id"], "token": item["token"], "ok": True}
+
+        # EN: 4xx (except 408/429) will not get better by retrying / BR: 4xx (exceto 408/429) não melhora com nova tentativa
+        permanent = 400 <= r.status_code < 500 and r.status_code not in (408, 429)
+        return self._failure(item, permanent, f"status {r.status_code}: {r.text[:200]}")
+
+    def _failure(self, item: dict, permanent: bool, error: str) -> dict:
+        if permanent or item["attempts"] + 1 >= OUTBOX_MAX_ATTEMPTS:
+            self.failed += 1
+            logger.warning("giving up on mail delivery", extra={"idempotency_key": item["key"], "error": error})
+        else:
+            self.retried += 1
+        return {
+            "id": item["id"], "token": item["token"], "ok": False,
+            "attempts": item["attempts"], "permanent": permanent, "error": error,
+        }
+
+    def stats(self) -> dict:
+        """EN: Queue depth + delivery counters/latency / BR: Profundidade da fila + contadores/latência"""
+        lat = sorted(self._latencies)
+        return {
+            **_queue_depth(),
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed_deliveries": self.failed,
+            "latency_p50_s": round(lat[len(lat) // 2], 3) if lat else None,
+            "latency_p95_s": round(lat[min(len(lat) - 1, int(len(lat) * 0.95))], 3) if lat else None,
+        }
+
+
+outbox_worker = OutboxWorker()
@@ -1,13 +1,20 @@
 import os
+import logging
 import pathlib
 
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 
 from .routes import router as api_router
-from .database import engine, SessionLocal
-from .models.models import Base, create_initial_data
+from . import metrics, query_profile
+from .logging_config import configure_logging
+from . import renderer
+from .mailer_client import OUTBOX_WORKER, outbox_worker
+from .database import engine
+from .ref_cache import ref_cache
+from .pdf_templates import pdf_templates
+from .startup import prepare_database
 
 # EN: Resolve project root and frontend path (../frontend)
 # BR: Resolver raiz do projeto e caminho do frontend (../frontend)
@@ -15,42 +22,96 @@ app_dir = pathlib.Path(__file__).resolve().parent
 PROJECT_ROOT = app_dir.parent.parent
 FRONTEND_PATH = PROJECT_ROOT / "frontend"
 
-print(f"Calculated Frontend directory path: {FRONTEND_PATH}")
+logger = logging.getLogger("focused.main")
+
+# EN: Load .env early (once), then configure logging so LOG_LEVEL can come from it
+# BR: Carregar .env cedo (uma vez), depois configurar o logging para LOG_LEVEL poder vir dele
+BACKEND_DIR = app_dir.parent
+env_path = BACKEND_DIR / ".env"
+dotenv_error = None
+try:
+    from dotenv import load_dotenv
+    load_dotenv(dotenv_path=env_path, override=False)
+except Exception as e:
+    dotenv_error = e
+configure_logging()
+
+logger.debug("frontend path resolved", extra={"frontend_path": str(FRONTEND_PATH)})
+if dotenv_error is not None:
+    logger.warning("dotenv not loaded", extra={"error": str(dotenv_error)})
+else:
+    key = os.getenv("MAILER_API_KEY", "")
+    key_preview = (key[:4] + "…" + str(len(key))) if key else "<EMPTY>"
+    logger.info(
+        "environment loaded",
+        extra={"env_file": str(env_path.resolve()), "env_file_found": env_path.exists(),
+               "mailer_url": os.getenv("MAILER_URL"), "mailer_api_key": key_preview},
+    )
 
 app = FastAPI()
 
+# EN: Per-route latency and per-request SQL counts / BR: Latência por rota e contagem de SQL por requisição
+app.add_middleware(metrics.MetricsMiddleware)
+
+# EN: Opt-in N+1 / slow-query profiling (staging, local runs) / BR: Perfil opcional de N+1 / consultas lentas (staging, local)
+if query_profile.QUERY_PROFILE:
+    app.add_middleware(query_profile.QueryProfileMiddleware)
+
+    @app.get("/debug/queries", include_in_schema=False)
+    def query_profile_report():
+        return query_profile.report()
+
+    logger.warning("query profiling enabled", extra={"slow_ms": query_profile.QUERY_PROFILE_SLOW_MS,
+                                                      "repeat_threshold": query_profile.QUERY_PROFILE_REPEAT_THRESHOLD})
+
 # EN: Health endpoint for Docker healthcheck / BR: Endpoint de saúde para o Docker
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
-# EN: Load .env early (once)
-# BR: Carregar .env cedo (uma vez)
-try:
-    from dotenv import load_dotenv 
-    BACKEND_DIR = app_dir.parent
-    env_path = BACKEND_DIR / ".env" 
-    print(f"DEBUG: Attempting to load .env from: {env_path.resolve()}") # Debug
-    load_dotenv(dotenv_path=env_path, override=False)
-    key = os.getenv("MAILER_API_KEY", "")
-    key_preview = (key[:4] + "…" + str(len(key))) if key else "<EMPTY>"
-    print(f"[env] loaded={env_path.exists()} MAILER_URL={os.getenv('MAILER_URL')} MAILER_API_KEY={key_preview}")
-except Exception as e:
-    print("[env] dotenv not loaded:", e)
-
-# EN: Creates tables / BR: Cria tabelas
-Base.metadata.create_all(bind=engine)
+# EN: Prometheus scrape endpoint / BR: Endpoint de coleta do Prometheus
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
+# EN: Schema check (DB_SCHEMA_MODE) and versioned core seed, at startup rather than import
+# BR: Verificação do esquema (DB_SCHEMA_MODE) e seed básico versionado, na partida e não na importação
 @app.on_event("startup")
 def startup_event():
-    # EN: Create DB session and seed initial data
-    # BR: Criar sessão de BD e popular dados iniciais
-    db = SessionLocal()
-    try:
-        create_initial_data(db)
-        print("Database initialised and initial data created.")
-    finally:
-        db.close()
+    prepare_database(engine)
+
+# EN: Compile the PDF templates once per process / BR: Compilar os templates de PDF uma vez por processo
+@app.on_event("startup")
+def load_pdf_templates():
+    pdf_templates.load()
+
+# EN: Shared renderer client for the app lifetime / BR: Cliente do renderer compartilhado durante a vida da app
+@app.on_event("startup")
+async def start_renderer_client():
+    await renderer.start()
+
+@app.on_event("shutdown")
+async def stop_renderer_client():
+    await renderer.stop()
+
+# EN: Mailer outbox worker / BR: Worker da outbox do mailer
+@app.on_event("startup")
+async def start_outbox_worker():
+    if OUTBOX_WORKER:
+        await outbox_worker.start()
+
+@app.on_event("shutdown")
+async def stop_outbox_worker():
+    await outbox_worker.stop()
+
+# EN: Cross-worker invalidation of the lookup cache / BR: Invalidação do cache de consultas entre workers
+@app.on_event("startup")
+async def start_ref_cache_watcher():
+    await ref_cache.start()
+
+@app.on_event("shutdown")
+async def stop_ref_cache_watcher():
+    await ref_cache.stop()
 
 # EN: Include API routes / BR: Incluir rotas da API
 app.include_router(api_router, prefix="/api")
@@ -64,7 +125,7 @@ if FRONTEND_PATH.is_dir():
         name="static-assets"
     )
 else:
-    print(f"[frontend] WARNING: Frontend path not found at {FRONTEND_PATH}; static mount skipped")
+    logger.warning("frontend path not found; static mount skipped", extra={"frontend_path": str(FRONTEND_PATH)})
 
 # EN: Handle the bare root (/) explicitly, which also serves index.html
 @app.get("/", include_in_schema=False)
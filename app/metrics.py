@@ -0,0 +1,223 @@
+"""EN: In-process metrics in the Prometheus text format (served at /metrics).
+
+Hand-rolled counters/histograms (no client library), an ASGI middleware for
+per-route latency, and engine events that count SQL statements and their
+duration per request through a context variable. Renderer and mailer calls
+record their own timings through `observe_call`.
+
+BR: Métricas em processo no formato texto do Prometheus (servidas em /metrics):
+contadores/histogramas próprios, middleware ASGI de latência por rota e eventos
+do engine que contam consultas SQL e sua duração por requisição.
+"""
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+_INF = 'le="+Inf"'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {value:g}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+        # EN: labels -> [per-bucket counts..., sum, count] / BR: rótulos -> [contagens por faixa..., soma, total]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = super().render()
+        bounds = [f'le="{bound:g}"' for bound in self.buckets]
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._values.items())
+        for labels, series in items:
+            cumulative = 0.0
+            for le, hits in zip(bounds, series):
+                cumulative += hits
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative:g}")
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, _INF)} {series[-1]:g}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {series[-2]:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {series[-1]:g}")
+        return lines
+
+
+REGISTRY: List[_Metric] = []
+
+http_requests = Counter("http_requests_total", "HTTP requests by route template and status.", ("method", "route", "status"))
+http_latency = Histogram("http_request_duration_seconds", "HTTP request latency, including streamed bodies.", ("method", "route"))
+db_queries_per_request = Histogram("db_queries_per_request", "SQL statements executed per HTTP request.", ("route",), COUNT_BUCKETS)
+db_time_per_request = Histogram("db_query_seconds_per_request", "Time spent in SQL per HTTP request.", ("route",))
+db_queries = Counter("db_queries_total", "SQL statements executed (route \"-\" = background work).", ("route",))
+db_query_latency = Histogram("db_query_duration_seconds", "Duration of single SQL statements.", ("route",))
+renderer_latency = Histogram("renderer_request_duration_seconds", "Renderer calls by outcome.", ("outcome",))
+renderer_queue_wait = Histogram("renderer_queue_wait_seconds", "Time spent waiting for a render slot.")
+renderer_local_latency = Histogram("renderer_local_duration_seconds", "In-process fallback renders by outcome.", ("outcome",))
+pdf_requests = Counter("pdf_requests_total", "PDF bytes served, by source: cache, render (started one) or coalesced (joined one in flight).", ("source",))
+renderer_breaker_transitions = Counter("renderer_breaker_transitions_total", "Renderer circuit breaker state changes.", ("state",))
+mailer_latency = Histogram("mailer_request_duration_seconds", "Mailer deliveries by outcome.", ("outcome",))
+
+
+def render() -> str:
+    """EN: Exposition text for every registered metric / BR: Texto de exposição de todas as métricas"""
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def observe_call(histogram: Histogram, outcome: str = "ok") -> Iterator[dict]:
+    """EN: Time a block; the caller may override result["outcome"], an exception means error
+    BR: Mede um bloco; o chamador pode trocar result["outcome"], uma exceção significa erro"""
+    result = {"outcome": outcome}
+    start = time.perf_counter()
+    try:
+        yield result
+    except BaseException:
+        if result["outcome"] == outcome:
+            result["outcome"] = "error"
+        raise
+    finally:
+        histogram.observe(time.perf_counter() - start, result["outcome"])
+
+
+# EN: Per-request SQL tally; a mutable dict so threadpool/run_sync copies of the context share it
+# BR: Contagem de SQL por requisição; dict mutável para que cópias do contexto no threadpool o compartilhem
+_request_db: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("request_db", default=None)
+
+
+def request_db_stats() -> Optional[dict]:
+    """EN: The current request's tally (None outside a request) / BR: Contagem da requisição atual (None fora de uma)"""
+    return _request_db.get()
+
+
+def route_label(scope: dict) -> str:
+    """EN: Route template once the router has matched / BR: Modelo da rota depois do roteamento"""
+    return getattr(scope.get("route"), "path", "unmatched")
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _query_start(conn, _cursor, _statement, _parameters, _context, _executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _query_end(conn, _cursor, _statement, _parameters, _context, _executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = _request_db.get()
+    route = route_label(stats["scope"]) if stats is not None else "-"
+    if stats is not None:
+        stats["queries"] += 1
+        stats["seconds"] += elapsed
+    db_queries.inc(route)
+    db_query_latency.observe(elapsed, route)
+
+
+@event.listens_for(Engine, "handle_error")
+def _query_failed(context):
+    # EN: after_cursor_execute does not run for a failed statement / BR: after_cursor_execute não roda para uma consulta que falhou
+    conn = context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+
+class MetricsMiddleware:
+    """EN: Pure ASGI middleware (no BaseHTTPMiddleware buffering, so streamed
+    responses are timed to their last byte). Routes are labelled by template
+    ("/api/observations/{observation_ID}"), unmatched paths as "unmatched".
+    BR: Middleware ASGI puro (sem o buffer do BaseHTTPMiddleware, então respostas
+    em streaming são medidas até o último byte). Rotas são rotuladas pelo modelo."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = {"scope": scope, "queries": 0, "seconds": 0.0}
+        token = _request_db.set(stats)
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            _request_db.reset(token)
+            route = route_label(scope)
+            method = scope.get("method", "")
+            http_requests.inc(method, route, str(status["code"]))
+            http_latency.observe(elapsed, method, route)
+            db_queries_per_request.observe(stats["queries"], route)
+            db_time_per_request.observe(stats["seconds"], route)
@@ -13,5 +13,7 @@ from . import audit_event   # noqa: F401
 from . import auth_token    # noqa: F401
 from . import login_attempt # noqa: F401
 from . import trust         # noqa: F401
+from . import outbox        # noqa: F401
+from . import analytics     # noqa: F401
 
 __all__ = ["Base"]
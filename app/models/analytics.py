@@ -0,0 +1,25 @@
+from sqlalchemy import Column, Integer, Date, DateTime, Index
+from app.database import Base
+
+class ObservationWeeklyCount(Base):
+    # EN: Creates ObservationWeeklyCounts table: observations per department x
+    # focus area x week (Monday), maintained by app/analytics.py
+    # BR: Cria tabela 'ObservationWeeklyCounts': observações por departamento x
+    # foco x semana (segunda-feira), mantida por app/analytics.py
+    __tablename__ = "ObservationWeeklyCounts"
+    __table_args__ = (
+        Index("ix_ObservationWeeklyCounts_Week", "Week_Start"),
+    )
+    Department_ID = Column(Integer, primary_key=True)
+    FocusArea_ID = Column(Integer, primary_key=True)
+    Week_Start = Column(Date, primary_key=True)
+    Observation_Count = Column(Integer, nullable=False, default=0)
+
+class TeacherCoverage(Base):
+    # EN: Creates TeacherCoverage table: observations per teacher x focus area
+    # BR: Cria tabela 'TeacherCoverage': observações por professor x foco
+    __tablename__ = "TeacherCoverage"
+    Teacher_ID = Column(Integer, primary_key=True)
+    FocusArea_ID = Column(Integer, primary_key=True)
+    Observation_Count = Column(Integer, nullable=False, default=0)
+    Last_Observed = Column(DateTime)
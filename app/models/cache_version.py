@@ -0,0 +1,11 @@
+from sqlalchemy import Column, Integer, String
+from app.database import Base
+
+class CacheVersion(Base):
+    # EN: Creates CacheVersions table: one counter per cached data set, bumped by
+    # triggers on its source tables so every worker process sees writes
+    # BR: Cria tabela 'CacheVersions': um contador por conjunto em cache, incrementado
+    # por gatilhos nas tabelas de origem para todos os processos verem as escritas
+    __tablename__ = "CacheVersions"
+    Name = Column(String(64), primary_key=True)
+    Version = Column(Integer, nullable=False, default=0)
@@ -1,9 +1,8 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Index, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
 
-# EN: Not used in MVP / não usado no MVP
 class FlagType(Base):
     # EN: Creates FlagTypes table
     # BR: Cria tabela 'FlagTypes' (tipos de indicador)
@@ -11,11 +10,19 @@ class FlagType(Base):
     FlagType_ID = Column(Integer, primary_key=True, index=True, autoincrement=True)
     FlagType_Name = Column(String(64), unique=True, nullable=False)
 
-# EN: Not used in MVP / não usado no MVP
 class Flag(Base):
     # EN: Creates Flags table
     # BR: Cria tabela 'Flags' (indicadores)
     __tablename__ = "Flags"
+    # EN: Open flags are the hot set: partial indexes keep them in Flag_ID order
+    # without carrying closed rows (see migration 0006)
+    # BR: Indicadores abertos são o conjunto quente: índices parciais os mantêm em
+    # ordem de Flag_ID sem carregar os fechados (ver migração 0006)
+    __table_args__ = (
+        Index("ix_Flags_Open", "Flag_ID", sqlite_where=text('"Is_Open" = 1')),
+        Index("ix_Flags_Open_Type", "FlagType", "Flag_ID", sqlite_where=text('"Is_Open" = 1')),
+        Index("ix_Flags_Open_Focus", "FocusArea", "Flag_ID", sqlite_where=text('"Is_Open" = 1')),
+    )
     Flag_ID = Column(Integer, primary_key=True, index=True, autoincrement=True)
     Observation = Column(Integer, ForeignKey("Observations.Observation_ID"), nullable=False, index=True)
     observation = relationship("Observation", backref="flags")
@@ -24,3 +31,4 @@ class Flag(Base):
     FocusArea = Column(Integer, ForeignKey("FocusAreas.FocusArea_ID"), nullable=False, index=True)
     focus = relationship("FocusArea", backref="flags")
     Is_Open = Column(Boolean, nullable=False, default=True)
+    Flag_Date = Column(DateTime, server_default=func.now(), nullable=False)
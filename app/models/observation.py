@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -14,14 +14,22 @@ class Observation(Base):
     # EN: Creates Observations table
     # BR: Cria tabela 'Observations' (Observações de aula)
     __tablename__ = "Observations"
+    # EN: (filter, date) indexes serve the list in order, no temp sort (see migration 0002)
+    # BR: Índices (filtro, data) servem a listagem em ordem, sem ordenação temporária (ver migração 0002)
+    __table_args__ = (
+        Index("ix_Observations_Date", "Observation_Date"),
+        Index("ix_Observations_Teacher_Date", "Observation_Teacher", "Observation_Date"),
+        Index("ix_Observations_Department_Date", "Observation_Department", "Observation_Date"),
+        Index("ix_Observations_Focus_Date", "Observation_Focus", "Observation_Date"),
+    )
     Observation_ID = Column(Integer, primary_key=True, index=True, autoincrement=True)
     Observation_Date = Column(DateTime, server_default=func.now(), nullable=False)
-    Observation_Department = Column(Integer, ForeignKey("Departments.Department_ID"), index=True, nullable=False)
+    Observation_Department = Column(Integer, ForeignKey("Departments.Department_ID"), nullable=False)
     department = relationship("Department", backref="observations")
-    Observation_Teacher = Column(Integer, ForeignKey("Users.User_ID"), nullable=False, index=True)
+    Observation_Teacher = Column(Integer, ForeignKey("Users.User_ID"), nullable=False)
     teacher = relationship("User", backref="observations") 
     Observation_Class = Column(String(16), nullable=False)
-    Observation_Focus = Column(Integer, ForeignKey("FocusAreas.FocusArea_ID"), nullable=False, index=True)
+    Observation_Focus = Column(Integer, ForeignKey("FocusAreas.FocusArea_ID"), nullable=False)
     focus = relationship("FocusArea", backref="observations")
     Observation_Strengths = Column(String(1000))
     Observation_Weaknesses = Column(String(1000))
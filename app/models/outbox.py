@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from sqlalchemy.sql import func
+from app.database import Base
+
+class MailOutbox(Base):
+    # EN: Creates MailOutbox table: mailer notifications written in the same
+    # transaction as the observation, delivered later by the outbox worker
+    # BR: Cria tabela 'MailOutbox': notificações gravadas na mesma transação da
+    # observação e entregues depois pelo worker da outbox
+    __tablename__ = "MailOutbox"
+    __table_args__ = (
+        Index("ix_MailOutbox_Status_Next_Attempt", "Status", "Next_Attempt_At"),
+    )
+    Outbox_ID = Column(Integer, primary_key=True, autoincrement=True)
+    Observation_ID = Column(Integer, nullable=False, index=True)
+    Idempotency_Key = Column(String(128), unique=True)
+    Payload = Column(Text, nullable=False)
+    # EN: pending | sent | failed / BR: pendente | enviado | falhou
+    Status = Column(String(16), nullable=False, default="pending")
+    Attempts = Column(Integer, nullable=False, default=0)
+    Next_Attempt_At = Column(DateTime, nullable=False, server_default=func.now())
+    Locked_Until = Column(DateTime)
+    Claim_Token = Column(String(32), index=True)
+    Created_At = Column(DateTime, nullable=False, server_default=func.now())
+    Sent_At = Column(DateTime)
+    Last_Error = Column(String(500))
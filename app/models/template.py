@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, Boolean
+from app.database import Base
+
+class Template(Base):
+    # EN: Creates Templates table: named PDF layouts, each pointing at a Jinja2
+    # file in app/templates; the Is_Default row is used when none is asked for
+    # BR: Cria tabela 'Templates': layouts de PDF nomeados, cada um apontando para
+    # um arquivo Jinja2 em app/templates; a linha Is_Default é usada quando nenhum é pedido
+    __tablename__ = "Templates"
+    Template_ID = Column(Integer, primary_key=True, autoincrement=True)
+    Template_Name = Column(String(64), unique=True, nullable=False)
+    Template_File = Column(String(128), nullable=False)
+    Is_Default = Column(Boolean, nullable=False, default=False)
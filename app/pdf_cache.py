@@ -0,0 +1,104 @@
+import os
+import hashlib
+import pathlib
+import tempfile
+import time
+from typing import Optional
+
+# EN: Rendered-PDF cache settings (0 bytes disables the cache)
+# BR: Configuração do cache de PDFs renderizados (0 bytes desativa o cache)
+PDF_CACHE_DIR = os.getenv("PDF_CACHE_DIR", "./pdf_cache")
+PDF_CACHE_MAX_BYTES = int(os.getenv("PDF_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+def html_key(html: str) -> str:
+    """EN: Content address of the generated HTML / BR: Endereço de conteúdo do HTML gerado"""
+    return hashlib.sha256(html.encode("utf-8")).hexdigest()
+
+
+class PdfCache:
+    """EN: On-disk PDF cache keyed by HTML hash. Files are named
+    "<observation_id>-<key>.pdf" so one observation's entries can be dropped at
+    once. mtime is the render time (served as Last-Modified) and never moves after
+    put(); atime is the LRU clock, set explicitly on each hit so noatime/relatime
+    mounts do not matter.
+    BR: Cache de PDFs em disco, indexado pelo hash do HTML. Arquivos se chamam
+    "<observation_id>-<key>.pdf" para apagar as entradas de uma observação de uma
+    vez. O mtime é o horário da renderização (servido como Last-Modified) e não muda
+    depois do put(); o atime é o relógio LRU, definido explicitamente a cada acerto."""
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = pathlib.Path(directory)
+        self.max_bytes = max_bytes
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _path(self, observation_id: int, key: str) -> pathlib.Path:
+        return self.directory / f"{observation_id}-{key}.pdf"
+
+    def get(self, observation_id: int, key: str) -> Optional[bytes]:
+        """EN: Cached bytes or None; a hit refreshes the LRU clock (atime) only
+        BR: Bytes do cache ou None; um acerto renova só o relógio LRU (atime)"""
+        if not self.enabled:
+            return None
+        path = self._path(observation_id, key)
+        try:
+            data = path.read_bytes()
+            os.utime(path, (time.time(), path.stat().st_mtime))
+        except FileNotFoundError:
+            return None
+        return data
+
+    def last_modified(self, observation_id: int, key: str) -> Optional[float]:
+        """EN: When this version was rendered / BR: Quando esta versão foi renderizada"""
+        try:
+            return self._path(observation_id, key).stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    def put(self, observation_id: int, key: str, data: bytes) -> None:
+        """EN: Atomic write (temp file + rename), then evict down to the size bound
+        BR: Escrita atômica (arquivo temporário + rename), depois despeja até o limite"""
+        if not self.enabled or len(data) > self.max_bytes:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, self._path(observation_id, key))
+        except BaseException:
+            pathlib.Path(tmp).unlink(missing_ok=True)
+            raise
+        self._evict()
+
+    def invalidate(self, observation_id: int) -> None:
+        """EN: Drop every cached version of an observation / BR: Remover todas as versões de uma observação"""
+        if not self.directory.is_dir():
+            return
+        for path in self.directory.glob(f"{observation_id}-*.pdf"):
+            path.unlink(missing_ok=True)
+
+    def _evict(self) -> None:
+        """EN: Least recently used first / BR: Menos usados recentemente primeiro"""
+        entries = []
+        total = 0
+        for path in self.directory.glob("*.pdf"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_atime, st.st_size, path))
+            total += st.st_size
+        if total <= self.max_bytes:
+            return
+        for _atime, size, path in sorted(entries, key=lambda e: e[0]):
+            path.unlink(missing_ok=True)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+pdf_cache = PdfCache(PDF_CACHE_DIR, PDF_CACHE_MAX_BYTES)
@@ -0,0 +1,92 @@
+"""EN: Precompiled Jinja2 templates for the PDF HTML.
+
+Every *.html file in PDF_TEMPLATE_DIR is compiled once at startup into an
+in-memory registry. auto_reload is off, so rendering never stats the file.
+Autoescaping is on for .html: feedback text is user input. The output depends
+only on the observation, never on clocks or randomness, because its SHA-256 is
+the PDF cache key and the ETag. Template records (models.Template) map a name
+to a file here.
+
+BR: Templates Jinja2 pré-compilados para o HTML dos PDFs. Cada *.html de
+PDF_TEMPLATE_DIR é compilado uma vez na inicialização; sem auto_reload, com
+autoescape (o feedback é entrada do usuário). A saída depende só da observação,
+pois seu SHA-256 é a chave do cache de PDF e o ETag.
+"""
+import os
+import logging
+import pathlib
+import threading
+from typing import Dict
+
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, TemplateNotFound, select_autoescape
+from jinja2 import Template as CompiledTemplate
+
+logger = logging.getLogger("focused.pdf_templates")
+
+PDF_TEMPLATE_DIR = os.getenv("PDF_TEMPLATE_DIR", str(pathlib.Path(__file__).resolve().parent / "templates"))
+
+# EN: Used when no Templates row is marked default / BR: Usado quando nenhuma linha de Templates é padrão
+DEFAULT_TEMPLATE_FILE = "observation.html"
+
+
+def observation_context(observation) -> dict:
+    """EN: Template variables from an Observation with teacher/focus loaded
+    BR: Variáveis do template a partir de uma Observation com professor/foco carregados"""
+    teacher = getattr(observation, "teacher", None)
+    focus = getattr(observation, "focus", None)
+    return {
+        "teacher": f"{getattr(teacher, 'User_Forename', '')} {getattr(teacher, 'User_Surname', '')}".strip(),
+        "date": str(observation.Observation_Date) if observation.Observation_Date is not None else None,
+        "class_name": observation.Observation_Class,
+        "focus": getattr(focus, "FocusArea_Name", None) or str(observation.Observation_Focus),
+        "strengths": observation.Observation_Strengths,
+        "weaknesses": observation.Observation_Weaknesses,
+        "comments": observation.Observation_Comments,
+    }
+
+
+class TemplateRegistry:
+    """EN: File name -> compiled template, filled by load() and read without locking
+    BR: Nome do arquivo -> template compilado, preenchido por load() e lido sem lock"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._env = Environment(
+            loader=FileSystemLoader(directory),
+            autoescape=select_autoescape(("html",)),
+            auto_reload=False,
+            undefined=StrictUndefined,
+        )
+        self._lock = threading.Lock()
+        self._compiled: Dict[str, CompiledTemplate] = {}
+
+    def load(self) -> int:
+        """EN: Compile every .html template; returns how many / BR: Compila todos os templates .html; retorna quantos"""
+        compiled = {name: self._env.get_template(name) for name in self._env.list_templates(extensions=("html",))}
+        with self._lock:
+            self._compiled = compiled
+        logger.info("pdf templates compiled", extra={"count": len(compiled), "directory": self.directory})
+        return len(compiled)
+
+    def exists(self, name: str) -> bool:
+        try:
+            self.get(name)
+        except TemplateNotFound:
+            return False
+        return True
+
+    def get(self, name: str) -> CompiledTemplate:
+        """EN: Compiled template; compiles on first use when load() has not run (scripts, benchmarks)
+        BR: Template compilado; compila no primeiro uso quando load() não rodou (scripts, benchmarks)"""
+        template = self._compiled.get(name)
+        if template is None:
+            template = self._env.get_template(name)
+            with self._lock:
+                self._compiled = {**self._compiled, name: template}
+        return template
+
+    def render(self, name: str, observation) -> str:
+        return self.get(name).render(observation_context(observation))
+
+
+pdf_templates = TemplateRegistry(PDF_TEMPLATE_DIR)
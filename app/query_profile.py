@@ -0,0 +1,214 @@
+"""EN: Opt-in SQL profiling: repeated-statement (N+1) and slow-query detection.
+
+Every statement is reduced to a fingerprint (literals and IN-lists collapsed),
+so a loop of `SELECT ... WHERE id = ?` lookups shows up as one shape run N
+times. With QUERY_PROFILE=1 the app wraps each request in a profile, logs a
+warning for requests that repeat a shape QUERY_PROFILE_REPEAT_THRESHOLD+ times
+or run a statement slower than QUERY_PROFILE_SLOW_MS, and aggregates the
+findings per route at GET /debug/queries. `profile()` (this context only) and
+`collect()` (whole process) are also used by the test-suite plugin in
+`tests/query_budget.py`.
+
+BR: Perfil de SQL opcional: detecção de consultas repetidas (N+1) e lentas.
+Cada consulta vira uma "impressão digital" (literais e listas IN colapsados);
+com QUERY_PROFILE=1 cada requisição é perfilada, avisos vão para o log e os
+achados são agregados por rota em GET /debug/queries.
+"""
+import os
+import re
+import time
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .metrics import route_label
+
+logger = logging.getLogger("focused.queries")
+
+QUERY_PROFILE = os.getenv("QUERY_PROFILE", "0").lower() in ("1", "true", "on", "yes")
+QUERY_PROFILE_SLOW_MS = float(os.getenv("QUERY_PROFILE_SLOW_MS", "100"))
+QUERY_PROFILE_REPEAT_THRESHOLD = int(os.getenv("QUERY_PROFILE_REPEAT_THRESHOLD", "3"))
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w\"])-?\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_POSTCOMPILE = re.compile(r"\(?__\[POSTCOMPILE_\w+\]\)?")
+_SPACE = re.compile(r"\s+")
+
+
+def fingerprint(statement: str) -> str:
+    """EN: Statement shape: same SQL with different values -> same string
+    BR: Forma da consulta: mesmo SQL com valores diferentes -> mesma string"""
+    shape = _STRING.sub("?", statement)
+    shape = _NUMBER.sub("?", shape)
+    shape = _POSTCOMPILE.sub("(?)", shape)
+    shape = _IN_LIST.sub("(?)", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+
+class QueryProfile:
+    """EN: Statements seen in one scope, grouped by fingerprint / BR: Consultas de um escopo, agrupadas por forma"""
+
+    def __init__(self, slow_ms: float = QUERY_PROFILE_SLOW_MS):
+        self.slow_ms = slow_ms
+        self.queries = 0
+        self.seconds = 0.0
+        # EN: fingerprint -> [count, total seconds] / BR: forma -> [contagem, segundos no total]
+        self.statements: Dict[str, List[float]] = {}
+        self.slow: List[Tuple[str, float]] = []
+        self._lock = threading.Lock()
+
+    def record(self, statement: str, elapsed: float) -> None:
+        shape = fingerprint(statement)
+        with self._lock:
+            entry = self.statements.setdefault(shape, [0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+            self.queries += 1
+            self.seconds += elapsed
+            if elapsed * 1000 >= self.slow_ms:
+                self.slow.append((shape, elapsed))
+
+    def repeated(self, threshold: int = QUERY_PROFILE_REPEAT_THRESHOLD) -> List[Tuple[str, int]]:
+        """EN: Shapes run at least `threshold` times, most repeated first
+        BR: Formas executadas pelo menos `threshold` vezes, mais repetidas primeiro"""
+        hits = [(shape, int(entry[0])) for shape, entry in self.statements.items() if entry[0] >= threshold]
+        return sorted(hits, key=lambda hit: -hit[1])
+
+    def describe(self, limit: int = 10) -> str:
+        """EN: Human-readable summary for logs and test failures / BR: Resumo legível para logs e falhas de teste"""
+        lines = [f"{self.queries} statement(s), {self.seconds * 1000:.1f} ms"]
+        top = sorted(self.statements.items(), key=lambda item: (-item[1][0], -item[1][1]))[:limit]
+        for shape, (count, seconds) in top:
+            lines.append(f"  {int(count):>4}x {seconds * 1000:>8.1f} ms  {shape}")
+        return "\n".join(lines)
+
+
+_current: contextvars.ContextVar[Optional[QueryProfile]] = contextvars.ContextVar("query_profile", default=None)
+_collectors: List[QueryProfile] = []
+_collectors_lock = threading.Lock()
+
+
+@contextmanager
+def profile(slow_ms: float = QUERY_PROFILE_SLOW_MS) -> Iterator[QueryProfile]:
+    """EN: Profile statements run in this context (threadpool/run_sync copies included)
+    BR: Perfila as consultas deste contexto (inclusive cópias no threadpool/run_sync)"""
+    current = QueryProfile(slow_ms)
+    token = _current.set(current)
+    try:
+        yield current
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def collect(slow_ms: float = QUERY_PROFILE_SLOW_MS) -> Iterator[QueryProfile]:
+    """EN: Profile every statement in the process, whatever thread or event loop
+    runs it (e.g. a TestClient portal thread)
+    BR: Perfila toda consulta do processo, seja qual for a thread ou o event loop"""
+    current = QueryProfile(slow_ms)
+    with _collectors_lock:
+        _collectors.append(current)
+    try:
+        yield current
+    finally:
+        with _collectors_lock:
+            _collectors.remove(current)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _profile_start(conn, _cursor, _statement, _parameters, _context, _executemany):
+    if _current.get() is not None or _collectors:
+        conn.info.setdefault("profile_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _profile_end(conn, _cursor, statement, _parameters, _context, _executemany):
+    starts = conn.info.get("profile_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    current = _current.get()
+    if current is not None:
+        current.record(statement, elapsed)
+    for collector in list(_collectors):
+        collector.record(statement, elapsed)
+
+
+@event.listens_for(Engine, "handle_error")
+def _profile_failed(context):
+    conn = context.connection
+    if conn is not None and conn.info.get("profile_start"):
+        conn.info["profile_start"].pop()
+
+
+# EN: Per-route findings since startup / BR: Achados por rota desde o início
+_routes: Dict[str, dict] = {}
+_routes_lock = threading.Lock()
+
+
+def _record_request(route: str, current: QueryProfile) -> None:
+    repeated = current.repeated()
+    with _routes_lock:
+        stats = _routes.setdefault(route, {"requests": 0, "queries": 0, "max_queries": 0, "repeated": {}, "slow": {}})
+        stats["requests"] += 1
+        stats["queries"] += current.queries
+        stats["max_queries"] = max(stats["max_queries"], current.queries)
+        for shape, count in repeated:
+            hit = stats["repeated"].setdefault(shape, {"requests": 0, "max_count": 0})
+            hit["requests"] += 1
+            hit["max_count"] = max(hit["max_count"], count)
+        for shape, elapsed in current.slow:
+            hit = stats["slow"].setdefault(shape, {"count": 0, "max_ms": 0.0})
+            hit["count"] += 1
+            hit["max_ms"] = max(hit["max_ms"], round(elapsed * 1000, 2))
+
+    if repeated or current.slow:
+        logger.warning(
+            "query profile findings",
+            extra={
+                "route": route,
+                "queries": current.queries,
+                "db_ms": round(current.seconds * 1000, 2),
+                "repeated": [{"count": count, "sql": shape} for shape, count in repeated],
+                "slow": [{"ms": round(elapsed * 1000, 2), "sql": shape} for shape, elapsed in current.slow],
+            },
+        )
+
+
+def report() -> dict:
+    """EN: Routes with findings first, then by queries per request
+    BR: Rotas com achados primeiro, depois por consultas por requisição"""
+    with _routes_lock:
+        routes = {route: dict(stats, repeated=dict(stats["repeated"]), slow=dict(stats["slow"])) for route, stats in _routes.items()}
+    for stats in routes.values():
+        stats["avg_queries"] = round(stats["queries"] / stats["requests"], 2)
+    ordered = sorted(routes.items(), key=lambda item: (not (item[1]["repeated"] or item[1]["slow"]), -item[1]["avg_queries"]))
+    return {
+        "slow_ms": QUERY_PROFILE_SLOW_MS,
+        "repeat_threshold": QUERY_PROFILE_REPEAT_THRESHOLD,
+        "routes": dict(ordered),
+    }
+
+
+class QueryProfileMiddleware:
+    """EN: Profiles each HTTP request (added only when QUERY_PROFILE is on)
+    BR: Perfila cada requisição HTTP (adicionado só com QUERY_PROFILE ligado)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        with profile() as current:
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                _record_request(f'{scope.get("method", "")} {route_label(scope)}', current)
@@ -0,0 +1,161 @@
+import os
+import asyncio
+import hashlib
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy import event, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from .database import Base, engine
+from .models.models import CacheVersion, Department, FlagType, FocusArea, User
+
+logger = logging.getLogger("focused.ref_cache")
+
+# EN: Browser revalidation window for lookup lists (seconds)
+# BR: Janela de revalidação do navegador para listas de consulta (segundos)
+REF_CACHE_MAX_AGE = int(os.getenv("REF_CACHE_MAX_AGE", "60"))
+
+# EN: How often each worker checks the shared version for writes made by other workers
+# BR: Frequência com que cada worker verifica a versão compartilhada (escritas de outros workers)
+REF_CACHE_POLL_INTERVAL = float(os.getenv("REF_CACHE_POLL_INTERVAL", "1"))
+
+# EN: Tables whose writes invalidate the cache / BR: Tabelas cujas escritas invalidam o cache
+_TRACKED = (User, Department, FocusArea, FlagType)
+
+# EN: Shared counter row, bumped by triggers in the writing transaction (any process, any API)
+# BR: Linha do contador compartilhado, incrementada por gatilhos na transação de escrita
+REF_DATA_VERSION = "ref_data"
+_TRIGGERS = [
+    (f"{model.__tablename__}_ref_{suffix}", op, model.__tablename__)
+    for model in _TRACKED
+    for suffix, op in (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE"))
+]
+REF_VERSION_DDL = [
+    f'INSERT OR IGNORE INTO "CacheVersions" ("Name", "Version") VALUES (\'{REF_DATA_VERSION}\', 0)',
+    *(
+        f'CREATE TRIGGER IF NOT EXISTS "{name}" AFTER {op} ON "{table}" BEGIN '
+        f'UPDATE "CacheVersions" SET "Version" = "Version" + 1 WHERE "Name" = \'{REF_DATA_VERSION}\'; END'
+        for name, op, table in _TRIGGERS
+    ),
+]
+REF_VERSION_DROP = [f'DROP TRIGGER IF EXISTS "{name}"' for name, _op, _table in _TRIGGERS]
+
+
+def shared_version() -> Optional[int]:
+    """EN: The cross-process ref-data version (None before migration 0007)
+    BR: A versão dos dados de referência entre processos (None antes da migração 0007)"""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(select(CacheVersion.Version).where(CacheVersion.Name == REF_DATA_VERSION)).scalar()
+    except OperationalError:
+        return None
+
+
+class RefDataCache:
+    """EN: Pre-serialised JSON bytes for the lookup endpoints, tagged with the
+    version counter they were built under. Any committed ORM write to a tracked
+    table bumps the counter, so older entries simply stop matching.
+    BR: Bytes JSON pré-serializados para os endpoints de consulta, marcados com a
+    versão em que foram gerados. Qualquer escrita ORM confirmada numa tabela
+    monitorada incrementa o contador, e entradas antigas deixam de valer.
+
+    EN: Each worker process has its own cache. Writes from other workers are seen
+    by polling the CacheVersions row every REF_CACHE_POLL_INTERVAL seconds.
+    BR: Cada processo worker tem seu próprio cache; escritas de outros workers são
+    vistas consultando a linha de CacheVersions a cada REF_CACHE_POLL_INTERVAL s."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[int, bytes, str]] = {}
+        self.version = 0
+        self._shared: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def bump(self) -> None:
+        with self._lock:
+            self.version += 1
+            self._entries.clear()
+
+    def get(self, name: str) -> Optional[Tuple[bytes, str]]:
+        entry = self._entries.get(name)
+        if entry is None or entry[0] != self.version:
+            return None
+        return entry[1], entry[2]
+
+    def put(self, name: str, version: int, body: bytes) -> Tuple[bytes, str]:
+        """EN: Store bytes built under `version`; a write in between leaves them unstored
+        BR: Guarda bytes gerados sob `version`; uma escrita no meio impede o armazenamento"""
+        etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        with self._lock:
+            if version == self.version:
+                self._entries[name] = (version, body, etag)
+        return body, etag
+
+    def observe(self, shared: Optional[int]) -> None:
+        """EN: Drop entries when the shared version moved / BR: Descartar entradas quando a versão compartilhada mudou"""
+        if shared is None:
+            return
+        if self._shared is not None and shared != self._shared:
+            self.bump()
+        self._shared = shared
+
+    async def start(self) -> None:
+        if self._task is None and REF_CACHE_POLL_INTERVAL > 0:
+            self.observe(await run_in_threadpool(shared_version))
+            self._task = asyncio.create_task(self._watch())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(REF_CACHE_POLL_INTERVAL)
+            try:
+                self.observe(await run_in_threadpool(shared_version))
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("ref-data version check failed")
+
+
+ref_cache = RefDataCache()
+
+
+# EN: Databases built with create_all get the row and triggers too (migration 0007 covers Alembic)
+# BR: Bancos criados com create_all também recebem a linha e os gatilhos (migração 0007 cobre o Alembic)
+@event.listens_for(Base.metadata, "after_create")
+def _create_version_triggers(_target, connection, tables=(), **_kw):
+    if CacheVersion.__table__ in tables and connection.dialect.name == "sqlite":
+        for stmt in REF_VERSION_DDL:
+            connection.exec_driver_sql(stmt)
+
+
+# EN: Flag sessions that flushed tracked rows; bump only once they commit
+# BR: Marcar sessões que gravaram linhas monitoradas; incrementar só após o commit
+@event.listens_for(Session, "after_flush")
+def _track_ref_writes(session, _flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, _TRACKED):
+            session.info["ref_data_dirty"] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session):
+    if session.info.pop("ref_data_dirty", False):
+        ref_cache.bump()
+
+
+@event.listens_for(Session, "after_rollback")
+def _reset_on_rollback(session):
+    session.info.pop("ref_data_dirty", None)
@@ -0,0 +1,249 @@
+import os
+import time
+import asyncio
+import logging
+from collections import deque
+from typing import Optional
+
+import httpx
+
+from . import local_renderer
+from .metrics import (
+    observe_call,
+    renderer_breaker_transitions,
+    renderer_latency,
+    renderer_local_latency,
+    renderer_queue_wait,
+)
+
+logger = logging.getLogger("focused.renderer")
+
+# EN: Renderer service settings / BR: Configuração do serviço renderer
+RENDERER_URL = os.getenv("RENDERER_URL", "http://renderer:8002")
+RENDERER_TIMEOUT = float(os.getenv("RENDERER_TIMEOUT", "15"))
+RENDERER_MAX_CONNECTIONS = int(os.getenv("RENDERER_MAX_CONNECTIONS", "20"))
+RENDERER_MAX_KEEPALIVE = int(os.getenv("RENDERER_MAX_KEEPALIVE", "10"))
+RENDERER_KEEPALIVE_EXPIRY = float(os.getenv("RENDERER_KEEPALIVE_EXPIRY", "30"))
+
+# EN: In-flight render cap; extra callers queue up to RENDERER_QUEUE_TIMEOUT seconds
+# BR: Limite de renderizações simultâneas; o excedente espera até RENDERER_QUEUE_TIMEOUT segundos
+RENDERER_MAX_CONCURRENCY = int(os.getenv("RENDERER_MAX_CONCURRENCY", "8"))
+RENDERER_QUEUE_TIMEOUT = float(os.getenv("RENDERER_QUEUE_TIMEOUT", "30"))
+
+# EN: Circuit breaker in front of the remote renderer; only used with LOCAL_RENDERER=fallback.
+# A remote call slower than RENDERER_BREAKER_SLOW_SECONDS is abandoned and counts as a failure.
+# BR: Disjuntor na frente do renderer remoto; só usado com LOCAL_RENDERER=fallback. Uma chamada
+# remota mais lenta que RENDERER_BREAKER_SLOW_SECONDS é abandonada e conta como falha.
+RENDERER_BREAKER_WINDOW = int(os.getenv("RENDERER_BREAKER_WINDOW", "20"))
+RENDERER_BREAKER_MIN_CALLS = int(os.getenv("RENDERER_BREAKER_MIN_CALLS", "5"))
+RENDERER_BREAKER_ERROR_RATE = float(os.getenv("RENDERER_BREAKER_ERROR_RATE", "0.5"))
+RENDERER_BREAKER_SLOW_SECONDS = float(os.getenv("RENDERER_BREAKER_SLOW_SECONDS", "5"))
+RENDERER_BREAKER_COOLDOWN = float(os.getenv("RENDERER_BREAKER_COOLDOWN", "30"))
+LOCAL_RENDERER_TIMEOUT = float(os.getenv("LOCAL_RENDERER_TIMEOUT", "60"))
+
+
+class RendererError(Exception):
+    """EN: Renderer failed or returned something unusable / BR: Renderer falhou ou retornou algo inválido"""
+
+
+class RendererBusy(RendererError):
+    """EN: Waited too long for a render slot / BR: Esperou demais por uma vaga de renderização"""
+
+
+class CircuitBreaker:
+    """EN: closed -> open when, over the last `window` remote calls (at least `min_calls`),
+    the share of failures reaches `error_rate`. After `cooldown` seconds it is half-open:
+    one probe at a time goes remote; a success closes it, a failure reopens it. While
+    open, renders skip the remote call. Used from the event loop only, so no locking.
+    BR: closed -> open quando, nas últimas `window` chamadas remotas (no mínimo
+    `min_calls`), a fração de falhas chega a `error_rate`. Após `cooldown` segundos fica
+    half-open: uma sonda por vez vai ao remoto; sucesso fecha, falha reabre."""
+
+    def __init__(self, window: int, min_calls: int, error_rate: float, cooldown: float):
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.cooldown = cooldown
+        self.state = "closed"
+        self._results: deque = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probing = False
+
+    def _set(self, state: str) -> None:
+        self.state = state
+        renderer_breaker_transitions.inc(state)
+        if state == "open":
+            self._opened_at = time.monotonic()
+            logger.warning("renderer circuit open; rendering locally", extra={"cooldown_s": self.cooldown})
+        elif state == "half_open":
+            logger.info("renderer circuit half-open; probing the renderer")
+        else:
+            logger.info("renderer circuit closed")
+
+    def allow(self) -> Optional[str]:
+        """EN: "call" or "probe" when the remote may be used, None otherwise
+        BR: "call" ou "probe" quando o remoto pode ser usado, None caso contrário"""
+        if self.state == "closed":
+            return "call"
+        if self.state == "open":
+            if time.monotonic() - self._opened_at < self.cooldown:
+                return None
+            self._set("half_open")
+        if self._probing:
+            return None
+        self._probing = True
+        return "probe"
+
+    def record(self, ticket: str, ok: Optional[bool]) -> None:
+        """EN: Outcome of a call allowed by allow(); None = no verdict (cancelled)
+        BR: Resultado de uma chamada liberada por allow(); None = sem veredito (cancelada)"""
+        if ticket == "probe":
+            self._probing = False
+            if ok is True:
+                self._results.clear()
+                self._set("closed")
+            elif ok is False:
+                self._set("open")
+            return
+        # EN: Calls that started before the breaker opened / BR: Chamadas iniciadas antes de abrir
+        if ok is None or self.state != "closed":
+            return
+        self._results.append(ok)
+        failures = len(self._results) - sum(self._results)
+        if len(self._results) >= self.min_calls and failures / len(self._results) >= self.error_rate:
+            self._set("open")
+
+
+breaker = CircuitBreaker(
+    RENDERER_BREAKER_WINDOW, RENDERER_BREAKER_MIN_CALLS, RENDERER_BREAKER_ERROR_RATE, RENDERER_BREAKER_COOLDOWN,
+)
+
+_client: Optional[httpx.AsyncClient] = None
+_slots: Optional[asyncio.Semaphore] = None
+_local_slots: Optional[asyncio.Semaphore] = None
+
+
+def _new_client() -> httpx.AsyncClient:
+    limits = httpx.Limits(
+        max_connections=RENDERER_MAX_CONNECTIONS,
+        max_keepalive_connections=RENDERER_MAX_KEEPALIVE,
+        keepalive_expiry=RENDERER_KEEPALIVE_EXPIRY,
+    )
+    return httpx.AsyncClient(base_url=RENDERER_URL, timeout=RENDERER_TIMEOUT, limits=limits)
+
+
+async def start() -> None:
+    """EN: Create the app-lifetime client and, if enabled, the local pool (startup)
+    BR: Criar o cliente da vida da app e, se habilitado, o pool local (startup)"""
+    global _client, _slots, _local_slots
+    if _client is None:
+        _client = _new_client()
+    if _slots is None:
+        _slots = asyncio.Semaphore(RENDERER_MAX_CONCURRENCY)
+    await local_renderer.start()
+    if _local_slots is None:
+        _local_slots = asyncio.Semaphore(local_renderer.LOCAL_RENDERER_WORKERS)
+
+
+async def stop() -> None:
+    """EN: Close pooled connections and the local pool (shutdown) / BR: Fechar conexões do pool e o pool local (shutdown)"""
+    global _client, _slots, _local_slots
+    if _client is not None:
+        await _client.aclose()
+    await local_renderer.stop()
+    _client = None
+    _slots = None
+    _local_slots = None
+
+
+async def render_pdf(html: str) -> bytes:
+    """EN: PDF bytes from the renderer service; with the local fallback enabled, from the
+    process pool when the breaker is open or the remote call fails or is too slow
+    BR: Bytes do PDF pelo serviço renderer; com a alternativa local habilitada, pelo pool
+    de processos quando o disjuntor está aberto ou a chamada remota falha ou demora demais"""
+    if _client is None:
+        # EN: Scripts/tests that skip startup / BR: Scripts/testes que pulam o startup
+        await start()
+    if not local_renderer.enabled():
+        return await _render_remote(html)
+
+    ticket = breaker.allow()
+    if ticket is not None:
+        ok = None
+        try:
+            pdf = await _render_remote(html, slow_after=RENDERER_BREAKER_SLOW_SECONDS or None)
+            ok = True
+            return pdf
+        except RendererBusy:
+            # EN: Our own queue limit, not the renderer's health: no verdict
+            # BR: Nosso próprio limite de fila, não a saúde do renderer: sem veredito
+            raise
+        except RendererError as e:
+            ok = False
+            logger.warning("remote render failed; rendering locally", extra={"error": str(e), "breaker": breaker.state})
+        finally:
+            breaker.record(ticket, ok)
+    return await _render_local(html)
+
+
+async def _render_local(html: str) -> bytes:
+    """EN: Render in the process pool; the slot is held until the process is done, even
+    if we stop waiting, so at most LOCAL_RENDERER_WORKERS renders ever run
+    BR: Renderizar no pool de processos; a vaga fica ocupada até o processo terminar,
+    mesmo se pararmos de esperar"""
+    waited = time.perf_counter()
+    slots = _local_slots
+    try:
+        await asyncio.wait_for(slots.acquire(), timeout=RENDERER_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        renderer_local_latency.observe(time.perf_counter() - waited, "busy")
+        raise RendererBusy(f"No local render slot free after {RENDERER_QUEUE_TIMEOUT:g}s")
+
+    loop = asyncio.get_running_loop()
+    with observe_call(renderer_local_latency) as call:
+        try:
+            future = local_renderer.submit(html)
+        except BaseException:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(slots.release))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), LOCAL_RENDERER_TIMEOUT)
+        except asyncio.TimeoutError as e:
+            call["outcome"] = "timeout"
+            raise RendererError(f"Local render timed out after {LOCAL_RENDERER_TIMEOUT:g}s") from e
+        except Exception as e:
+            raise RendererError(f"Local render failed: {e}") from e
+
+
+async def _render_remote(html: str, slow_after: Optional[float] = None) -> bytes:
+    """EN: POST the HTML to the renderer and return PDF bytes. slow_after bounds the call
+    itself, timed from when a slot is free, so local queueing never counts as slowness.
+    BR: Enviar o HTML ao renderer e retornar os bytes do PDF. slow_after limita a chamada
+    em si, contada a partir da vaga livre, então a fila local nunca conta como lentidão."""
+    waited = time.perf_counter()
+    try:
+        await asyncio.wait_for(_slots.acquire(), timeout=RENDERER_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        renderer_latency.observe(time.perf_counter() - waited, "busy")
+        raise RendererBusy(f"No render slot free after {RENDERER_QUEUE_TIMEOUT:g}s")
+    renderer_queue_wait.observe(time.perf_counter() - waited)
+
+    with observe_call(renderer_latency) as call:
+        try:
+            r = await asyncio.wait_for(_client.post("/render", json={"html": html}), slow_after)
+        except asyncio.TimeoutError as e:
+            call["outcome"] = "slow"
+            raise RendererError(f"Renderer slower than {slow_after:g}s") from e
+        except httpx.RequestError as e:
+            call["outcome"] = "unreachable"
+            raise RendererError(f"Renderer unreachable: {e}") from e
+        finally:
+            _slots.release()
+
+        if r.status_code != 200:
+            raise RendererError(f"Renderer error (status {r.status_code})")
+
+        ctype = r.headers.get("content-type", "").lower()
+        if "application/pdf" not in ctype:
+            raise RendererError(f"Renderer returned non-PDF (content-type {ctype})")
+        return r.content
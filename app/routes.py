@@ -1,17 +1,31 @@
 # EN: Load .env early once / BR: Carregar .env cedo e uma única vez
+import io
 import os
-import httpx
+import csv
+import json
+import time
+import base64
+import asyncio
+import hashlib
+import logging
+import zipfile
+import tempfile
+
+from datetime import date, datetime, timezone
+from email.utils import formatdate
 
 from io import BytesIO
-from typing import List, Optional
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, Query, BackgroundTasks, Request, status, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, Response
 from fastapi.responses import StreamingResponse
-from sqlalchemy import desc
+from pydantic import TypeAdapter
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import Integer, String, and_, desc, false, literal, or_, select, true, tuple_, type_coerce
 from sqlalchemy.orm import Session, joinedload
 
-from .models.models import Observation, User, Department, FocusArea
-from .database import get_db
+from .models.models import Observation, User, Department, FocusArea, Flag, FlagType, Template
+from .database import DBSession, SessionLocal, get_session, run_db
 from .schemas import (
     Create_Observation,
     Observations_List,
@@ -19,11 +33,41 @@ from .schemas import (
     Update_Observation,
     Departments_List,
     FocusAreas_List,
+    FlagTypes_List,
+    Create_Flag,
+    Update_Flag,
+    Flags_List,
+    Weekly_Count,
+    Teacher_Coverage,
 )
-from .mailer_client import notify_observation
+from .mailer_client import enqueue_observation_email, outbox_worker
+from .metrics import pdf_requests
+from .pdf_cache import html_key, pdf_cache
+from .pdf_templates import DEFAULT_TEMPLATE_FILE, pdf_templates
+from .ref_cache import REF_CACHE_MAX_AGE, ref_cache
+from .search import fts, fts_match, fts_rank, fts_snippet, highlight
+from . import analytics, importer, renderer
+from .renderer import RendererBusy, RendererError
 
 router = APIRouter()
-RENDERER_URL = os.getenv("RENDERER_URL", "http://renderer:8002")
+logger = logging.getLogger("focused.routes")
+
+# EN: List paging / streaming sizes / BR: Tamanhos de página / streaming da listagem
+OBSERVATIONS_PAGE_SIZE = int(os.getenv("OBSERVATIONS_PAGE_SIZE", "100"))
+OBSERVATIONS_MAX_PAGE_SIZE = int(os.getenv("OBSERVATIONS_MAX_PAGE_SIZE", "1000"))
+FLAGS_PAGE_SIZE = int(os.getenv("FLAGS_PAGE_SIZE", "100"))
+STREAM_BATCH_SIZE = int(os.getenv("STREAM_BATCH_SIZE", "500"))
+
+# EN: Opt-in: validate + serialise response models in one pydantic-core pass straight to bytes
+# BR: Opcional: validar + serializar os modelos de resposta numa passada do pydantic-core direto para bytes
+FAST_JSON = os.getenv("FAST_JSON", "0").lower() in ("1", "true", "on", "yes")
+
+# EN: Renders in flight per bulk export / BR: Renderizações simultâneas por exportação em massa
+BULK_EXPORT_PARALLELISM = int(os.getenv("BULK_EXPORT_PARALLELISM", "4"))
+
+# EN: Concurrent requests for the same PDF version share one render (per process)
+# BR: Requisições simultâneas pela mesma versão do PDF compartilham uma renderização (por processo)
+PDF_COALESCE = os.getenv("PDF_COALESCE", "1").lower() in ("1", "true", "on", "yes")
 
 
 # EN: ---- Helpers (internal) ---- / BR: ---- Auxiliares (internos) ----
@@ -65,34 +109,14 @@ def _build_mail_payload(request: Request, obs: Observation, teacher: Optional[Us
     }
 
 
-def _queue_email(bg: Optional[BackgroundTasks], payload: dict) -> None:
-    """EN: Queue mailer via BackgroundTasks or run sync as fallback / BR: Enfileirar mailer via BackgroundTasks ou executar síncrono"""
-    if bg is not None:
-        bg.add_task(notify_observation, payload)
-    else:
-        # EN: Fallback (blocking) / BR: Alternativa (bloqueante)
-        notify_observation(payload)
+# EN: ---- Observations: keyset pagination helpers ---- / BR: ---- Observações: auxiliares de paginação por chave ----
+# EN: Raw stored text of the date, so cursors compare exactly like SQLite does
+# BR: Texto bruto da data armazenada, para que cursores comparem como o SQLite
+_RAW_OBSERVATION_DATE = type_coerce(Observation.Observation_Date, String)
 
 
-# EN: ---- Observations: list with optional filters ---- / BR: ---- Observações: listar com filtros opcionais ----
-@router.get("/observations", response_model=List[Observations_List])
-def fetch_observations(
-    teacher_id: Optional[int] = Query(None, ge=1),
-    department_id: Optional[int] = Query(None, ge=1),
-    focus_area_id: Optional[int] = Query(None, ge=1),
-    db: Session = Depends(get_db),
-):
-    # EN: Base query with joins / BR: Consulta base com joins
-    q = (
-        db.query(Observation)
-        .options(
-            joinedload(Observation.teacher),
-            joinedload(Observation.department),
-            joinedload(Observation.focus),
-        )
-    )
-
-    # EN: Allows observations to be filtered / BR: Permite filtrar as observações
+def _observation_filters(teacher_id: Optional[int], department_id: Optional[int], focus_area_id: Optional[int]) -> list:
+    """EN: Shared list filters / BR: Filtros compartilhados da listagem"""
     filters = []
     if teacher_id is not None:
         filters.append(Observation.Observation_Teacher == teacher_id)
@@ -100,128 +124,404 @@ def fetch_observations(
         filters.append(Observation.Observation_Department == department_id)
     if focus_area_id is not None:
         filters.append(Observation.Observation_Focus == focus_area_id)
+    return filters
+
+
+def _encode_cursor(sort_key, observation_id: int) -> str:
+    """EN: Opaque cursor for (date or rank, id) / BR: Cursor opaco para (data ou relevância, id)"""
+    raw = json.dumps([sort_key, observation_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str, key_type=str) -> tuple:
+    """EN: Parse a cursor or fail with 400 / BR: Ler cursor ou falhar com 400"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        sort_key, observation_id = json.loads(base64.urlsafe_b64decode(padded))
+        return key_type(sort_key), int(observation_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+# EN: Only what Observations_List returns, labelled as its fields; no feedback columns, no ORM entities
+# BR: Só o que Observations_List retorna, com os nomes dos campos; sem colunas de feedback nem entidades ORM
+_LIST_COLUMNS = (
+    Observation.Observation_ID,
+    Observation.Observation_Date,
+    User.User_Forename.label("Teacher_Forename"),
+    User.User_Surname.label("Teacher_Surname"),
+    Observation.Observation_Class,
+    Department.Department_Name.label("Observation_Department"),
+    FocusArea.FocusArea_Name.label("Observation_Focus"),
+)
+
+
+def _list_select(*extra):
+    """EN: List columns (+ extras) with the three lookups outer-joined
+    BR: Colunas da listagem (+ extras) com as três consultas em outer join"""
+    return (
+        select(*_LIST_COLUMNS, *extra)
+        .outerjoin(User, User.User_ID == Observation.Observation_Teacher)
+        .outerjoin(Department, Department.Department_ID == Observation.Observation_Department)
+        .outerjoin(FocusArea, FocusArea.FocusArea_ID == Observation.Observation_Focus)
+    )
+
+
+def _observation_list_query(filters: list, after: Optional[Tuple[str, int]]):
+    """EN: Filtered query in keyset order (newest first) / BR: Consulta filtrada em ordem de chave (mais recentes primeiro)"""
+    q = _list_select(_RAW_OBSERVATION_DATE.label("Raw_Date"))
     if filters:
-        q = q.filter(*filters)
+        q = q.where(*filters)
+    if after is not None:
+        raw_date, observation_id = after
+        q = q.where(
+            tuple_(Observation.Observation_Date, Observation.Observation_ID)
+            < tuple_(literal(raw_date, String), literal(observation_id, Integer))
+        )
+    return q.order_by(desc(Observation.Observation_Date), desc(Observation.Observation_ID))
 
-    observations = q.order_by(desc(Observation.Observation_Date)).all()
 
-    # EN: Return empty list if none / BR: Retorna lista vazia se não houver
-    if not observations:
-        return []
-
-    # EN: Map to response schema (defensive) / BR: Mapear para o schema de resposta (defensivo)
-    out: List[Observations_List] = []
-    for ob in observations:
-        teacher = getattr(ob, "teacher", None)
-        dept = getattr(ob, "department", None)
-        foc = getattr(ob, "focus", None)
-        out.append(
-            Observations_List(
-                Observation_ID=ob.Observation_ID,
-                Observation_Date=ob.Observation_Date,
-                Teacher_Forename=getattr(teacher, "User_Forename", None),
-                Teacher_Surname=getattr(teacher, "User_Surname", None),
-                Observation_Class=ob.Observation_Class,
-                Observation_Department=getattr(dept, "Department_Name", None),
-                Observation_Focus=getattr(foc, "FocusArea_Name", None),
-            )
+def _search_query(text: str, filters: list, after: Optional[Tuple[float, int]]):
+    """EN: Full-text matches, most relevant first, keyset on (rank, id)
+    BR: Resultados de texto completo, mais relevantes primeiro, chave (relevância, id)"""
+    q = (
+        _list_select(fts_rank.label("Rank"), fts_snippet.label("Snippet"))
+        .join(fts, fts.c.rowid == Observation.Observation_ID)
+        .where(fts_match(text))
+    )
+    if filters:
+        q = q.where(*filters)
+    if after is not None:
+        rank, observation_id = after
+        q = q.where(or_(fts_rank > rank, and_(fts_rank == rank, Observation.Observation_ID < observation_id)))
+    return q.order_by(fts_rank, desc(Observation.Observation_ID))
+
+
+def _list_item(row) -> dict:
+    """EN: Response dict straight from a projected row / BR: Dict de resposta direto da linha projetada"""
+    item = {
+        "Observation_ID": row.Observation_ID,
+        "Observation_Date": row.Observation_Date,
+        "Teacher_Forename": row.Teacher_Forename,
+        "Teacher_Surname": row.Teacher_Surname,
+        "Observation_Class": row.Observation_Class,
+        "Observation_Department": row.Observation_Department,
+        "Observation_Focus": row.Observation_Focus,
+    }
+    # EN: Only search results carry a snippet (absent keys are left out of the JSON)
+    # BR: Só resultados de busca têm trecho (chaves ausentes ficam fora do JSON)
+    snippet = getattr(row, "Snippet", None)
+    if snippet is not None:
+        item["Snippet"] = highlight(snippet)
+    return item
+
+
+def _load_observation(db: Session, observation_id: int, relations: bool = True) -> Optional[Observation]:
+    """EN: One observation, optionally with teacher/department/focus joined
+    BR: Uma observação, opcionalmente com professor/departamento/foco"""
+    q = db.query(Observation)
+    if relations:
+        q = q.options(
+            joinedload(Observation.teacher),
+            joinedload(Observation.department),
+            joinedload(Observation.focus),
         )
-    return out
+    return q.filter(Observation.Observation_ID == observation_id).first()
+
+
+def _with_session(fn, *args):
+    """EN: Run fn(session, *args) on a short-lived session, for work that outlives
+    the request session (streamed bodies).
+    BR: Executa fn(sessão, *args) numa sessão curta, para trabalho que dura mais que a
+    sessão da requisição (corpos transmitidos)."""
+    db = SessionLocal()
+    try:
+        return fn(db, *args)
+    finally:
+        db.close()
+
+
+def _json_line(item: dict) -> str:
+    """EN: Compact UTF-8 JSON like Pydantic's, one line / BR: JSON compacto em UTF-8 como o do Pydantic, uma linha"""
+    return json.dumps(item, separators=(",", ":"), ensure_ascii=False, default=datetime.isoformat) + "\n"
+
+
+# EN: One adapter per response model, built once / BR: Um adapter por modelo de resposta, criado uma vez
+_OBSERVATIONS_JSON = TypeAdapter(List[Observations_List])
+_FLAGS_JSON = TypeAdapter(List[Flags_List])
+_FLAG_JSON = TypeAdapter(Flags_List)
+_WEEKLY_JSON = TypeAdapter(List[Weekly_Count])
+_COVERAGE_JSON = TypeAdapter(List[Teacher_Coverage])
+
+
+def _model_response(adapter: TypeAdapter, content, response: Optional[Response] = None, exclude_unset: bool = False):
+    """EN: With FAST_JSON, validate once and dump straight to JSON bytes, skipping FastAPI's
+    response_model re-validation and jsonable_encoder walk; otherwise return content as is.
+    Headers set on the injected response (e.g. X-Next-Cursor) are carried over.
+    BR: Com FAST_JSON, valida uma vez e gera os bytes JSON direto, sem a revalidação do
+    response_model e o jsonable_encoder do FastAPI; senão devolve o conteúdo como está.
+    Cabeçalhos definidos na response injetada (ex.: X-Next-Cursor) são mantidos."""
+    if not FAST_JSON:
+        return content
+    body = adapter.dump_json(adapter.validate_python(content), exclude_unset=exclude_unset)
+    headers = None
+    if response is not None:
+        headers = {k: v for k, v in response.headers.items() if k != "content-length"}
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def _stream_observations(filters: list, after: Optional[Tuple[str, int]]) -> Iterator[str]:
+    """EN: NDJSON rows read in yield_per batches; uses its own session because the
+    request session is closed before the body is sent.
+    BR: Linhas NDJSON lidas em lotes com yield_per; usa sessão própria porque a
+    sessão da requisição é fechada antes do envio do corpo."""
+    db = SessionLocal()
+    try:
+        result = db.execute(_observation_list_query(filters, after), execution_options={"yield_per": STREAM_BATCH_SIZE})
+        for rows in result.partitions():
+            yield "".join(_json_line(_list_item(row)) for row in rows)
+    finally:
+        db.close()
+
+
+# EN: ---- Observations: list with optional filters ---- / BR: ---- Observações: listar com filtros opcionais ----
+@router.get("/observations", response_model=List[Observations_List], response_model_exclude_unset=True)
+async def fetch_observations(
+    response: Response,
+    teacher_id: Optional[int] = Query(None, ge=1),
+    department_id: Optional[int] = Query(None, ge=1),
+    focus_area_id: Optional[int] = Query(None, ge=1),
+    limit: int = Query(OBSERVATIONS_PAGE_SIZE, ge=1, le=OBSERVATIONS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header"),
+    stream: bool = Query(False, description="If true, stream every matching row as NDJSON (ignores limit)"),
+    q: Optional[str] = Query(None, max_length=200, description="Full-text search over strengths, weaknesses and comments"),
+    db: DBSession = Depends(get_session),
+):
+    # EN: Allows observations to be filtered / BR: Permite filtrar as observações
+    filters = _observation_filters(teacher_id, department_id, focus_area_id)
+
+    # EN: Ranked full-text search with snippets / BR: Busca de texto completo ordenada, com trechos
+    if q is not None and q.strip():
+        if stream:
+            raise HTTPException(status_code=400, detail="stream is not supported with q")
+        after_rank = _decode_cursor(cursor, float) if cursor else None
+
+        def _search_page(s: Session):
+            return s.execute(_search_query(q, filters, after_rank).limit(limit + 1)).all()
+
+        rows = await run_db(db, _search_page)
+        if len(rows) > limit:
+            rows = rows[:limit]
+            response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1].Rank, rows[-1].Observation_ID)
+        return _model_response(_OBSERVATIONS_JSON, [_list_item(row) for row in rows], response, exclude_unset=True)
+
+    after = _decode_cursor(cursor) if cursor else None
+
+    # EN: Opt-in streaming, flat memory / BR: Streaming opcional, memória constante
+    if stream:
+        return StreamingResponse(_stream_observations(filters, after), media_type="application/x-ndjson")
+
+    # EN: One extra row tells us whether a next page exists / BR: Uma linha extra indica se há próxima página
+    def _page(s: Session):
+        return s.execute(_observation_list_query(filters, after).limit(limit + 1)).all()
+
+    rows = await run_db(db, _page)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(rows[-1].Raw_Date, rows[-1].Observation_ID)
+
+    # EN: Return empty list if none / BR: Retorna lista vazia se não houver
+    return _model_response(_OBSERVATIONS_JSON, [_list_item(row) for row in rows], response, exclude_unset=True)
+
+
+# EN: ---- Observations: bulk export ---- / BR: ---- Observações: exportação em massa ----
+# EN: Flat export columns (label, expression); plain tuples, no ORM entities
+# BR: Colunas da exportação (rótulo, expressão); tuplas simples, sem entidades ORM
+_EXPORT_COLUMNS = (
+    ("Observation_ID", Observation.Observation_ID),
+    ("Observation_Date", Observation.Observation_Date),
+    ("Teacher_ID", Observation.Observation_Teacher),
+    ("Teacher_Forename", User.User_Forename),
+    ("Teacher_Surname", User.User_Surname),
+    ("Department_ID", Observation.Observation_Department),
+    ("Department_Name", Department.Department_Name),
+    ("FocusArea_ID", Observation.Observation_Focus),
+    ("FocusArea_Name", FocusArea.FocusArea_Name),
+    ("Observation_Class", Observation.Observation_Class),
+    ("Observation_Strengths", Observation.Observation_Strengths),
+    ("Observation_Weaknesses", Observation.Observation_Weaknesses),
+    ("Observation_Comments", Observation.Observation_Comments),
+)
+_EXPORT_HEADER = [label for label, _column in _EXPORT_COLUMNS]
+_EXPORT_MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def _export_query(filters: list, text: Optional[str]):
+    """EN: Same filters as the list, newest first (served by the (filter, date) indexes)
+    BR: Mesmos filtros da listagem, mais recentes primeiro (servido pelos índices (filtro, data))"""
+    q = (
+        select(*(column.label(label) for label, column in _EXPORT_COLUMNS))
+        .outerjoin(User, User.User_ID == Observation.Observation_Teacher)
+        .outerjoin(Department, Department.Department_ID == Observation.Observation_Department)
+        .outerjoin(FocusArea, FocusArea.FocusArea_ID == Observation.Observation_Focus)
+    )
+    if text:
+        q = q.join(fts, fts.c.rowid == Observation.Observation_ID).where(fts_match(text))
+    if filters:
+        q = q.where(*filters)
+    return q.order_by(desc(Observation.Observation_Date), desc(Observation.Observation_ID))
+
+
+def _export_rows(fmt: str, filters: list, text: Optional[str]) -> Iterator[str]:
+    """EN: CSV/NDJSON text, one chunk per yield_per batch; own session like the stream
+    BR: Texto CSV/NDJSON, um pedaço por lote do yield_per; sessão própria como no stream"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == "csv":
+        # EN: Header goes out before the query runs / BR: O cabeçalho sai antes de a consulta rodar
+        writer.writerow(_EXPORT_HEADER)
+        yield buffer.getvalue()
+
+    db = SessionLocal()
+    try:
+        result = db.execute(_export_query(filters, text), execution_options={"yield_per": STREAM_BATCH_SIZE})
+        for rows in result.partitions():
+            buffer.seek(0)
+            buffer.truncate()
+            if fmt == "csv":
+                writer.writerows((row[0], row[1].isoformat() if row[1] else None, *row[2:]) for row in rows)
+            else:
+                for row in rows:
+                    record = dict(zip(_EXPORT_HEADER, row))
+                    record["Observation_Date"] = row[1].isoformat() if row[1] else None
+                    buffer.write(json.dumps(record, ensure_ascii=False))
+                    buffer.write("\n")
+            yield buffer.getvalue()
+    finally:
+        db.close()
+
+
+@router.get("/observations/export")
+async def export_observations(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    teacher_id: Optional[int] = Query(None, ge=1),
+    department_id: Optional[int] = Query(None, ge=1),
+    focus_area_id: Optional[int] = Query(None, ge=1),
+    q: Optional[str] = Query(None, max_length=200, description="Only observations matching this full-text search"),
+):
+    # EN: Every matching row, streamed in constant memory / BR: Todas as linhas, transmitidas com memória constante
+    filters = _observation_filters(teacher_id, department_id, focus_area_id)
+    text = q.strip() if q and q.strip() else None
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d-%H%M%S")
+    return StreamingResponse(
+        _export_rows(format, filters, text),
+        media_type=_EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="observations-{stamp}.{format}"'},
+    )
 
 
 # EN: ---- Create observation (optionally send) ---- / BR: ---- Criar observação (opcionalmente enviar) ----
 @router.post("/new")
-def create_observation(
+async def create_observation(
     observation: Create_Observation,
     notify: bool = Query(False, description="If true, queue an email to teacher"),
-    bg: BackgroundTasks = None,  # EN: injected by FastAPI / BR: injetado pelo FastAPI
     request: Request = None,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
 ):
-    # EN: Create + persist / BR: Criar + persistir
-    new_observation = Observation(**observation.model_dump())
-    db.add(new_observation)
-    db.commit()
-    db.refresh(new_observation)
+    def _create(s: Session) -> int:
+        # EN: Create + persist; the email goes into the outbox in the same transaction
+        # BR: Criar + persistir; o e-mail entra na outbox na mesma transação
+        new_observation = Observation(**observation.model_dump())
+        s.add(new_observation)
+        s.flush()
+        analytics.apply(s, None, analytics.snapshot(new_observation))
+
+        if notify:
+            # EN: Relations for the payload in one joined query (fills the unloaded attributes)
+            # BR: Relações do payload numa única consulta com join (preenche os atributos não carregados)
+            _load_observation(s, new_observation.Observation_ID)
+            payload = _build_mail_payload(
+                request, new_observation, new_observation.teacher, new_observation.department, new_observation.focus
+            )
+            enqueue_observation_email(s, new_observation.Observation_ID, payload)
+
+        # EN: Read the ID before commit expires the row (saves a refresh SELECT)
+        # BR: Ler o ID antes do commit expirar a linha (evita um SELECT de refresh)
+        new_id = new_observation.Observation_ID
+        s.commit()
+        return new_id
 
-    print(f"[POST /new] notify={notify} new_id={new_observation.Observation_ID}")
-    print(f"[POST /new] bg is None? {bg is None}")
+    new_id = await run_db(db, _create)
 
+    logger.debug("observation created", extra={"observation_id": new_id, "notify": notify})
     if notify:
-        # EN: Load relations for payload / BR: Carregar relações para o payload
-        teacher = db.query(User).filter(User.User_ID == new_observation.Observation_Teacher).first()
-        dept = None
-        if getattr(new_observation, "Observation_Department", None) is not None:
-            dept = db.query(Department).filter(Department.Department_ID == new_observation.Observation_Department).first()
-        focus = None
-        if getattr(new_observation, "Observation_Focus", None) is not None:
-            focus = db.query(FocusArea).filter(FocusArea.FocusArea_ID == new_observation.Observation_Focus).first()
-
-        payload = _build_mail_payload(request, new_observation, teacher, dept, focus)
-        print("[POST /new] queuing mailer task with payload:", payload)
-        try:
-            _queue_email(bg, payload)
-        except Exception as e:
-            # EN: Surface mailer failure separately / BR: Tratar falha do mailer separadamente
-            raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=f"Mailer call failed: {e}")
+        outbox_worker.wake()
 
     # EN: Return the new ID (frontend needs this) / BR: Retornar o novo ID (frontend precisa)
-    return {"id": new_observation.Observation_ID}
+    return {"id": new_id}
+
+
+# EN: ---- Bulk import (CSV / NDJSON) ---- / BR: ---- Importação em massa (CSV / NDJSON) ----
+@router.post("/observations/import")
+async def import_observations(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$", description="Defaults to the Content-Type"),
+    dry_run: bool = Query(False, description="Validate only, insert nothing"),
+):
+    fmt = format or importer.format_from_content_type(request.headers.get("content-type"))
+    if fmt is None:
+        raise HTTPException(status_code=415, detail="Send text/csv or application/x-ndjson, or pass format=csv|ndjson")
+
+    # EN: Spool the body as it arrives, then parse it in a worker thread on its own session
+    # BR: Guardar o corpo conforme chega e depois processar numa thread com sessão própria
+    spool = tempfile.SpooledTemporaryFile(max_size=importer.IMPORT_SPOOL_BYTES)
+    try:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > importer.IMPORT_MAX_BYTES:
+                raise HTTPException(status_code=413, detail="Import file too large")
+            spool.write(chunk)
+        spool.seek(0)
+        report = await run_in_threadpool(importer.import_observations, spool, fmt, dry_run)
+    finally:
+        spool.close()
+    return report
 
 
 # EN: ---- Dedicated email trigger (fixes 404) ---- / BR: ---- Disparo dedicado de e-mail (corrige 404) ----
 @router.post("/observations/{observation_id}/email")
-def send_observation_email(
+async def send_observation_email(
     observation_id: int,
     notify: bool = Query(False, description="Optional flag for logging only"),
-    bg: BackgroundTasks = None,
     request: Request = None,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
 ):
-    # EN: Load observation + relations / BR: Carregar observação + relações
-    obs = (
-        db.query(Observation)
-        .options(
-            joinedload(Observation.teacher),
-            joinedload(Observation.department),
-            joinedload(Observation.focus),
-        )
-        .filter(Observation.Observation_ID == observation_id)
-        .first()
-    )
-    if not obs:
+    # EN: Load observation + relations, then queue / BR: Carregar observação + relações e enfileirar
+    def _enqueue(s: Session) -> bool:
+        obs = _load_observation(s, observation_id)
+        if not obs:
+            return False
+        payload = _build_mail_payload(request, obs, obs.teacher, obs.department, obs.focus)
+        enqueue_observation_email(s, observation_id, payload)
+        s.commit()
+        return True
+
+    if not await run_db(db, _enqueue):
         raise HTTPException(status_code=404, detail="Observation not found")
-
-    teacher = getattr(obs, "teacher", None)
-    dept = getattr(obs, "department", None)
-    focus = getattr(obs, "focus", None)
-
-    payload = _build_mail_payload(request, obs, teacher, dept, focus)
-
-    try:
-        _queue_email(bg, payload)
-    except Exception as e:
-        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=f"Mailer call failed: {e}")
+    outbox_worker.wake()
 
     return {"message": "Email queued"}
 
 
-# EN: View a single observation / BR: Visualizar uma observação
-@router.get("/observations/{observation_ID}")
-def view_observation(observation_ID: int, db: Session = Depends(get_db)):
-    obs = (
-        db.query(Observation)
-        .options(
-            joinedload(Observation.teacher),
-            joinedload(Observation.department),
-            joinedload(Observation.focus),
-        )
-        .filter(Observation.Observation_ID == observation_ID)
-        .first()
-    )
-    if not obs:
-        raise HTTPException(status_code=404, detail="Observation not found")
+# EN: ---- Mailer outbox metrics ---- / BR: ---- Métricas da outbox do mailer ----
+@router.get("/mailer/outbox")
+async def mailer_outbox_stats():
+    return await run_in_threadpool(outbox_worker.stats)
+
 
+def _observation_detail(obs: Observation) -> dict:
+    """EN: Detail view (IDs + display names) / BR: Visão de detalhe (IDs + nomes)"""
     t = getattr(obs, "teacher", None)
     d = getattr(obs, "department", None)
     f = getattr(obs, "focus", None)
@@ -250,28 +550,27 @@ def view_observation(observation_ID: int, db: Session = Depends(get_db)):
     }
 
 
+# EN: View a single observation / BR: Visualizar uma observação
+@router.get("/observations/{observation_ID}")
+async def view_observation(observation_ID: int, db: DBSession = Depends(get_session)):
+    def _view(s: Session):
+        obs = _load_observation(s, observation_ID)
+        return _observation_detail(obs) if obs else None
+
+    detail = await run_db(db, _view)
+    if detail is None:
+        raise HTTPException(status_code=404, detail="Observation not found")
+    return detail
+
+
 # EN: Edit observation (with optional re-send) / BR: Editar observação (com reenvio opcional)
 @router.put("/observations/{observation_ID}")
-def edit_observation(
+async def edit_observation(
     observation_ID: int,
     changes: Update_Observation,
-    bg: BackgroundTasks,
     request: Request,
-    db: Session = Depends(get_db),
+    db: DBSession = Depends(get_session),
 ):
-    observation = (
-        db.query(Observation)
-        .options(
-            joinedload(Observation.teacher),
-            joinedload(Observation.department),
-            joinedload(Observation.focus),
-        )
-        .filter(Observation.Observation_ID == observation_ID)
-        .first()
-    )
-    if not observation:
-        raise HTTPException(status_code=404, detail="Observation not found.")
-
     # EN: If user only wants to re-send, allow it (no 400) / BR: Permitir reenvio sem mudanças
     nothing_to_update = all(
         getattr(changes, field) is None
@@ -285,184 +584,615 @@ def edit_observation(
             "Observation_Comments",
         ]
     )
-    if nothing_to_update and not changes.resend_email:
-        raise HTTPException(status_code=400, detail="Nothing to update")
 
     # EN: Dict of provided fields only / BR: Apenas campos enviados
     update_data = changes.model_dump(exclude_unset=True)
     update_data.pop("resend_email", None)
 
-    # EN: Foreign keys first / BR: Chaves estrangeiras primeiro
-    if "Observation_Teacher" in update_data:
-        observation.Observation_Teacher = update_data["Observation_Teacher"]
-    if "Observation_Department" in update_data:
-        observation.Observation_Department = update_data["Observation_Department"]
-    if "Observation_Focus" in update_data:
-        observation.Observation_Focus = update_data["Observation_Focus"]
-
-    # EN: Scalars / BR: Campos simples
-    for field in ["Observation_Class", "Observation_Strengths", "Observation_Weaknesses", "Observation_Comments"]:
-        if field in update_data:
-            setattr(observation, field, update_data[field])
-
-    db.commit()
-
-    # EN: If re-sending, ensure relationships reflect any FK changes / BR: Recarregar relações
+    def _edit(s: Session):
+        # EN: Relations are only needed for a re-send, and then after the FK changes
+        # BR: Relações só são necessárias num reenvio, e depois das mudanças de FK
+        observation = _load_observation(s, observation_ID, relations=False)
+        if not observation:
+            raise HTTPException(status_code=404, detail="Observation not found.")
+        if nothing_to_update and not changes.resend_email:
+            raise HTTPException(status_code=400, detail="Nothing to update")
+        before = analytics.snapshot(observation)
+
+        # EN: Foreign keys first / BR: Chaves estrangeiras primeiro
+        if "Observation_Teacher" in update_data:
+            observation.Observation_Teacher = update_data["Observation_Teacher"]
+        if "Observation_Department" in update_data:
+            observation.Observation_Department = update_data["Observation_Department"]
+        if "Observation_Focus" in update_data:
+            observation.Observation_Focus = update_data["Observation_Focus"]
+
+        # EN: Scalars / BR: Campos simples
+        for field in ["Observation_Class", "Observation_Strengths", "Observation_Weaknesses", "Observation_Comments"]:
+            if field in update_data:
+                setattr(observation, field, update_data[field])
+
+        # EN: Move the row between summary buckets if a key field changed
+        # BR: Mover a linha entre grupos do resumo se um campo-chave mudou
+        analytics.apply(s, before, analytics.snapshot(observation))
+
+        # EN: If re-sending, ensure relationships reflect any FK changes, and queue the
+        # email in the same transaction as the edit
+        # BR: Ao reenviar, recarregar relações após mudanças de FK e enfileirar o e-mail
+        # na mesma transação da edição
+        if changes.resend_email:
+            s.flush()
+            s.expire(observation, ["teacher", "department", "focus"])
+            _load_observation(s, observation_ID)
+            payload = _build_mail_payload(request, observation, observation.teacher, observation.department, observation.focus)
+            enqueue_observation_email(s, observation_ID, payload)
+
+        s.commit()
+
+    await run_db(db, _edit)
+    # EN: Stale PDFs go with the old row / BR: PDFs antigos saem junto com a linha antiga
+    await run_in_threadpool(pdf_cache.invalidate, observation_ID)
     if changes.resend_email:
-        # simplest: re-query with joinedload so teacher/department/focus are fresh
-        observation = (
-            db.query(Observation)
-            .options(
-                joinedload(Observation.teacher),
-                joinedload(Observation.department),
-                joinedload(Observation.focus),
-            )
-            .filter(Observation.Observation_ID == observation_ID)
-            .first()
-        )
+        outbox_worker.wake()
 
-        teacher = getattr(observation, "teacher", None)
-        dept = getattr(observation, "department", None)
-        focus = getattr(observation, "focus", None)
-        payload = _build_mail_payload(request, observation, teacher, dept, focus)
-        _queue_email(bg, payload)
-
-    return {"message": "Observation updated", "Observation_ID": observation.Observation_ID}
+    return {"message": "Observation updated", "Observation_ID": observation_ID}
 
 # EN: Delete observation / BR: Apagar observação
 @router.delete("/observations/{observation_id}")
-def delete_observation(observation_id: int, db: Session = Depends(get_db)):
-    observation = db.query(Observation).filter(Observation.Observation_ID == observation_id).first()
-    # EN: Delete an observation / BR: Apagar uma observação
-    if observation is None:
+async def delete_observation(observation_id: int, db: DBSession = Depends(get_session)):
+    def _delete(s: Session) -> bool:
+        observation = _load_observation(s, observation_id, relations=False)
+        # EN: Delete an observation / BR: Apagar uma observação
+        if observation is None:
+            return False
+        before = analytics.snapshot(observation)
+        # EN: Its flags go too (SQLite does not enforce the FK) / BR: Os indicadores vão junto (o SQLite não impõe a FK)
+        s.query(Flag).filter(Flag.Observation == observation_id).delete(synchronize_session=False)
+        s.delete(observation)
+        analytics.apply(s, before, None)
+        s.commit()
+        return True
+
+    if not await run_db(db, _delete):
         raise HTTPException(status_code=404, detail="Observation not found")
-    db.delete(observation)
-    db.commit()
+    await run_in_threadpool(pdf_cache.invalidate, observation_id)
     return {"message": "Observation deleted successfully"}
 
 
-# EN: Generate PDF via renderer / BR: Gerar PDF via renderer
-@router.get("/pdf/{id}")
-async def create_pdf(id: int, db: Session = Depends(get_db)):
-    observation = (
+def _pdf_template_file(db: Session, template: Optional[str]) -> Optional[str]:
+    """EN: Template name or ID -> file; None picks the Is_Default row. Returns None when
+    the template is unknown or its file is missing.
+    BR: Nome ou ID do template -> arquivo; None escolhe a linha Is_Default. Retorna None
+    quando o template não existe ou seu arquivo não foi encontrado."""
+    q = select(Template.Template_File)
+    if template is None:
+        q = q.where(Template.Is_Default == true())
+    elif template.isdigit():
+        q = q.where(Template.Template_ID == int(template))
+    else:
+        q = q.where(Template.Template_Name == template)
+    file = db.execute(q.limit(1)).scalar()
+    if file is None and template is None:
+        file = DEFAULT_TEMPLATE_FILE
+    if file is not None and not pdf_templates.exists(file):
+        logger.error("pdf template file missing", extra={"template": template, "file": file})
+        return None
+    return file
+
+
+def _load_pdf_html(db: Session, observation_ids: List[int], template_file: str = DEFAULT_TEMPLATE_FILE) -> dict:
+    """EN: {observation_id: html} in one query / BR: {observation_id: html} em uma consulta"""
+    observations = (
         db.query(Observation)
         .options(joinedload(Observation.teacher), joinedload(Observation.focus))
-        .filter(Observation.Observation_ID == id)
-        .first()
+        .filter(Observation.Observation_ID.in_(observation_ids))
+        .all()
     )
-    if observation is None:
-        raise HTTPException(status_code=404, detail="Observation not found")
+    return {ob.Observation_ID: pdf_templates.render(template_file, ob) for ob in observations}
 
-    teacher = getattr(observation, "teacher", None)
-    focus   = getattr(observation, "focus", None)
 
-    teacher_full_name = f"{getattr(teacher, 'User_Forename', '')} {getattr(teacher, 'User_Surname', '')}".strip()
-    focus_label = (
-        getattr(focus, "FocusArea_Name", None)
-        or str(getattr(observation, "Observation_Focus", "—"))
-    )
-    date_str = str(getattr(observation, "Observation_Date", "—"))
-
-    html_content = f"""
-    <!doctype html><meta charset="utf-8">
-    <style>
-      body {{ font-family: DejaVu Sans, Arial, sans-serif; margin: 2rem; }}
-      h1 {{ font-size: 22px; border-bottom: 1px solid #ccc; padding-bottom: .4rem; }}
-      .content p {{ margin: .4rem 0; }}
-      .label {{ font-weight: bold; }}
-    </style>
-    <h1>FocusEd Lesson Observation</h1>
-    <div class="content">
-      <p><span class="label">Teacher:</span> {teacher_full_name or '—'}</p>
-      <p><span class="label">Date:</span> {date_str}</p>
-      <p><span class="label">Class:</span> {observation.Observation_Class or '—'}</p>
-      <p><span class="label">Focus Area:</span> {focus_label}</p>
-      <p><span class="label">Strengths:</span> {observation.Observation_Strengths or '—'}</p>
-      <p><span class="label">Areas for Development:</span> {observation.Observation_Weaknesses or '—'}</p>
-      <p><span class="label">Other Comments:</span> {observation.Observation_Comments or '—'}</p>
-    </div>
-    """
+# EN: (observation_id, html key) -> render task shared by concurrent requests
+# BR: (observation_id, chave do html) -> tarefa de renderização compartilhada por requisições simultâneas
+_pdf_in_flight: Dict[Tuple[int, str], "asyncio.Task[bytes]"] = {}
 
+
+async def _render_and_store(observation_id: int, html_content: str, key: str) -> bytes:
     # Calls renderer / Chama renderer
-    render_endpoint = f"{RENDERER_URL}/render"
+    pdf = await renderer.render_pdf(html_content)
+    await run_in_threadpool(pdf_cache.put, observation_id, key, pdf)
+    return pdf
+
+
+def _flight_done(flight: Tuple[int, str], task: "asyncio.Task[bytes]") -> None:
+    _pdf_in_flight.pop(flight, None)
+    if not task.cancelled():
+        # EN: Mark the error as seen even if every waiter went away / BR: Marcar o erro como visto mesmo se todos desistiram
+        task.exception()
+
+
+async def _cached_pdf(observation_id: int, html_content: str, key: str) -> bytes:
+    """EN: PDF from the disk cache, or rendered and stored (raises RendererError). With
+    PDF_COALESCE, callers asking for a version already being rendered await that render;
+    it is shielded, so it finishes for the others when the caller that started it leaves.
+    BR: PDF do cache em disco, ou renderizado e guardado (lança RendererError). Com
+    PDF_COALESCE, quem pede uma versão já em renderização aguarda essa renderização;
+    ela é protegida e termina para os demais se quem a iniciou desistir."""
+    pdf = await run_in_threadpool(pdf_cache.get, observation_id, key)
+    if pdf is not None:
+        pdf_requests.inc("cache")
+        return pdf
+    if not PDF_COALESCE:
+        pdf_requests.inc("render")
+        return await _render_and_store(observation_id, html_content, key)
+
+    flight = (observation_id, key)
+    task = _pdf_in_flight.get(flight)
+    if task is None:
+        pdf_requests.inc("render")
+        task = asyncio.create_task(_render_and_store(observation_id, html_content, key))
+        _pdf_in_flight[flight] = task
+        task.add_done_callback(lambda t: _flight_done(flight, t))
+    else:
+        pdf_requests.inc("coalesced")
+    return await asyncio.shield(task)
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """EN: Weak comparison per RFC 9110 / BR: Comparação fraca conforme RFC 9110"""
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or any(t.removeprefix("W/") == etag for t in tags)
+
+
+class _ZipSink(io.RawIOBase):
+    """EN: Write-only, non-seekable target for ZipFile; drain() hands over what was
+    written so far, so the archive can be streamed entry by entry.
+    BR: Destino somente escrita e sem seek para o ZipFile; drain() entrega o que foi
+    escrito até agora, para transmitir o arquivo entrada por entrada."""
+
+    def __init__(self):
+        super().__init__()
+        self._buf = bytearray()
+        self._pos = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, b) -> int:
+        self._buf += b
+        self._pos += len(b)
+        return len(b)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def drain(self) -> bytes:
+        data = bytes(self._buf)
+        self._buf.clear()
+        return data
+
+
+async def _export_one(observation_id: int, html_content: str) -> Tuple[int, Optional[bytes], Optional[str]]:
     try:
-        async with httpx.AsyncClient(timeout=15) as client:
-            r = await client.post(render_endpoint, json={"html": html_content})
-    except httpx.RequestError as e:
-        raise HTTPException(status_code=502, detail=f"Renderer unreachable: {e}") from e
+        return observation_id, await _cached_pdf(observation_id, html_content, html_key(html_content)), None
+    except RendererError as e:
+        return observation_id, None, str(e)
+
+
+async def _bulk_pdf_zip(observation_ids: List[int], template_file: str) -> AsyncIterator[bytes]:
+    """EN: ZIP stream with at most BULK_EXPORT_PARALLELISM renders in flight; each PDF
+    is written and flushed as soon as it completes. Failures are listed in errors.txt.
+    BR: Stream ZIP com no máximo BULK_EXPORT_PARALLELISM renderizações em andamento; cada
+    PDF é escrito e enviado assim que termina. Falhas vão para errors.txt."""
+    sink = _ZipSink()
+    zf = zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_STORED)
+    in_flight: set = set()
+    errors: List[str] = []
+
+    def _write(done) -> bytes:
+        for task in done:
+            observation_id, pdf, error = task.result()
+            if pdf is None:
+                errors.append(f"observation_{observation_id}: {error}")
+            else:
+                zf.writestr(f"observation_{observation_id}.pdf", pdf)
+        return sink.drain()
+
+    try:
+        for start in range(0, len(observation_ids), BULK_EXPORT_PARALLELISM):
+            batch = observation_ids[start:start + BULK_EXPORT_PARALLELISM]
+            htmls = await run_in_threadpool(_with_session, _load_pdf_html, batch, template_file)
+            for observation_id in batch:
+                if observation_id not in htmls:
+                    continue  # EN: deleted meanwhile / BR: apagada nesse meio-tempo
+                if len(in_flight) >= BULK_EXPORT_PARALLELISM:
+                    done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                    yield _write(done)
+                in_flight.add(asyncio.create_task(_export_one(observation_id, htmls[observation_id])))
+        while in_flight:
+            done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+            yield _write(done)
+        if errors:
+            zf.writestr("errors.txt", "\n".join(errors) + "\n")
+        zf.close()
+        yield sink.drain()
+    finally:
+        # EN: Client went away: stop pending renders / BR: Cliente saiu: parar renderizações pendentes
+        for task in in_flight:
+            task.cancel()
+
+
+_TEMPLATE_PARAM = "PDF template name or ID (default: the Is_Default template)"
+
+
+# EN: Bulk PDF export as a streamed ZIP (same filters as the list)
+# BR: Exportação em massa de PDFs como ZIP transmitido (mesmos filtros da listagem)
+@router.get("/pdf/bulk")
+async def export_pdfs(
+    teacher_id: Optional[int] = Query(None, ge=1),
+    department_id: Optional[int] = Query(None, ge=1),
+    focus_area_id: Optional[int] = Query(None, ge=1),
+    template: Optional[str] = Query(None, max_length=64, description=_TEMPLATE_PARAM),
+    db: DBSession = Depends(get_session),
+):
+    filters = _observation_filters(teacher_id, department_id, focus_area_id)
+
+    def _ids(s: Session) -> Tuple[Optional[str], List[int]]:
+        q = s.query(Observation.Observation_ID)
+        if filters:
+            q = q.filter(*filters)
+        q = q.order_by(desc(Observation.Observation_Date), desc(Observation.Observation_ID))
+        return _pdf_template_file(s, template), [observation_id for (observation_id,) in q]
 
-    if r.status_code != 200:
-        raise HTTPException(status_code=502, detail=f"Renderer error (status {r.status_code})")
+    template_file, observation_ids = await run_db(db, _ids)
+    if template_file is None:
+        raise HTTPException(status_code=404, detail="Template not found")
+    if not observation_ids:
+        raise HTTPException(status_code=404, detail="No observations found")
 
-    ctype = r.headers.get("content-type", "").lower()
-    if "application/pdf" not in ctype:
-        raise HTTPException(status_code=502, detail=f"Renderer returned non-PDF (content-type {ctype})")
+    headers = {"Content-Disposition": 'attachment; filename="observations.zip"'}
+    return StreamingResponse(_bulk_pdf_zip(observation_ids, template_file), media_type="application/zip", headers=headers)
 
+
+# EN: Generate PDF via renderer / BR: Gerar PDF via renderer
+@router.get("/pdf/{id}")
+async def create_pdf(
+    id: int,
+    request: Request,
+    template: Optional[str] = Query(None, max_length=64, description=_TEMPLATE_PARAM),
+    db: DBSession = Depends(get_session),
+):
+    # EN: Query off the event loop / BR: Consulta fora do event loop
+    def _html(s: Session) -> Optional[str]:
+        template_file = _pdf_template_file(s, template)
+        if template_file is None:
+            raise HTTPException(status_code=404, detail="Template not found")
+        return _load_pdf_html(s, [id], template_file).get(id)
+
+    html_content = await run_db(db, _html)
+    if html_content is None:
+        raise HTTPException(status_code=404, detail="Observation not found")
+
+    # EN: The HTML hash is both cache key and ETag / BR: O hash do HTML é chave de cache e ETag
+    key = html_key(html_content)
     filename = f"observation_{id}.pdf"
-    headers = {"Content-Disposition": f'inline; filename="{filename}"'}
-    return Response(content=r.content, media_type="application/pdf", headers=headers)
+    headers = {
+        "Content-Disposition": f'inline; filename="{filename}"',
+        "ETag": f'"{key}"',
+        "Cache-Control": "private, no-cache",
+    }
 
+    # EN: Client already has this version: no renderer, no disk read
+    # BR: Cliente já tem esta versão: sem renderer, sem leitura em disco
+    if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-# EN Teachers / BR: Professores
-@router.get("/teachers", response_model=List[Teachers_List])
-def fetch_teachers(db: Session = Depends(get_db)):
+    try:
+        pdf = await _cached_pdf(id, html_content, key)
+    except RendererBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"}) from e
+    except RendererError as e:
+        raise HTTPException(status_code=502, detail=str(e)) from e
+
+    mtime = await run_in_threadpool(pdf_cache.last_modified, id, key)
+    headers["Last-Modified"] = formatdate(mtime if mtime is not None else time.time(), usegmt=True)
+    return Response(content=pdf, media_type="application/pdf", headers=headers)
+
+
+def _rows_json(rows) -> bytes:
+    """EN: Projected lookup rows straight to compact JSON (same bytes as the old Pydantic dump)
+    BR: Linhas projetadas direto para JSON compacto (mesmos bytes do antigo dump do Pydantic)"""
+    return json.dumps([dict(row._mapping) for row in rows], separators=(",", ":"), ensure_ascii=False).encode()
+
+
+def _teachers_json(s: Session) -> bytes:
     # EN: Fetch all teachers from the database, ordered by surname
     # BR: Buscar todos os professores no banco de dados, ordenados por sobrenome
-    teachers = db.query(User).order_by(User.User_Surname).all()
-
-    # EN: Raise error if no teachers are found / BR: Gerar erro se nenhum professor for encontrado
-    if not teachers:
-        raise HTTPException(status_code=404, detail="No teachers found")
-
-    # EN: Return list of teachers / BR: Retornar lista de professores
-    return [
-        Teachers_List(
-            User_ID=teacher.User_ID,
-            Teacher_Forename=teacher.User_Forename,
-            Teacher_Surname=teacher.User_Surname,
-            Teacher_Email=teacher.User_Email,
-        )
-        for teacher in teachers
-    ]
+    return _rows_json(s.execute(
+        select(
+            User.User_ID,
+            User.User_Forename.label("Teacher_Forename"),
+            User.User_Surname.label("Teacher_Surname"),
+            User.User_Email.label("Teacher_Email"),
+        ).order_by(User.User_Surname)
+    ))
 
 
-# EN: ---- Departments ---- / BR: ---- Departamentos ----
-@router.get("/departments", response_model=List[Departments_List])
-def fetch_departments(db: Session = Depends(get_db)):
+def _departments_json(s: Session) -> bytes:
     # EN: Fetch all departments from the database, ordered by name
     # BR: Buscar todos os departamentos no banco de dados, ordenados por nome
-    departments = db.query(Department).order_by(Department.Department_Name).all()
+    return _rows_json(s.execute(
+        select(Department.Department_ID, Department.Department_Name).order_by(Department.Department_Name)
+    ))
 
-    # EN: Raise error if no departments are found / BR: Gerar erro se nenhum departamento for encontrado
-    if not departments:
-        raise HTTPException(status_code=404, detail="No departments found")
 
-    # EN: Return list of departments / BR: Retornar lista de departamentos
-    return [
-        Departments_List(
-            Department_ID=department.Department_ID,
-            Department_Name=department.Department_Name,
-        )
-        for department in departments
-    ]
+def _focus_areas_json(s: Session) -> bytes:
+    # EN: Fetch all focus areas from the database, ordered by name
+    # BR: Buscar todas as áreas de foco no banco de dados, ordenados por nome
+    return _rows_json(s.execute(
+        select(FocusArea.FocusArea_ID, FocusArea.FocusArea_Name).order_by(FocusArea.FocusArea_Name)
+    ))
+
+
+def _flag_types_json(s: Session) -> bytes:
+    # EN: Fetch all flag types, ordered by name / BR: Buscar todos os tipos de indicador, ordenados por nome
+    return _rows_json(s.execute(
+        select(FlagType.FlagType_ID, FlagType.FlagType_Name).order_by(FlagType.FlagType_Name)
+    ))
+
+
+# EN: Lookup lists by cache name / BR: Listas de consulta por nome no cache
+_REF_BUILDERS = {
+    "teachers": _teachers_json,
+    "departments": _departments_json,
+    "focus_areas": _focus_areas_json,
+    "flag_types": _flag_types_json,
+}
+
+
+async def _ref_response(request: Request, db: DBSession, name: str, not_found: str) -> Response:
+    """EN: Serve a lookup list from the reference-data cache with ETag/304
+    BR: Servir uma lista de consulta do cache de dados de referência com ETag/304"""
+    entry = ref_cache.get(name)
+    if entry is None:
+        version = ref_cache.version
+        entry = ref_cache.put(name, version, await run_db(db, _REF_BUILDERS[name]))
+    body, etag = entry
+
+    # EN: Raise error if the table is empty / BR: Gerar erro se a tabela estiver vazia
+    if body == b"[]":
+        raise HTTPException(status_code=404, detail=not_found)
+
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={REF_CACHE_MAX_AGE}, must-revalidate"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+# EN Teachers / BR: Professores
+@router.get("/teachers", response_model=List[Teachers_List])
+async def fetch_teachers(request: Request, db: DBSession = Depends(get_session)):
+    return await _ref_response(request, db, "teachers", "No teachers found")
+
+
+# EN: ---- Departments ---- / BR: ---- Departamentos ----
+@router.get("/departments", response_model=List[Departments_List])
+async def fetch_departments(request: Request, db: DBSession = Depends(get_session)):
+    return await _ref_response(request, db, "departments", "No departments found")
 
 
 # EN: ---- Focus Areas ---- / BR: ---- Áreas de Foco ----
 @router.get("/focus_areas", response_model=List[FocusAreas_List])
-def fetch_focus_areas(db: Session = Depends(get_db)):
-    # EN: Fetch all focus areas from the database, ordered by name
-    # BR: Buscar todas as áreas de foco no banco de dados, ordenados por nome
-    focus_areas = db.query(FocusArea).order_by(FocusArea.FocusArea_Name).all()
+async def fetch_focus_areas(request: Request, db: DBSession = Depends(get_session)):
+    return await _ref_response(request, db, "focus_areas", "No focus areas found")
+
+
+# EN: ---- Flag Types ---- / BR: ---- Tipos de Indicador ----
+@router.get("/flag_types", response_model=List[FlagTypes_List])
+async def fetch_flag_types(request: Request, db: DBSession = Depends(get_session)):
+    return await _ref_response(request, db, "flag_types", "No flag types found")
 
-    # EN: Raise error if no focus areas are found / BR: Gerar erro se nenhuma área de foco for encontrada
-    if not focus_areas:
-        raise HTTPException(status_code=404, detail="No focus areas found")
 
-    # EN: Return list of focus areas / BR: Retornar lista de áreas de foco
-    return [
-        FocusAreas_List(
-            FocusArea_ID=focus_area.FocusArea_ID,
-            FocusArea_Name=focus_area.FocusArea_Name,
+# EN: ---- Flags ---- / BR: ---- Indicadores ----
+def _flags_query(
+    status_filter: str,
+    flag_type_id: Optional[int] = None,
+    focus_area_id: Optional[int] = None,
+    teacher_id: Optional[int] = None,
+    after_id: Optional[int] = None,
+):
+    """EN: One joined column query, newest first, keyset on Flag_ID. Is_Open is
+    compared to a literal so SQLite can pick the partial indexes.
+    BR: Uma consulta de colunas com joins, mais novos primeiro, chave Flag_ID. Is_Open
+    é comparado a um literal para o SQLite poder usar os índices parciais."""
+    q = (
+        select(
+            Flag.Flag_ID,
+            Flag.Observation.label("Observation_ID"),
+            FlagType.FlagType_Name.label("Flag_Type"),
+            Observation.Observation_Teacher.label("Teacher_ID"),
+            (User.User_Forename + " " + User.User_Surname).label("Teacher"),
+            FocusArea.FocusArea_Name.label("Focus_Area"),
+            Flag.Flag_Date,
+            Flag.Is_Open,
         )
-        for focus_area in focus_areas
-    ]
+        .select_from(Flag)
+        .outerjoin(Observation, Observation.Observation_ID == Flag.Observation)
+        .outerjoin(User, User.User_ID == Observation.Observation_Teacher)
+        .outerjoin(FlagType, FlagType.FlagType_ID == Flag.FlagType)
+        .outerjoin(FocusArea, FocusArea.FocusArea_ID == Flag.FocusArea)
+    )
+    if status_filter == "open":
+        q = q.where(Flag.Is_Open == true())
+    elif status_filter == "closed":
+        q = q.where(Flag.Is_Open == false())
+    if flag_type_id is not None:
+        q = q.where(Flag.FlagType == flag_type_id)
+    if focus_area_id is not None:
+        q = q.where(Flag.FocusArea == focus_area_id)
+    if teacher_id is not None:
+        q = q.where(Observation.Observation_Teacher == teacher_id)
+    if after_id is not None:
+        q = q.where(Flag.Flag_ID < after_id)
+    return q.order_by(desc(Flag.Flag_ID))
+
+
+@router.get("/flags", response_model=List[Flags_List])
+async def fetch_flags(
+    response: Response,
+    status_filter: str = Query("open", alias="status", pattern="^(open|closed|all)$"),
+    flag_type_id: Optional[int] = Query(None, ge=1),
+    focus_area_id: Optional[int] = Query(None, ge=1),
+    teacher_id: Optional[int] = Query(None, ge=1),
+    limit: int = Query(FLAGS_PAGE_SIZE, ge=1, le=OBSERVATIONS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    db: DBSession = Depends(get_session),
+):
+    # EN: e.g. open practice alerts for one focus area: ?flag_type_id=2&focus_area_id=3
+    # BR: ex.: alertas de prática abertos de um foco: ?flag_type_id=2&focus_area_id=3
+    after_id = _decode_cursor(cursor, lambda key: key)[1] if cursor else None
+    q = _flags_query(status_filter, flag_type_id, focus_area_id, teacher_id, after_id).limit(limit + 1)
+
+    def _page(s: Session):
+        return s.execute(q).all()
+
+    rows = await run_db(db, _page)
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = _encode_cursor(None, rows[-1].Flag_ID)
+    return _model_response(_FLAGS_JSON, [dict(row._mapping) for row in rows], response)
+
+
+def _check_flag_references(s: Session, flag_type_id: Optional[int], focus_area_id: Optional[int]) -> None:
+    """EN: 404 for a FlagType/FocusArea that does not exist (SQLite does not enforce the FKs)
+    BR: 404 para um FlagType/FocusArea inexistente (o SQLite não impõe as FKs)"""
+    if flag_type_id is not None and s.get(FlagType, flag_type_id) is None:
+        raise HTTPException(status_code=404, detail="Flag type not found")
+    if focus_area_id is not None and s.get(FocusArea, focus_area_id) is None:
+        raise HTTPException(status_code=404, detail="Focus area not found")
+
+
+@router.post("/flags")
+async def create_flag(flag: Create_Flag, db: DBSession = Depends(get_session)):
+    def _create(s: Session) -> int:
+        if s.get(Observation, flag.Observation) is None:
+            raise HTTPException(status_code=404, detail="Observation not found")
+        _check_flag_references(s, flag.FlagType, flag.FocusArea)
+        new_flag = Flag(**flag.model_dump())
+        s.add(new_flag)
+        s.commit()
+        return new_flag.Flag_ID
+
+    new_id = await run_db(db, _create)
+    return {"id": new_id}
+
+
+@router.get("/flags/{flag_id}", response_model=Flags_List)
+async def view_flag(flag_id: int, db: DBSession = Depends(get_session)):
+    def _one(s: Session):
+        return s.execute(_flags_query("all").where(Flag.Flag_ID == flag_id)).first()
+
+    row = await run_db(db, _one)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Flag not found")
+    return _model_response(_FLAG_JSON, dict(row._mapping))
+
+
+@router.put("/flags/{flag_id}")
+async def edit_flag(flag_id: int, changes: Update_Flag, db: DBSession = Depends(get_session)):
+    update_data = {k: v for k, v in changes.model_dump(exclude_unset=True).items() if v is not None}
+
+    def _edit(s: Session):
+        flag = s.get(Flag, flag_id)
+        if flag is None:
+            raise HTTPException(status_code=404, detail="Flag not found")
+        if not update_data:
+            raise HTTPException(status_code=400, detail="Nothing to update")
+        _check_flag_references(s, update_data.get("FlagType"), update_data.get("FocusArea"))
+        for field, value in update_data.items():
+            setattr(flag, field, value)
+        s.commit()
+
+    await run_db(db, _edit)
+    return {"message": "Flag updated", "Flag_ID": flag_id}
+
+
+@router.delete("/flags/{flag_id}")
+async def delete_flag(flag_id: int, db: DBSession = Depends(get_session)):
+    def _delete(s: Session) -> bool:
+        flag = s.get(Flag, flag_id)
+        if flag is None:
+            return False
+        s.delete(flag)
+        s.commit()
+        return True
+
+    if not await run_db(db, _delete):
+        raise HTTPException(status_code=404, detail="Flag not found")
+    return {"message": "Flag deleted successfully"}
+
+
+# EN: ---- Analytics (pre-aggregated, never scans Observations) ----
+# BR: ---- Analytics (pré-agregado, nunca varre Observations) ----
+@router.get("/analytics/weekly", response_model=List[Weekly_Count])
+async def fetch_weekly_counts(
+    department_id: Optional[int] = Query(None),
+    focus_area_id: Optional[int] = Query(None),
+    from_week: Optional[date] = Query(None, description="First week (any day in it)"),
+    to_week: Optional[date] = Query(None, description="Last week (any day in it)"),
+    db: DBSession = Depends(get_session),
+):
+    return _model_response(_WEEKLY_JSON, await run_db(db, analytics.weekly_counts, department_id, focus_area_id, from_week, to_week))
+
+
+@router.get("/analytics/teachers", response_model=List[Teacher_Coverage])
+async def fetch_teacher_coverage(
+    focus_area_id: Optional[int] = Query(None, description="Coverage of one focus area only"),
+    db: DBSession = Depends(get_session),
+):
+    return _model_response(_COVERAGE_JSON, await run_db(db, analytics.teacher_coverage, focus_area_id))
+
+
+# EN: ---- Form bootstrap: every lookup list (+ the observation being edited) in one round trip ----
+# BR: ---- Bootstrap do formulário: todas as listas (+ a observação em edição) numa ida e volta ----
+@router.get("/bootstrap")
+async def bootstrap(
+    request: Request,
+    observation_id: Optional[int] = Query(None, ge=1, description="Include this observation (edit form)"),
+    db: DBSession = Depends(get_session),
+):
+    version = ref_cache.version
+    entries = {name: ref_cache.get(name) for name in _REF_BUILDERS}
+    missing = [name for name, entry in entries.items() if entry is None]
+
+    # EN: Whatever is not cached is loaded in a single session / threadpool hop
+    # BR: O que não está em cache é carregado numa única sessão / ida ao threadpool
+    def _load(s: Session):
+        lists = {name: _REF_BUILDERS[name](s) for name in missing}
+        detail = None
+        if observation_id is not None:
+            obs = _load_observation(s, observation_id)
+            detail = _observation_detail(obs) if obs else None
+        return lists, detail
+
+    lists, detail = ({}, None)
+    if missing or observation_id is not None:
+        lists, detail = await run_db(db, _load)
+    if observation_id is not None and detail is None:
+        raise HTTPException(status_code=404, detail="Observation not found")
+    for name, body in lists.items():
+        entries[name] = ref_cache.put(name, version, body)
+
+    # EN: Splice the cached JSON bytes, no re-serialisation / BR: Unir os bytes JSON do cache, sem re-serializar
+    parts = [b'"%s":%s' % (name.encode(), entries[name][0]) for name in _REF_BUILDERS]
+    parts.append(b'"observation":' + json.dumps(detail).encode())
+    body = b"{" + b",".join(parts) + b"}"
+
+    headers = {"Cache-Control": "private, no-cache"}
+    if observation_id is None:
+        # EN: Lists only: the ETag follows the cached list versions / BR: Só listas: o ETag segue as versões em cache
+        headers["ETag"] = '"%s"' % hashlib.sha256("".join(entries[n][1] for n in _REF_BUILDERS).encode()).hexdigest()[:32]
+        if _etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -1,6 +1,6 @@
-from pydantic import BaseModel, EmailStr, ConfigDict
+from pydantic import BaseModel, EmailStr, ConfigDict, field_validator
 from typing import Optional
-from datetime import datetime
+from datetime import date, datetime, timezone
 
 class ORMModel(BaseModel):
    model_config = ConfigDict(from_attributes=True)
@@ -17,6 +17,32 @@ class Create_Observation(ORMModel):
    Observation_Weaknesses: Optional[str] = None
    Observation_Comments: Optional[str] = None
 
+# EN: One row of a bulk import: a create plus an optional historical date
+# BR: Uma linha de importação em massa: uma criação mais uma data histórica opcional
+class Import_Observation(Create_Observation):
+
+   Observation_Date: Optional[datetime] = None
+
+   # EN: Spreadsheet exports often use day-first dates; stored as naive UTC like server_default
+   # BR: Planilhas exportam datas com o dia primeiro; guardadas como UTC sem fuso, como o server_default
+   @field_validator("Observation_Date", mode="before")
+   @classmethod
+   def _day_first_dates(cls, value):
+      if isinstance(value, str):
+         for fmt in ("%d/%m/%Y %H:%M", "%d/%m/%Y"):
+            try:
+               return datetime.strptime(value.strip(), fmt)
+            except ValueError:
+               pass
+      return value
+
+   @field_validator("Observation_Date")
+   @classmethod
+   def _naive_utc(cls, value):
+      if value is not None and value.tzinfo is not None:
+         return value.astimezone(timezone.utc).replace(tzinfo=None)
+      return value
+
 # EN: Schema for updating an observation via API
 # BR: Esquema para atualizar uma observação através da API
 class Update_Observation(ORMModel):
@@ -43,6 +69,9 @@ class Observations_List(ORMModel):
    Observation_Class: str
    Observation_Department: str
    Observation_Focus: str
+   # EN: Highlighted match, only on search results (q=)
+   # BR: Trecho destacado, apenas em resultados de busca (q=)
+   Snippet: Optional[str] = None
    
 # EN: Schema for returning list of departments  
 # BR: Esquema para retornar uma lista de departamentos
@@ -78,11 +107,41 @@ class Create_Flag(ORMModel):
    FocusArea: int
    Is_Open: bool = True
 
+# EN: Schema for updating a flag (close/reopen, reclassify)
+# BR: Esquema para atualizar um indicador (fechar/reabrir, reclassificar)
+class Update_Flag(ORMModel):
+   FlagType: int | None = None
+   FocusArea: int | None = None
+   Is_Open: bool | None = None
+
+# EN: Schema for returning list of flags (one joined row each)
+# BR: Esquema para retornar uma lista de indicadores (uma linha unida cada)
 class Flags_List(ORMModel):
    Flag_ID: int
-   Teacher: str
-   Focus_Area: str
+   Observation_ID: int
+   Flag_Type: Optional[str] = None
+   Teacher_ID: Optional[int] = None
+   Teacher: Optional[str] = None
+   Focus_Area: Optional[str] = None
    Flag_Date: datetime
    Is_Open: bool
 
+# EN: Schema for one week of the department x focus area series
+# BR: Esquema para uma semana da série departamento x foco
+class Weekly_Count(ORMModel):
+   Week_Start: date
+   Department_ID: int
+   Department_Name: Optional[str] = None
+   FocusArea_ID: int
+   FocusArea_Name: Optional[str] = None
+   Observation_Count: int
 
+# EN: Schema for one teacher's observation coverage
+# BR: Esquema para a cobertura de observações de um professor
+class Teacher_Coverage(ORMModel):
+   Teacher_ID: int
+   Teacher_Forename: str
+   Teacher_Surname: str
+   Observation_Count: int
+   Focus_Areas_Covered: int
+   Last_Observed: Optional[datetime] = None
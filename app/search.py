@@ -0,0 +1,91 @@
+import os
+import html
+from typing import Optional
+
+from sqlalchemy import Integer, event, func, literal_column
+from sqlalchemy.sql import column, table
+
+from .models.observation import Observation
+
+# EN: Tokens around each hit in a snippet / BR: Tokens ao redor de cada ocorrência no trecho
+SEARCH_SNIPPET_TOKENS = int(os.getenv("SEARCH_SNIPPET_TOKENS", "12"))
+
+# EN: FTS5 index over the feedback columns, external content = Observations
+# BR: Índice FTS5 das colunas de feedback, conteúdo externo = Observations
+FTS_TABLE = "Observations_fts"
+FTS_COLUMNS = ("Observation_Strengths", "Observation_Weaknesses", "Observation_Comments")
+
+_cols = ", ".join(f'"{c}"' for c in FTS_COLUMNS)
+_new = ", ".join(f'new."{c}"' for c in FTS_COLUMNS)
+_old = ", ".join(f'old."{c}"' for c in FTS_COLUMNS)
+
+FTS_DDL = [
+    f'CREATE VIRTUAL TABLE IF NOT EXISTS "{FTS_TABLE}" USING fts5({_cols}, '
+    f"content='Observations', content_rowid='Observation_ID', tokenize='porter unicode61')",
+    # EN: Triggers keep the index in step with every write path (ORM, bulk, raw SQL)
+    # BR: Gatilhos mantêm o índice em dia com toda escrita (ORM, em massa, SQL bruto)
+    f'CREATE TRIGGER IF NOT EXISTS "Observations_fts_ai" AFTER INSERT ON "Observations" BEGIN '
+    f'INSERT INTO "{FTS_TABLE}"(rowid, {_cols}) VALUES (new."Observation_ID", {_new}); END',
+    f'CREATE TRIGGER IF NOT EXISTS "Observations_fts_ad" AFTER DELETE ON "Observations" BEGIN '
+    f'INSERT INTO "{FTS_TABLE}"("{FTS_TABLE}", rowid, {_cols}) VALUES (\'delete\', old."Observation_ID", {_old}); END',
+    f'CREATE TRIGGER IF NOT EXISTS "Observations_fts_au" AFTER UPDATE OF {_cols} ON "Observations" BEGIN '
+    f'INSERT INTO "{FTS_TABLE}"("{FTS_TABLE}", rowid, {_cols}) VALUES (\'delete\', old."Observation_ID", {_old}); '
+    f'INSERT INTO "{FTS_TABLE}"(rowid, {_cols}) VALUES (new."Observation_ID", {_new}); END',
+]
+FTS_REBUILD = f'INSERT INTO "{FTS_TABLE}"("{FTS_TABLE}") VALUES (\'rebuild\')'
+FTS_DROP = [
+    'DROP TRIGGER IF EXISTS "Observations_fts_au"',
+    'DROP TRIGGER IF EXISTS "Observations_fts_ad"',
+    'DROP TRIGGER IF EXISTS "Observations_fts_ai"',
+    f'DROP TABLE IF EXISTS "{FTS_TABLE}"',
+]
+
+
+# EN: Databases built with create_all get the index too (migration 0004 covers Alembic)
+# BR: Bancos criados com create_all também recebem o índice (migração 0004 cobre o Alembic)
+@event.listens_for(Observation.__table__, "after_create")
+def _create_fts(_target, connection, **_kw):
+    if connection.dialect.name == "sqlite":
+        for stmt in FTS_DDL:
+            connection.exec_driver_sql(stmt)
+
+
+@event.listens_for(Observation.__table__, "before_drop")
+def _drop_fts(_target, connection, **_kw):
+    if connection.dialect.name == "sqlite":
+        for stmt in FTS_DROP:
+            connection.exec_driver_sql(stmt)
+
+
+# EN: Query building blocks / BR: Blocos de construção da consulta
+fts = table(FTS_TABLE, column("rowid", Integer))
+_fts_ref = literal_column(f'"{FTS_TABLE}"')
+
+# EN: bm25: lower is more relevant / BR: bm25: menor é mais relevante
+fts_rank = func.bm25(_fts_ref)
+
+# EN: Control characters as markers, so user text can be escaped before <mark> goes in
+# BR: Caracteres de controle como marcadores, para escapar o texto antes de inserir <mark>
+_HIT_START, _HIT_END = "\x02", "\x03"
+fts_snippet = func.snippet(_fts_ref, -1, _HIT_START, _HIT_END, "…", SEARCH_SNIPPET_TOKENS)
+
+
+def fts_query(text: str) -> Optional[str]:
+    """EN: Free text -> FTS5 query: every word as a quoted term (implicit AND), so
+    punctuation in user input can never be a syntax error.
+    BR: Texto livre -> consulta FTS5: cada palavra como termo entre aspas (AND
+    implícito), para que pontuação do usuário nunca seja erro de sintaxe."""
+    terms = ['"' + word.replace('"', '""') + '"' for word in text.split()]
+    return " ".join(terms) or None
+
+
+def fts_match(text: str):
+    return _fts_ref.op("MATCH")(fts_query(text))
+
+
+def highlight(snippet: Optional[str]) -> Optional[str]:
+    """EN: HTML-escape the snippet, then turn markers into <mark>
+    BR: Escapar o trecho em HTML e trocar marcadores por <mark>"""
+    if snippet is None:
+        return None
+    return html.escape(snippet).replace(_HIT_START, "<mark>").replace(_HIT_END, "</mark>")
@@ -0,0 +1,108 @@
+"""EN: Core reference data (departments, teachers, focus areas, flag types, PDF templates).
+
+Seeding is versioned through SQLite's `PRAGMA user_version`: a database at
+SEED_VERSION costs one PRAGMA read on startup. Otherwise the missing steps run
+in one BEGIN IMMEDIATE transaction that also bumps the version, so concurrent
+workers seed once and a crash leaves nothing half-written. To change the seed
+data, append a step to _STEPS; never edit a step that has shipped.
+
+BR: Dados de referência básicos. O seeding é versionado pelo `PRAGMA user_version`
+do SQLite: um banco já em SEED_VERSION custa uma leitura de PRAGMA na
+inicialização. Senão, os passos faltantes rodam numa única transação BEGIN
+IMMEDIATE que também atualiza a versão. Para mudar os dados, acrescente um passo
+em _STEPS; nunca edite um passo já publicado.
+"""
+import logging
+from typing import Callable, List
+
+from sqlalchemy import Table, insert, select
+from sqlalchemy.engine import Connection, Engine
+
+from ..database import immediate_transaction
+from ..models.models import Department, FlagType, FocusArea, Template, User
+from ..pdf_templates import DEFAULT_TEMPLATE_FILE
+
+logger = logging.getLogger("focused.seeds")
+
+DEPARTMENTS = ["Religious Studies", "Computing", "French"]
+
+TEACHERS = [
+    ("Chloe", "Chen", "focused-app.user1@maildrop.cc"),
+    ("Colleen", "Murphy", "focused-app.user2@maildrop.cc"),
+    ("Peter", "Robinson", "focused-app.user3@maildrop.cc"),
+    ("Laura", "Williams", "focused-app.user4@maildrop.cc"),
+    ("Steven", "Ingram", "focused-app.user5@maildrop.cc"),
+    ("Anna", "Masters", "focused-app.user6@maildrop.cc"),
+    ("Taissa", "Hubbard", "focused-app.user7@maildrop.cc"),
+    ("Sally", "Mannon", "focused-app.user8@maildrop.cc"),
+]
+
+FOCUS_AREAS = [
+    "Synoptic", "Subject knowledge", "Explanations", "Questioning", "Feedback",
+    "Modelling", "Metacognition", "Memory", "Behaviour",
+]
+
+FLAG_TYPES = ["Exemplary", "Practice Alert"]
+
+# EN: (name, file in app/templates, default) / BR: (nome, arquivo em app/templates, padrão)
+PDF_TEMPLATES = [("Standard", DEFAULT_TEMPLATE_FILE, True)]
+
+
+def _fill_if_empty(conn: Connection, table: Table, rows: List[dict]) -> None:
+    """EN: Insert rows only into an empty table (keeps hand-edited data) / BR: Inserir só em tabela vazia (preserva dados editados)"""
+    if conn.execute(select(table).limit(1)).first() is None:
+        conn.execute(insert(table), rows)
+
+
+def _v1_reference_data(conn: Connection) -> None:
+    _fill_if_empty(conn, Department.__table__, [{"Department_Name": name} for name in DEPARTMENTS])
+    _fill_if_empty(conn, User.__table__, [
+        {"User_Forename": forename, "User_Surname": surname, "User_Email": email}
+        for forename, surname, email in TEACHERS
+    ])
+    _fill_if_empty(conn, FocusArea.__table__, [{"FocusArea_Name": name} for name in FOCUS_AREAS])
+    _fill_if_empty(conn, FlagType.__table__, [{"FlagType_Name": name} for name in FLAG_TYPES])
+
+
+def _v2_pdf_templates(conn: Connection) -> None:
+    _fill_if_empty(conn, Template.__table__, [
+        {"Template_Name": name, "Template_File": file, "Is_Default": default}
+        for name, file, default in PDF_TEMPLATES
+    ])
+
+
+# EN: Step N brings a database to user_version N; append only
+# BR: O passo N leva um banco ao user_version N; apenas acrescentar
+_STEPS: List[Callable[[Connection], None]] = [_v1_reference_data, _v2_pdf_templates]
+SEED_VERSION = len(_STEPS)
+
+
+def _version(conn: Connection) -> int:
+    return conn.exec_driver_sql("PRAGMA user_version").scalar()
+
+
+def seed(target: Engine) -> bool:
+    """EN: Bring the core data to SEED_VERSION; returns False when it already was
+    BR: Leva os dados básicos a SEED_VERSION; retorna False se já estavam"""
+    with target.connect() as conn:
+        if _version(conn) >= SEED_VERSION:
+            return False
+
+    with immediate_transaction(target) as conn:
+        # EN: Another worker may have seeded while we waited for the lock
+        # BR: Outro worker pode ter populado enquanto esperávamos o lock
+        current = _version(conn)
+        if current >= SEED_VERSION:
+            return False
+        for step in _STEPS[current:]:
+            step(conn)
+        conn.exec_driver_sql(f"PRAGMA user_version = {SEED_VERSION}")
+
+    logger.info("core data seeded", extra={"from_version": current, "to_version": SEED_VERSION})
+    return True
+
+
+if __name__ == "__main__":
+    from ..database import engine
+
+    print("seeded" if seed(engine) else f"already at seed version {SEED_VERSION}")
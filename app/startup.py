@@ -0,0 +1,201 @@
+"""EN: Cold-start database preparation: schema check, then the core seed.
+
+DB_SCHEMA_MODE picks how the schema is handled when a worker starts:
+
+  check       (default) compare alembic_version with the migration head, read
+              straight from alembic/versions without importing Alembic. At head
+              nothing else runs. Under one BEGIN IMMEDIATE transaction, so
+              parallel workers do it once: an empty database gets create_all plus
+              a stamp at head; a stamped database behind head is migrated with
+              `alembic upgrade head` on that same connection. A database with
+              tables but no alembic_version (made by create_all before
+              migrations existed) is stamped 0001_baseline and upgraded, if its
+              tables and columns are exactly the baseline's; anything else is
+              not touched and startup fails with SchemaError, because its
+              revision cannot be known.
+  create_all  the previous behaviour: create_all on every start
+  off         leave the schema alone (migrations are run by the deploy)
+
+BR: Preparação do banco na partida a frio: verificação do esquema, depois o seed
+básico. `check` (padrão) compara alembic_version com o head das migrações sem
+importar o Alembic; no head nada mais roda. Numa única transação BEGIN IMMEDIATE:
+um banco vazio recebe create_all e o carimbo do head; um banco carimbado atrás do
+head roda `alembic upgrade head` na mesma conexão. Um banco com tabelas e sem
+alembic_version (criado por create_all antes das migrações) é carimbado em
+0001_baseline e atualizado, se suas tabelas e colunas forem exatamente as do
+baseline; qualquer outro não é tocado e a partida falha com SchemaError. `create_all`
+mantém o comportamento anterior; `off` não mexe no esquema.
+"""
+import configparser
+import logging
+import os
+import pathlib
+import re
+import time
+from typing import Dict, FrozenSet, Optional, Tuple
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Connection, Engine
+
+from .database import Base, immediate_transaction
+from .seeds import seed_core
+
+logger = logging.getLogger("focused.startup")
+
+DB_SCHEMA_MODE = os.getenv("DB_SCHEMA_MODE", "check").lower()
+ALEMBIC_CONFIG = pathlib.Path(os.getenv("ALEMBIC_CONFIG", pathlib.Path(__file__).resolve().parent.parent / "alembic.ini"))
+
+# EN: `revision: str = "..."` / `down_revision: ... = "..."` (or a tuple, for merges)
+# BR: `revision: str = "..."` / `down_revision: ... = "..."` (ou uma tupla, em merges)
+_REVISION = re.compile(r'^revision\b[^=\n]*=\s*["\']([^"\']+)["\']', re.M)
+_DOWN_REVISION = re.compile(r"^down_revision\b[^=\n]*=(.*)$", re.M)
+_QUOTED = re.compile(r'["\']([^"\']+)["\']')
+
+# EN: Alembic's default version table / BR: A tabela de versão padrão do Alembic
+_VERSION_TABLE_DDL = (
+    "CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL, "
+    "CONSTRAINT alembic_version_pkc PRIMARY KEY (version_num))"
+)
+# EN: The schema create_all made before migrations existed
+# BR: O esquema que o create_all criava antes das migrações existirem
+BASELINE_REVISION = "0001_baseline"
+
+
+class SchemaError(RuntimeError):
+    """EN: The schema cannot be brought to the migration head automatically
+    BR: O esquema não pode ser levado ao head das migrações automaticamente"""
+
+
+def migration_head() -> Optional[str]:
+    """EN: The single head of the version scripts, or None (no scripts, or several heads)
+    BR: O único head dos scripts de versão, ou None (sem scripts, ou vários heads)"""
+    if not ALEMBIC_CONFIG.is_file():
+        return None
+    parser = configparser.ConfigParser(defaults={"here": str(ALEMBIC_CONFIG.parent)})
+    parser.read(ALEMBIC_CONFIG)
+    versions = pathlib.Path(parser.get("alembic", "script_location", fallback="")) / "versions"
+
+    revisions, parents = set(), set()
+    for path in versions.glob("*.py"):
+        source = path.read_text(encoding="utf-8")
+        revision = _REVISION.search(source)
+        if revision is None:
+            continue
+        revisions.add(revision.group(1))
+        down = _DOWN_REVISION.search(source)
+        if down is not None:
+            parents.update(_QUOTED.findall(down.group(1)))
+    heads = revisions - parents
+    return heads.pop() if len(heads) == 1 else None
+
+
+def _schema_state(conn: Connection) -> Tuple[bool, Tuple[str, ...]]:
+    """EN: (has any table, alembic_version rows) / BR: (tem alguma tabela, linhas de alembic_version)"""
+    tables = {name for (name,) in conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    if "alembic_version" not in tables:
+        return bool(tables), ()
+    return True, tuple(v for (v,) in conn.exec_driver_sql("SELECT version_num FROM alembic_version"))
+
+
+def _upgrade(conn: Connection) -> None:
+    """EN: `alembic upgrade head` on this connection, inside its transaction
+    BR: `alembic upgrade head` nesta conexão, dentro da sua transação"""
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(str(ALEMBIC_CONFIG))
+    config.attributes["connection"] = conn
+    command.upgrade(config, "head")
+
+
+def _columns(conn: Connection) -> Dict[str, FrozenSet[str]]:
+    """EN: Column names per table, ignoring SQLite's and Alembic's own tables
+    BR: Nomes de colunas por tabela, ignorando as tabelas do SQLite e do Alembic"""
+    tables = [name for (name,) in conn.exec_driver_sql(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' AND name != 'alembic_version'"
+    )]
+    return {
+        table: frozenset(row[1] for row in conn.exec_driver_sql(f'PRAGMA table_info("{table}")'))
+        for table in tables
+    }
+
+
+def _matches_baseline(conn: Connection) -> bool:
+    """EN: Whether the tables are exactly those of BASELINE_REVISION (built in memory to compare)
+    BR: Se as tabelas são exatamente as de BASELINE_REVISION (construído em memória para comparar)"""
+    from alembic import command
+    from alembic.config import Config
+
+    scratch = create_engine("sqlite://")
+    try:
+        with scratch.begin() as baseline:
+            config = Config(str(ALEMBIC_CONFIG))
+            config.attributes["connection"] = baseline
+            command.upgrade(config, BASELINE_REVISION)
+            expected = _columns(baseline)
+    finally:
+        scratch.dispose()
+    return _columns(conn) == expected
+
+
+def prepare_schema(target: Engine) -> str:
+    """EN: Apply DB_SCHEMA_MODE; returns what happened (current, created, upgraded, create_all, skipped)
+    BR: Aplica DB_SCHEMA_MODE; retorna o que aconteceu (current, created, upgraded, create_all, skipped)"""
+    if DB_SCHEMA_MODE == "off":
+        return "skipped"
+    if DB_SCHEMA_MODE == "create_all":
+        Base.metadata.create_all(bind=target)
+        return "create_all"
+
+    head = migration_head()
+    if head is not None:
+        # EN: Warm start: one read, no lock / BR: Partida quente: uma leitura, sem lock
+        with target.connect() as conn:
+            if _schema_state(conn)[1] == (head,):
+                return "current"
+
+    with immediate_transaction(target) as conn:
+        has_tables, revisions = _schema_state(conn)
+        if head is not None and revisions == (head,):
+            # EN: Another worker got here first / BR: Outro worker chegou antes
+            return "current"
+
+        if not has_tables:
+            Base.metadata.create_all(bind=conn)
+            if head is None:
+                logger.warning("migration scripts not found; ran create_all", extra={"alembic_config": str(ALEMBIC_CONFIG)})
+                return "create_all"
+            conn.exec_driver_sql(_VERSION_TABLE_DDL)
+            conn.exec_driver_sql("INSERT INTO alembic_version (version_num) VALUES (?)", (head,))
+            logger.info("database created at migration head", extra={"head": head})
+            return "created"
+
+        if head is None:
+            logger.warning("migration scripts not found; schema left as is", extra={"alembic_config": str(ALEMBIC_CONFIG)})
+            return "skipped"
+        if not revisions:
+            if not _matches_baseline(conn):
+                raise SchemaError(
+                    "database has tables but no alembic_version, and they do not match "
+                    f"{BASELINE_REVISION}; run `alembic stamp <revision it matches> && alembic upgrade head`"
+                )
+            # EN: Pre-migration create_all database: stamp, then upgrade in the same transaction
+            # BR: Banco de create_all anterior às migrações: carimbar, depois atualizar na mesma transação
+            conn.exec_driver_sql(_VERSION_TABLE_DDL)
+            conn.exec_driver_sql("INSERT INTO alembic_version (version_num) VALUES (?)", (BASELINE_REVISION,))
+            logger.info("unversioned database stamped at baseline", extra={"revision": BASELINE_REVISION})
+            revisions = (BASELINE_REVISION,)
+        _upgrade(conn)
+
+    logger.info("database upgraded to migration head", extra={"revision": ",".join(revisions), "head": head})
+    return "upgraded"
+
+
+def prepare_database(target: Engine) -> None:
+    """EN: Schema, then core data; both cheap when already done / BR: Esquema, depois dados básicos; ambos baratos quando já feitos"""
+    started = time.perf_counter()
+    schema = prepare_schema(target)
+    seeded = seed_core.seed(target)
+    logger.info("database ready", extra={
+        "schema": schema, "seeded": seeded, "ms": round((time.perf_counter() - started) * 1000, 1),
+    })
@@ -0,0 +1,105 @@
+"""EN: Dashboard query cost: summary tables vs aggregating Observations.
+
+Builds a fresh SQLite database through the Alembic migrations, seeds synthetic
+observations (1M by default) with the same seeder as the query-plan check,
+rebuilds the analytics summaries and times the weekly series and teacher
+coverage both ways. Also times apply() for a create and a delete.
+
+BR: Custo das consultas do painel: tabelas de resumo vs agregar Observations.
+
+Usage / Uso:
+    python -m benchmarks.analytics --rows 1000000
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+
+from benchmarks.query_plans import seed
+
+# EN: What a dashboard would otherwise run on the fact table / BR: O que o painel rodaria na tabela de fatos
+_ADHOC_WEEKLY = (
+    'SELECT date("Observation_Date", \'weekday 0\', \'-6 days\') AS w, "Observation_Department", "Observation_Focus", count(*) '
+    'FROM "Observations" WHERE "Observation_Department" = :dept GROUP BY 1, 2, 3 ORDER BY 1'
+)
+_ADHOC_COVERAGE = (
+    'SELECT u."User_ID", count(o."Observation_ID"), count(DISTINCT o."Observation_Focus"), max(o."Observation_Date") '
+    'FROM "Users" u LEFT JOIN "Observations" o ON o."Observation_Teacher" = u."User_ID" GROUP BY u."User_ID"'
+)
+
+
+def _time(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - t) * 1000)
+    return statistics.median(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--teachers", type=int, default=400)
+    parser.add_argument("--departments", type=int, default=25)
+    parser.add_argument("--focus-areas", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--db", help="SQLite file to (re)create; defaults to a temp file")
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(), "analytics.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    # EN: Import after the URL is set / BR: Importar depois de definir a URL
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy import text
+    from sqlalchemy.orm import Session
+
+    from app import analytics
+    from app.database import engine
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command.upgrade(Config(os.path.join(root, "alembic.ini")), "head")
+
+    t0 = time.perf_counter()
+    seed(db_path, args.rows, args.teachers, args.departments, args.focus_areas)
+    print(f"seeded {args.rows} observations in {time.perf_counter() - t0:.1f}s")
+
+    with Session(engine) as s:
+        t0 = time.perf_counter()
+        analytics.rebuild(s)
+        print(f"rebuild: {time.perf_counter() - t0:.2f}s")
+
+        print(f"{'query':<34} {'summary ms':>11} {'ad hoc ms':>10}")
+        rows = [
+            ("weekly, one department",
+             lambda: analytics.weekly_counts(s, department_id=3),
+             lambda: s.execute(text(_ADHOC_WEEKLY), {"dept": 3}).all()),
+            ("weekly, all departments, one term",
+             lambda: analytics.weekly_counts(s, from_week=date(2024, 1, 1), to_week=date(2024, 3, 31)),
+             None),
+            ("teacher coverage",
+             lambda: analytics.teacher_coverage(s),
+             lambda: s.execute(text(_ADHOC_COVERAGE)).all()),
+        ]
+        for label, summary, adhoc in rows:
+            fast = _time(summary, args.repeat)
+            slow = f"{_time(adhoc, args.repeat):>10.1f}" if adhoc else f"{'-':>10}"
+            print(f"{label:<34} {fast:>11.1f} {slow}")
+
+        # EN: Write-path overhead per observation / BR: Custo extra por observação na escrita
+        key = analytics.ObservationKey(3, 3, 3, datetime(2024, 3, 6, 10, 0))
+        write = _time(lambda: (analytics.apply(s, None, key), analytics.apply(s, key, None)), args.repeat * 20)
+        s.rollback()
+        print(f"apply() create + delete: {write:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
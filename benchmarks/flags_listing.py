@@ -0,0 +1,135 @@
+"""EN: Scaling check for the flags listing (GET /api/flags).
+
+Builds a fresh SQLite database through the Alembic migrations, seeds
+observations with the query-plan seeder plus synthetic flags (100k by default,
+~15% open), then for every filter combination checks EXPLAIN QUERY PLAN (no
+scan-then-sort of Flags, no temp B-tree sort on the open listing) and times the
+first page and a page deep into the keyset. Also walks every page of the open
+listing to show per-page cost stays flat. Fails (exit 1) on a bad plan.
+
+BR: Verificação de escala da listagem de indicadores. Cria um banco via
+migrações do Alembic, popula observações e indicadores sintéticos e falha se
+algum plano varrer Flags e depois ordenar em B-tree temporária.
+
+Usage / Uso:
+    python -m benchmarks.flags_listing --flags 100000
+"""
+import argparse
+import itertools
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.query_plans import seed
+
+
+def seed_flags(db_path: str, flags: int, observations: int, focus_areas: int, open_ratio: float) -> None:
+    """EN: Raw inserts / BR: Inserções brutas"""
+    con = sqlite3.connect(db_path)
+    con.executemany('INSERT INTO "FlagTypes" ("FlagType_Name") VALUES (?)', [("Exemplary",), ("Practice Alert",)])
+    rnd = random.Random(7)
+    con.executemany(
+        'INSERT INTO "Flags" ("Observation", "FlagType", "FocusArea", "Is_Open") VALUES (?, ?, ?, ?)',
+        (
+            (rnd.randint(1, observations), rnd.randint(1, 2), rnd.randint(1, focus_areas), int(rnd.random() < open_ratio))
+            for _ in range(flags)
+        ),
+    )
+    con.commit()
+    con.execute("ANALYZE")
+    con.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--flags", type=int, default=100_000)
+    parser.add_argument("--observations", type=int, default=200_000)
+    parser.add_argument("--teachers", type=int, default=400)
+    parser.add_argument("--departments", type=int, default=25)
+    parser.add_argument("--focus-areas", type=int, default=12)
+    parser.add_argument("--open-ratio", type=float, default=0.15)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--db", help="SQLite file to (re)create; defaults to a temp file")
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(), "flags.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    # EN: Import after the URL is set / BR: Importar depois de definir a URL
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy.orm import Session
+
+    from app.database import engine
+    from app import routes
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command.upgrade(Config(os.path.join(root, "alembic.ini")), "head")
+
+    t0 = time.perf_counter()
+    seed(db_path, args.observations, args.teachers, args.departments, args.focus_areas)
+    seed_flags(db_path, args.flags, args.observations, args.focus_areas, args.open_ratio)
+    print(f"seeded {args.observations} observations and {args.flags} flags in {time.perf_counter() - t0:.1f}s")
+
+    limit = routes.FLAGS_PAGE_SIZE
+    deep_cursor = args.flags // 2
+    failures = 0
+    names = ("flag_type_id", "focus_area_id", "teacher_id")
+    print(f"{'':4} {'status':<6} {'filters':<40} {'cursor':<6} {'p50 ms':>7}  plan")
+    with Session(engine) as db, engine.connect() as conn:
+        for status in ("open", "all"):
+            for size in range(len(names) + 1):
+                for combo in itertools.combinations(names, size):
+                    values = {name: (2 if name in combo else None) for name in names}
+                    for after in (None, deep_cursor):
+                        q = routes._flags_query(status, after_id=after, **values).limit(limit + 1)
+                        sql = str(q.compile(engine, compile_kwargs={"literal_binds": True}))
+                        plan = [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]
+                        # EN: A rowid-order scan stops at the LIMIT; scanning and then sorting does not
+                        # BR: Uma varredura em ordem de rowid para no LIMIT; varrer e depois ordenar não
+                        full_scan = any(p.startswith("SCAN Flags") and "INDEX" not in p for p in plan)
+                        ok = not (full_scan and any("TEMP B-TREE" in p for p in plan))
+                        # EN: The open listing must come off an index already in Flag_ID order
+                        # BR: A listagem de abertos deve sair de um índice já em ordem de Flag_ID
+                        if status == "open" and "teacher_id" not in combo:
+                            ok = ok and not any("TEMP B-TREE" in p for p in plan)
+                        failures += not ok
+
+                        timings = []
+                        for _ in range(args.repeat):
+                            t = time.perf_counter()
+                            db.execute(q).all()
+                            timings.append((time.perf_counter() - t) * 1000)
+                        label = ",".join(combo) or "(none)"
+                        print(
+                            f"{'ok  ' if ok else 'FAIL'} {status:<6} {label:<40} {'deep' if after else '-':<6}"
+                            f" {statistics.median(timings):>7.2f}  {' | '.join(plan)}"
+                        )
+
+        # EN: Walk the whole open listing page by page / BR: Percorrer toda a listagem de abertos página a página
+        pages, timings, after = 0, [], None
+        while True:
+            t = time.perf_counter()
+            rows = db.execute(routes._flags_query("open", after_id=after).limit(limit + 1)).all()
+            timings.append((time.perf_counter() - t) * 1000)
+            pages += 1
+            if len(rows) <= limit:
+                break
+            after = rows[limit - 1].Flag_ID
+        print(
+            f"walked {pages} open pages: first {timings[0]:.2f} ms, last {timings[-1]:.2f} ms,"
+            f" p50 {statistics.median(timings):.2f} ms, max {max(timings):.2f} ms"
+        )
+
+    print(f"{failures} failing plan(s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+"""EN: Response rendering throughput for 10k-row payloads, default vs FAST_JSON.
+
+Builds a fresh SQLite database through the Alembic migrations, seeds synthetic
+observations and flags, then requests 10k-row pages of GET /api/observations
+and GET /api/flags in-process (httpx ASGI transport, no network) with
+routes.FAST_JSON off and on. The default path is FastAPI's serialize_response
+(response_model validation, a to-Python JSON-mode dump) followed by
+JSONResponse's json.dumps; FAST_JSON validates once with pydantic-core and
+dumps straight to bytes. It also times the rendering step
+alone on the same 10k items, and checks both modes return identical bytes.
+
+BR: Vazão da renderização de respostas com 10k linhas, padrão vs FAST_JSON.
+Requisições em processo (transporte ASGI do httpx) com routes.FAST_JSON desligado
+e ligado, mais o tempo só da renderização; confere que os bytes são idênticos.
+
+Usage / Uso:
+    python -m benchmarks.json_render --rows 10000 --repeat 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from benchmarks.flags_listing import seed_flags
+from benchmarks.query_plans import seed
+
+
+def _timed(fn, repeat: int) -> float:
+    """EN: Median seconds of fn() / BR: Mediana em segundos de fn()"""
+    fn()
+    timings = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - t)
+    return statistics.median(timings)
+
+
+async def _timed_async(fn, repeat: int) -> float:
+    await fn()
+    timings = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        await fn()
+        timings.append(time.perf_counter() - t)
+    return statistics.median(timings)
+
+
+def _row(name: str, rows: int, default_s: float, fast_s: float) -> dict:
+    return {
+        "case": name,
+        "rows": rows,
+        "default_ms": round(default_s * 1000, 1),
+        "fast_ms": round(fast_s * 1000, 1),
+        "default_rows_per_s": round(rows / default_s),
+        "fast_rows_per_s": round(rows / fast_s),
+        "speedup": round(default_s / fast_s, 2),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000, help="rows per response")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--db", help="SQLite file to (re)create; defaults to a temp file")
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(), "render.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ["OBSERVATIONS_MAX_PAGE_SIZE"] = str(args.rows)
+    os.environ.setdefault("OUTBOX_WORKER", "0")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    # EN: Import after the environment is set / BR: Importar depois de definir o ambiente
+    import httpx
+    from alembic import command
+    from alembic.config import Config
+    from fastapi.responses import JSONResponse
+    from fastapi.routing import serialize_response
+    from sqlalchemy.orm import Session
+
+    from app import routes
+    from app.database import engine
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command.upgrade(Config(os.path.join(root, "alembic.ini")), "head")
+
+    t0 = time.perf_counter()
+    observations = max(args.rows * 2, 50_000)
+    seed(db_path, observations, 400, 25, 12)
+    seed_flags(db_path, args.rows * 2, observations, 12, 1.0)
+    print(f"seeded {observations} observations in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+    # EN: After seeding: importing the app runs its startup DDL / BR: Depois de popular: importar o app roda o DDL de inicialização
+    from app.main import app
+
+    results = []
+
+    # EN: Rendering step alone, same items both ways / BR: Só a renderização, mesmos itens nos dois modos
+    with Session(engine) as db:
+        items = [routes._list_item(row) for row in db.execute(routes._observation_list_query([], None).limit(args.rows))]
+    field = next(r for r in app.routes if getattr(r, "path", None) == "/api/observations").response_field
+
+    def default_render() -> bytes:
+        # EN: What FastAPI runs for response_model routes / BR: O que o FastAPI executa em rotas com response_model
+        content = asyncio.run(serialize_response(field=field, response_content=items, exclude_unset=True))
+        return JSONResponse(content).body
+
+    def fast_render() -> bytes:
+        return routes._OBSERVATIONS_JSON.dump_json(routes._OBSERVATIONS_JSON.validate_python(items), exclude_unset=True)
+
+    if default_render() != fast_render():
+        print("rendered bytes differ between modes", file=sys.stderr)
+        return 1
+    results.append(_row("render only (observations)", len(items), _timed(default_render, args.repeat), _timed(fast_render, args.repeat)))
+
+    # EN: Whole request through the app / BR: Requisição inteira pela aplicação
+    async def requests() -> None:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name, path in (("GET /api/observations", "/api/observations"), ("GET /api/flags", "/api/flags")):
+                params = {"limit": args.rows}
+                bodies, medians = [], []
+                for fast in (False, True):
+                    routes.FAST_JSON = fast
+
+                    async def call(path: str = path, params: dict = params):
+                        r = await client.get(path, params=params)
+                        r.raise_for_status()
+                        return r
+
+                    bodies.append((await call()).content)
+                    medians.append(await _timed_async(call, args.repeat))
+                if bodies[0] != bodies[1]:
+                    raise SystemExit(f"{path}: response bytes differ between modes")
+                results.append(_row(name, len(json.loads(bodies[0])), *medians))
+
+    asyncio.run(requests())
+
+    print(json.dumps({"results": results}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
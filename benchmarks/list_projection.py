@@ -0,0 +1,180 @@
+"""EN: Per-row cost of the observation list: ORM hydration vs projected columns.
+
+Builds a fresh SQLite database through the Alembic migrations and seeds
+synthetic observations whose three feedback columns hold realistic ~600-char
+text. It then serves list pages (and the NDJSON stream) two ways:
+
+  orm        - the previous path: full Observation entities with joinedload of
+               teacher/department/focus, wrapped in Observations_List models
+  projected  - routes._observation_list_query: only the returned columns, as
+               rows mapped straight to response dicts
+
+Both sides include response validation + JSON serialisation, as FastAPI does
+for response_model. It reports microseconds per row and the tracemalloc peak
+per page.
+
+BR: Custo por linha da listagem: hidratação ORM vs colunas projetadas, com
+validação e serialização da resposta nos dois lados; µs por linha e pico de
+memória (tracemalloc) por página.
+
+Usage / Uso:
+    python -m benchmarks.list_projection --rows 200000 --pages 100,1000
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import List
+
+from benchmarks.query_plans import seed
+
+_FEEDBACK = ("Clear modelling of the worked example, then a well paced move into independent practice. " * 8)[:600]
+
+
+def fill_feedback(db_path: str) -> None:
+    """EN: Fill the three feedback columns like real write-ups / BR: Preencher as três colunas de feedback como relatos reais"""
+    con = sqlite3.connect(db_path)
+    # EN: The FTS triggers would index every row; not needed here / BR: Os gatilhos FTS indexariam cada linha; desnecessário aqui
+    con.execute('DROP TRIGGER IF EXISTS "Observations_fts_au"')
+    con.execute(
+        'UPDATE "Observations" SET "Observation_Strengths" = ?, "Observation_Weaknesses" = ?, "Observation_Comments" = ?',
+        (_FEEDBACK, _FEEDBACK, _FEEDBACK),
+    )
+    con.commit()
+    con.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--pages", default="100,1000", help="page sizes to time")
+    parser.add_argument("--stream-rows", type=int, default=50_000, help="rows drained from the NDJSON stream")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--db", help="SQLite file to (re)create; defaults to a temp file")
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(), "projection.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    # EN: Import after the URL is set / BR: Importar depois de definir a URL
+    from alembic import command
+    from alembic.config import Config
+    from pydantic import TypeAdapter
+    from sqlalchemy import desc
+    from sqlalchemy.orm import Session, joinedload
+
+    from app import routes
+    from app.database import engine
+    from app.models.models import Observation
+    from app.schemas import Observations_List
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command.upgrade(Config(os.path.join(root, "alembic.ini")), "head")
+
+    t0 = time.perf_counter()
+    seed(db_path, args.rows, 400, 25, 12)
+    fill_feedback(db_path)
+    print(f"seeded {args.rows} observations in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+    response = TypeAdapter(List[Observations_List])
+
+    def orm_items(db: Session, limit: int) -> list:
+        # EN: The pre-projection list path, kept here for comparison / BR: O caminho anterior da listagem, mantido para comparação
+        rows = (
+            db.query(Observation, routes._RAW_OBSERVATION_DATE)
+            .options(joinedload(Observation.teacher), joinedload(Observation.department), joinedload(Observation.focus))
+            .order_by(desc(Observation.Observation_Date), desc(Observation.Observation_ID))
+            .limit(limit)
+            .all()
+        )
+        return [
+            Observations_List(
+                Observation_ID=ob.Observation_ID,
+                Observation_Date=ob.Observation_Date,
+                Teacher_Forename=getattr(ob.teacher, "User_Forename", None),
+                Teacher_Surname=getattr(ob.teacher, "User_Surname", None),
+                Observation_Class=ob.Observation_Class,
+                Observation_Department=getattr(ob.department, "Department_Name", None),
+                Observation_Focus=getattr(ob.focus, "FocusArea_Name", None),
+            )
+            for ob, _raw_date in rows
+        ]
+
+    def projected_items(db: Session, limit: int) -> list:
+        rows = db.execute(routes._observation_list_query([], None).limit(limit)).all()
+        return [routes._list_item(row) for row in rows]
+
+    def page(fetch, limit: int) -> bytes:
+        with Session(engine) as db:
+            return response.dump_json(response.validate_python(fetch(db, limit)), exclude_unset=True)
+
+    results = []
+    for limit in (int(x) for x in args.pages.split(",")):
+        row = {"page_size": limit}
+        for name, fetch in (("orm", orm_items), ("projected", projected_items)):
+            page(fetch, limit)
+            timings = []
+            for _ in range(args.repeat):
+                t = time.perf_counter()
+                page(fetch, limit)
+                timings.append(time.perf_counter() - t)
+            tracemalloc.start()
+            page(fetch, limit)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            row[f"{name}_us_per_row"] = round(statistics.median(timings) / limit * 1e6, 2)
+            row[f"{name}_peak_kb"] = round(peak / 1024, 1)
+        row["cpu_saving"] = f"{1 - row['projected_us_per_row'] / row['orm_us_per_row']:.0%}"
+        row["memory_saving"] = f"{1 - row['projected_peak_kb'] / row['orm_peak_kb']:.0%}"
+        results.append(row)
+
+    # EN: NDJSON stream: old per-row model dump vs projected partitions / BR: Stream NDJSON: dump por modelo vs partições projetadas
+    def orm_stream(limit: int) -> int:
+        size = 0
+        with Session(engine) as db:
+            q = (
+                db.query(Observation)
+                .options(joinedload(Observation.teacher), joinedload(Observation.department), joinedload(Observation.focus))
+                .order_by(desc(Observation.Observation_Date), desc(Observation.Observation_ID))
+                .limit(limit)
+            )
+            for ob in q.yield_per(routes.STREAM_BATCH_SIZE):
+                size += len(Observations_List(
+                    Observation_ID=ob.Observation_ID,
+                    Observation_Date=ob.Observation_Date,
+                    Teacher_Forename=ob.teacher.User_Forename,
+                    Teacher_Surname=ob.teacher.User_Surname,
+                    Observation_Class=ob.Observation_Class,
+                    Observation_Department=ob.department.Department_Name,
+                    Observation_Focus=ob.focus.FocusArea_Name,
+                ).model_dump_json(exclude_unset=True)) + 1
+        return size
+
+    def projected_stream(limit: int) -> int:
+        size = 0
+        with Session(engine) as db:
+            result = db.execute(routes._observation_list_query([], None).limit(limit), execution_options={"yield_per": routes.STREAM_BATCH_SIZE})
+            for rows in result.partitions():
+                size += len("".join(routes._json_line(routes._list_item(row)) for row in rows))
+        return size
+
+    stream = {"rows": args.stream_rows}
+    for name, drain in (("orm", orm_stream), ("projected", projected_stream)):
+        t = time.perf_counter()
+        drain(args.stream_rows)
+        stream[f"{name}_us_per_row"] = round((time.perf_counter() - t) / args.stream_rows * 1e6, 2)
+    stream["cpu_saving"] = f"{1 - stream['projected_us_per_row'] / stream['orm_us_per_row']:.0%}"
+
+    print(json.dumps({"rows": args.rows, "pages": results, "stream": stream}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,314 @@
+"""EN: Mixed read/write load test of the API against stub renderer and mailer.
+
+Builds a fresh SQLite database through the Alembic migrations, seeds a
+synthetic dataset (teachers, departments, focus areas, observations with some
+feedback text, flags) and rebuilds the analytics summaries. The app then runs
+under uvicorn in a subprocess, with RENDERER_URL and MAILER_URL pointing at the
+local stubs from benchmarks/stubs.py (configurable latency). Concurrent clients
+drive a weighted mix of endpoints for a fixed time after a warm-up. The report
+is JSON: p50/p95/p99/mean/max latency, throughput and errors per endpoint.
+
+Save a report from one commit with --out, then rerun with --compare to print
+the p95 change per endpoint; exits 1 if any endpoint's p95 regressed by more
+than --max-regression.
+
+BR: Teste de carga misto (leitura/escrita) da API contra renderer e mailer
+falsos. Popula um banco sintético, sobe a app com uvicorn num subprocesso e
+gera um relatório JSON com p50/p95/p99 e vazão por endpoint, comparável entre
+commits com --out / --compare.
+
+Usage / Uso:
+    python -m benchmarks.load --rows 50000 --seconds 30 --concurrency 16 --out before.json
+    python -m benchmarks.load --rows 50000 --seconds 30 --concurrency 16 --compare before.json
+    python -m benchmarks.load --workers 4   # EN: gunicorn, 4 workers / BR: gunicorn, 4 workers
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.flags_listing import seed_flags
+from benchmarks.query_plans import seed
+from benchmarks.stubs import free_port, mailer_app, renderer_app, serve
+
+_FEEDBACK = (
+    "questioning cold calling pacing behaviour routines modelling feedback plenary starter retrieval "
+    "practice differentiation scaffolding challenge engagement seating homework marking vocabulary oracy"
+).split()
+
+# EN: Default share of each operation / BR: Peso padrão de cada operação
+DEFAULT_MIX = "list=30,view=20,search=8,bootstrap=8,flags=6,analytics=6,create=10,edit=6,pdf=6"
+
+
+def seed_feedback(db_path: str, every: int) -> None:
+    """EN: Feedback text on every Nth observation; the FTS triggers index it
+    BR: Texto de feedback em cada N-ésima observação; os gatilhos FTS o indexam"""
+    rnd = random.Random(11)
+    con = sqlite3.connect(db_path)
+    con.create_function("feedback", 1, lambda _id: " ".join(rnd.choice(_FEEDBACK) for _ in range(rnd.randint(6, 14))))
+    con.execute(
+        'UPDATE "Observations" SET "Observation_Strengths" = feedback("Observation_ID"),'
+        ' "Observation_Comments" = feedback("Observation_ID") WHERE "Observation_ID" % ? = 0',
+        (every,),
+    )
+    con.commit()
+    con.close()
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """EN: Nearest-rank percentile / BR: Percentil por posição mais próxima"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered) + 0.5)) - 1))]
+
+
+def _operations(args, rnd: random.Random) -> Dict[str, Callable[[], Tuple[str, str, dict]]]:
+    """EN: name -> () -> (method, path, httpx kwargs) / BR: nome -> () -> (método, caminho, kwargs do httpx)"""
+
+    def pick(count: int) -> int:
+        return rnd.randint(1, count)
+
+    def observation_body() -> dict:
+        return {
+            "Observation_Teacher": pick(args.teachers),
+            "Observation_Department": pick(args.departments),
+            "Observation_Focus": pick(args.focus_areas),
+            "Observation_Class": "9K",
+            "Observation_Strengths": " ".join(rnd.sample(_FEEDBACK, 6)),
+        }
+
+    def list_page():
+        params = rnd.choice(({}, {"teacher_id": pick(args.teachers)}, {"department_id": pick(args.departments)}))
+        return "GET", "/api/observations", {"params": {"limit": 50, **params}}
+
+    return {
+        "list": list_page,
+        "view": lambda: ("GET", f"/api/observations/{pick(args.rows)}", {}),
+        "search": lambda: ("GET", "/api/observations", {"params": {"q": rnd.choice(_FEEDBACK), "limit": 20}}),
+        "bootstrap": lambda: ("GET", "/api/bootstrap", {}),
+        "flags": lambda: ("GET", "/api/flags", {"params": {"focus_area_id": pick(args.focus_areas)}}),
+        "analytics": lambda: ("GET", "/api/analytics/weekly", {"params": {"department_id": pick(args.departments)}}),
+        "create": lambda: ("POST", "/api/new", {"params": {"notify": rnd.random() < args.notify_ratio}, "json": observation_body()}),
+        "edit": lambda: ("PUT", f"/api/observations/{pick(args.rows)}", {"json": {"Observation_Class": rnd.choice(("7A", "8B", "9K"))}}),
+        # EN: A small hot set, so the PDF cache sees both hits and misses / BR: Um conjunto pequeno, com acertos e falhas no cache de PDF
+        "pdf": lambda: ("GET", f"/api/pdf/{pick(min(args.rows, args.pdf_hot_set))}", {}),
+    }
+
+
+async def _drive(base_url: str, args, mix: Dict[str, int]) -> Tuple[Dict[str, List[float]], Dict[str, int], float]:
+    import httpx
+
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    latencies: Dict[str, List[float]] = {name: [] for name in names}
+    errors: Dict[str, int] = {name: 0 for name in names}
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+
+        async def worker(index: int, deadline: float, record: bool) -> None:
+            rnd = random.Random(args.seed * 1000 + index)
+            ops = _operations(args, rnd)
+            while time.perf_counter() < deadline:
+                name = rnd.choices(names, weights)[0]
+                method, path, kwargs = ops[name]()
+                t0 = time.perf_counter()
+                try:
+                    response = await client.request(method, path, **kwargs)
+                    failed = response.status_code >= 500
+                except httpx.HTTPError:
+                    failed = True
+                if record:
+                    latencies[name].append(time.perf_counter() - t0)
+                    errors[name] += failed
+
+        async def phase(seconds: float, record: bool) -> float:
+            t0 = time.perf_counter()
+            await asyncio.gather(*(worker(i, t0 + seconds, record) for i in range(args.concurrency)))
+            return time.perf_counter() - t0
+
+        await phase(args.warmup, record=False)
+        wall = await phase(args.seconds, record=True)
+    return latencies, errors, wall
+
+
+def _summary(latencies: List[float], errors: int, wall: float) -> dict:
+    if not latencies:
+        return {"requests": 0, "errors": errors}
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / wall, 1),
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 2),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2),
+        "max_ms": round(max(latencies) * 1000, 2),
+    }
+
+
+def _git_commit(root: str) -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=root, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _compare(report: dict, baseline: dict, max_regression: float) -> Tuple[dict, bool]:
+    """EN: p95 ratio per endpoint vs the baseline / BR: Razão do p95 por endpoint vs a base"""
+    deltas, regressed = {}, False
+    for name, row in report["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name, {})
+        if not row.get("p95_ms") or not before.get("p95_ms"):
+            continue
+        change = row["p95_ms"] / before["p95_ms"] - 1
+        deltas[name] = {
+            "p95_ms_before": before["p95_ms"],
+            "p95_ms_after": row["p95_ms"],
+            "change": round(change, 3),
+            "rps_before": before.get("rps"),
+            "rps_after": row.get("rps"),
+        }
+        regressed = regressed or change > max_regression
+    return {"baseline_commit": baseline.get("commit"), "max_regression": max_regression, "endpoints": deltas}, regressed
+
+
+def _wait_healthy(base_url: str, server: subprocess.Popen, timeout: float = 60) -> None:
+    import httpx
+
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if server.poll() is not None:
+            raise SystemExit(f"app exited during startup (code {server.returncode})")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise SystemExit("app did not become healthy")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=50_000, help="seeded observations")
+    parser.add_argument("--teachers", type=int, default=200)
+    parser.add_argument("--departments", type=int, default=15)
+    parser.add_argument("--focus-areas", type=int, default=12)
+    parser.add_argument("--flags", type=int, default=5_000)
+    parser.add_argument("--feedback-every", type=int, default=4, help="feedback text on every Nth observation")
+    parser.add_argument("--seconds", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="comma-separated name=weight")
+    parser.add_argument("--notify-ratio", type=float, default=0.2, help="share of creates that queue an email")
+    parser.add_argument("--pdf-hot-set", type=int, default=200, help="PDF requests pick from the first N observations")
+    parser.add_argument("--renderer-latency", type=float, default=0.05)
+    parser.add_argument("--mailer-latency", type=float, default=0.02)
+    parser.add_argument("--async-db", action="store_true", help="run the app on sqlite+aiosqlite")
+    parser.add_argument("--workers", type=int, default=0, help="serve with gunicorn.conf.py and N workers (0: one uvicorn process)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--db", help="SQLite file to (re)create; defaults to a temp file")
+    parser.add_argument("--out", help="write the JSON report here as well")
+    parser.add_argument("--compare", help="baseline JSON report from an earlier run")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="allowed p95 increase with --compare")
+    args = parser.parse_args()
+
+    mix = {name: int(weight) for name, weight in (part.split("=") for part in args.mix.split(",") if part)}
+    unknown = set(mix) - set(_operations(args, random.Random()))
+    if unknown:
+        parser.error(f"unknown operation(s) in --mix: {', '.join(sorted(unknown))}")
+
+    workdir = tempfile.mkdtemp()
+    db_path = args.db or os.path.join(workdir, "load.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    # EN: Import after the URL is set / BR: Importar depois de definir a URL
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy.orm import Session
+
+    from app import analytics
+    from app.database import engine
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command.upgrade(Config(os.path.join(root, "alembic.ini")), "head")
+
+    t0 = time.perf_counter()
+    seed(db_path, args.rows, args.teachers, args.departments, args.focus_areas)
+    seed_feedback(db_path, args.feedback_every)
+    seed_flags(db_path, args.flags, args.rows, args.focus_areas, 0.15)
+    with Session(engine) as s:
+        analytics.rebuild(s)
+    engine.dispose()
+    print(f"seeded {args.rows} observations and {args.flags} flags in {time.perf_counter() - t0:.1f}s", file=sys.stderr)
+
+    renderer_url, renderer_server = serve(renderer_app(args.renderer_latency))
+    mailer_url, mailer_server = serve(mailer_app(args.mailer_latency))
+    renderer_stub, mailer_stub = renderer_server.config.app, mailer_server.config.app
+
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    driver = "sqlite+aiosqlite" if args.async_db else "sqlite"
+    env = dict(
+        os.environ,
+        SQLALCHEMY_DATABASE_URL=f"{driver}:///{db_path}",
+        RENDERER_URL=renderer_url,
+        MAILER_URL=mailer_url,
+        MAILER_API_KEY="bench",
+        PDF_CACHE_DIR=os.path.join(workdir, "pdf_cache"),
+        OUTBOX_POLL_INTERVAL="1",
+        LOG_LEVEL="WARNING",
+    )
+    if args.workers:
+        env.update(WEB_CONCURRENCY=str(args.workers), BIND=f"127.0.0.1:{port}")
+        cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "--log-level", "warning", "app.main:app"]
+    else:
+        cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+               "--log-level", "warning", "--no-access-log"]
+    server = subprocess.Popen(cmd, cwd=root, env=env)
+    try:
+        _wait_healthy(base_url, server)
+        latencies, errors, wall = asyncio.run(_drive(base_url, args, mix))
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+        renderer_server.should_exit = mailer_server.should_exit = True
+
+    everything = [value for values in latencies.values() for value in values]
+    report = {
+        "commit": _git_commit(root),
+        "config": {
+            "rows": args.rows, "flags": args.flags, "seconds": args.seconds, "concurrency": args.concurrency,
+            "mix": mix, "renderer_latency_s": args.renderer_latency, "mailer_latency_s": args.mailer_latency,
+            "async_db": args.async_db, "workers": args.workers, "seed": args.seed,
+        },
+        "total": _summary(everything, sum(errors.values()), wall),
+        "endpoints": {name: _summary(latencies[name], errors[name], wall) for name in mix},
+        "stubs": {"renderer_calls": renderer_stub.state.calls, "mailer_calls": mailer_stub.state.calls},
+    }
+
+    regressed = False
+    if args.compare:
+        with open(args.compare) as fh:
+            report["compare"], regressed = _compare(report, json.load(fh), args.max_regression)
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as fh:
+            fh.write(output + "\n")
+    print(output)
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
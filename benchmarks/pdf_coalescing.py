@@ -0,0 +1,109 @@
+"""EN: Renderer calls and latency for bursts of identical PDF requests, with and without coalescing.
+
+Builds a SQLite database through the migrations, serves the stub renderer and
+sends --bursts bursts of --fanout concurrent GET /api/pdf/{id} requests for the
+same observation (a fresh one per burst, so nothing is in the PDF cache yet),
+in-process through the httpx ASGI transport. This mirrors an email going out and
+the teacher, their line manager and the SPA opening the PDF at once. It runs with
+routes.PDF_COALESCE off and on and reports renderer calls per burst, p50/p95
+latency and the pdf_requests_total counter (cache / render / coalesced).
+
+BR: Chamadas ao renderer e latência para rajadas de pedidos idênticos de PDF, com e
+sem coalescência. Rajadas de --fanout GETs simultâneos para a mesma observação
+(nova a cada rajada), com routes.PDF_COALESCE desligado e ligado.
+
+Usage / Uso:
+    python -m benchmarks.pdf_coalescing --fanout 3 --bursts 20 --latency 0.5
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.query_plans import seed
+
+
+def _pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fanout", type=int, default=3, help="concurrent requests per burst")
+    parser.add_argument("--bursts", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.5, help="stub renderer latency (s)")
+    args = parser.parse_args()
+
+    from benchmarks.stubs import renderer_app, serve
+
+    stub = renderer_app(args.latency)
+    base_url, server = serve(stub)
+    workdir = tempfile.mkdtemp()
+    os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'coalesce.db')}"
+    os.environ["PDF_CACHE_DIR"] = os.path.join(workdir, "pdf-cache")
+    os.environ["RENDERER_URL"] = base_url
+    os.environ.setdefault("OUTBOX_WORKER", "0")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    # EN: Import after the environment is set / BR: Importar depois de definir o ambiente
+    import httpx
+    from alembic import command
+    from alembic.config import Config
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command.upgrade(Config(os.path.join(root, "alembic.ini")), "head")
+    seed(os.environ["SQLALCHEMY_DATABASE_URL"].removeprefix("sqlite:///"), 2 * args.bursts, 20, 3, 9)
+
+    from app import metrics, routes
+    from app.main import app
+
+    def counters() -> dict:
+        with metrics.pdf_requests._lock:
+            return {labels[0]: value for labels, value in metrics.pdf_requests._values.items()}
+
+    async def run() -> list:
+        results = []
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            for mode, coalesce in enumerate((False, True)):
+                routes.PDF_COALESCE = coalesce
+                calls_before, counted_before = stub.state.calls, counters()
+                latencies = []
+
+                async def one(observation_id: int, latencies: list = latencies):
+                    t0 = time.perf_counter()
+                    r = await client.get(f"/api/pdf/{observation_id}")
+                    r.raise_for_status()
+                    latencies.append(time.perf_counter() - t0)
+                    return r.content
+
+                for burst in range(args.bursts):
+                    bodies = await asyncio.gather(*(one(1 + mode * args.bursts + burst) for _ in range(args.fanout)))
+                    if len(set(bodies)) != 1:
+                        raise SystemExit("requests in a burst got different PDFs")
+
+                counted = counters()
+                results.append({
+                    "coalesce": coalesce,
+                    "requests": len(latencies),
+                    "renderer_calls": stub.state.calls - calls_before,
+                    "renderer_calls_per_burst": round((stub.state.calls - calls_before) / args.bursts, 2),
+                    "pdf_requests_total": {k: v - counted_before.get(k, 0) for k, v in counted.items()},
+                    "p50_ms": round(_pct(latencies, 0.50) * 1000, 1),
+                    "p95_ms": round(_pct(latencies, 0.95) * 1000, 1),
+                })
+                print(f"coalesce={coalesce}: done", file=sys.stderr)
+        return results
+
+    results = asyncio.run(run())
+    server.should_exit = True
+    print(json.dumps({"fanout": args.fanout, "bursts": args.bursts, "renderer_latency_s": args.latency, "results": results}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
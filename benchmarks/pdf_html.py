@@ -0,0 +1,147 @@
+"""EN: Cost of building the PDF HTML: the old f-string vs precompiled Jinja2.
+
+Renders the same synthetic observations (plain objects shaped like an
+Observation with teacher/focus loaded, so no database is involved) through:
+
+  fstring          the previous _pdf_html f-string, copied here verbatim (no escaping)
+  fstring_escaped  the same f-string with html.escape on every field, i.e. what
+                   the old path would have cost had it been safe
+  jinja            app.pdf_templates registry: compiled once, autoescaped
+  jinja_compile    the same template compiled on every call (what loading it per
+                   request would cost)
+
+and reports the median µs per render. It also checks that the Jinja output is
+stable across renders (its SHA-256 is the PDF cache key) and that feedback
+containing markup comes out escaped.
+
+BR: Custo de montar o HTML do PDF: a f-string anterior vs Jinja2 pré-compilado
+(e compilado a cada chamada). Reporta a mediana em µs por renderização e confere
+que a saída é estável (o SHA-256 é a chave do cache de PDF) e escapada.
+
+Usage / Uso:
+    python -m benchmarks.pdf_html --renders 20000
+"""
+import argparse
+import hashlib
+import html
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import date
+from types import SimpleNamespace
+
+from jinja2 import Environment, select_autoescape
+
+from app.pdf_templates import DEFAULT_TEMPLATE_FILE, observation_context, pdf_templates
+
+
+def _fstring_html(observation, escape=lambda v: v) -> str:
+    """EN: The previous routes._pdf_html / BR: O routes._pdf_html anterior"""
+    teacher = getattr(observation, "teacher", None)
+    focus   = getattr(observation, "focus", None)
+
+    teacher_full_name = escape(f"{getattr(teacher, 'User_Forename', '')} {getattr(teacher, 'User_Surname', '')}".strip())
+    focus_label = escape(
+        getattr(focus, "FocusArea_Name", None)
+        or str(getattr(observation, "Observation_Focus", "—"))
+    )
+    date_str = str(getattr(observation, "Observation_Date", "—"))
+
+    return f"""
+    <!doctype html><meta charset="utf-8">
+    <style>
+      body {{ font-family: DejaVu Sans, Arial, sans-serif; margin: 2rem; }}
+      h1 {{ font-size: 22px; border-bottom: 1px solid #ccc; padding-bottom: .4rem; }}
+      .content p {{ margin: .4rem 0; }}
+      .label {{ font-weight: bold; }}
+    </style>
+    <h1>FocusEd Lesson Observation</h1>
+    <div class="content">
+      <p><span class="label">Teacher:</span> {teacher_full_name or '—'}</p>
+      <p><span class="label">Date:</span> {date_str}</p>
+      <p><span class="label">Class:</span> {escape(observation.Observation_Class or '—')}</p>
+      <p><span class="label">Focus Area:</span> {focus_label}</p>
+      <p><span class="label">Strengths:</span> {escape(observation.Observation_Strengths or '—')}</p>
+      <p><span class="label">Areas for Development:</span> {escape(observation.Observation_Weaknesses or '—')}</p>
+      <p><span class="label">Other Comments:</span> {escape(observation.Observation_Comments or '—')}</p>
+    </div>
+    """
+
+
+def _observations(count: int) -> list:
+    feedback = "Clear modelling of the worked example; questions targeted at named students. " * 4
+    return [
+        SimpleNamespace(
+            Observation_ID=i,
+            Observation_Date=date(2025, 1 + i % 12, 1 + i % 28),
+            Observation_Class=f"{7 + i % 6}X{i % 4}",
+            Observation_Focus=1 + i % 9,
+            Observation_Strengths=feedback,
+            Observation_Weaknesses=feedback if i % 3 else None,
+            Observation_Comments=f"Follow-up <b>#{i}</b> & review",
+            teacher=SimpleNamespace(User_Forename="Chloe", User_Surname="Chen"),
+            focus=SimpleNamespace(FocusArea_Name="Questioning"),
+        )
+        for i in range(count)
+    ]
+
+
+def _per_render_us(fn, observations: list, repeat: int) -> float:
+    """EN: Median µs per render over `repeat` passes / BR: Mediana em µs por renderização em `repeat` passadas"""
+    for ob in observations:
+        fn(ob)
+    timings = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        for ob in observations:
+            fn(ob)
+        timings.append((time.perf_counter() - t) / len(observations))
+    return statistics.median(timings) * 1e6
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--renders", type=int, default=20_000, help="renders per pass for the cheap cases")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    observations = _observations(args.renders)
+    with open(os.path.join(pdf_templates.directory, DEFAULT_TEMPLATE_FILE), encoding="utf-8") as fh:
+        source = fh.read()
+    fresh_env = Environment(autoescape=select_autoescape(default_for_string=True))
+
+    cases = {
+        "fstring": (_fstring_html, observations),
+        "fstring_escaped": (lambda ob: _fstring_html(ob, html.escape), observations),
+        "jinja": (lambda ob: pdf_templates.render(DEFAULT_TEMPLATE_FILE, ob), observations),
+        # EN: Compiling is ~1000x dearer; fewer renders keep the run short
+        # BR: Compilar custa ~1000x mais; menos renderizações mantêm a execução curta
+        "jinja_compile": (
+            lambda ob: fresh_env.from_string(source).render(observation_context(ob)),
+            observations[:max(1, args.renders // 100)],
+        ),
+    }
+
+    results = []
+    for name, (fn, obs) in cases.items():
+        results.append({"case": name, "renders": len(obs), "us_per_render": round(_per_render_us(fn, obs, args.repeat), 2)})
+        print(f"{name}: done", file=sys.stderr)
+    base = results[0]["us_per_render"]
+    for row in results:
+        row["vs_fstring"] = round(row["us_per_render"] / base, 2)
+
+    sample = observations[0]
+    hashes = {hashlib.sha256(pdf_templates.render(DEFAULT_TEMPLATE_FILE, sample).encode()).hexdigest() for _ in range(3)}
+    rendered = pdf_templates.render(DEFAULT_TEMPLATE_FILE, sample)
+    print(json.dumps({
+        "results": results,
+        "deterministic": len(hashes) == 1,
+        "escaped": "<b>" not in rendered and "&lt;b&gt;" in rendered,
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
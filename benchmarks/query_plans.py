@@ -0,0 +1,116 @@
+"""EN: Query-plan regression check for the observation list.
+
+Builds a fresh SQLite database through the Alembic migrations, seeds synthetic
+observations (1M by default) and runs EXPLAIN QUERY PLAN on the real list query
+for every teacher/department/focus filter combination, with and without a
+cursor. Fails (exit 1) if any plan scans Observations without an index or sorts
+in a temp B-tree.
+
+BR: Verificação de regressão dos planos de consulta da listagem. Cria um banco
+via migrações do Alembic, popula observações sintéticas e falha se algum plano
+não usar índice ou ordenar em B-tree temporária.
+
+Usage / Uso:
+    python -m benchmarks.query_plans --rows 1000000
+"""
+import argparse
+import itertools
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+
+def seed(db_path: str, rows: int, teachers: int, departments: int, focus_areas: int) -> None:
+    """EN: Fast raw inserts / BR: Inserções brutas rápidas"""
+    con = sqlite3.connect(db_path)
+    con.executemany('INSERT INTO "Departments" ("Department_Name") VALUES (?)', [(f"Dept {i}",) for i in range(departments)])
+    con.executemany(
+        'INSERT INTO "Users" ("User_Forename", "User_Surname", "User_Email") VALUES (?, ?, ?)',
+        [("T", f"Teacher {i}", f"t{i}@example.org") for i in range(teachers)],
+    )
+    con.executemany('INSERT INTO "FocusAreas" ("FocusArea_Name") VALUES (?)', [(f"Focus {i}",) for i in range(focus_areas)])
+    rnd = random.Random(42)
+    start = datetime(2018, 9, 1)
+
+    def gen():
+        for _ in range(rows):
+            when = start + timedelta(seconds=rnd.randrange(8 * 365 * 86400))
+            yield (
+                when.strftime("%Y-%m-%d %H:%M:%S.%f"),
+                rnd.randint(1, departments),
+                rnd.randint(1, teachers),
+                "9K",
+                rnd.randint(1, focus_areas),
+            )
+
+    con.executemany(
+        'INSERT INTO "Observations" ("Observation_Date", "Observation_Department", "Observation_Teacher",'
+        ' "Observation_Class", "Observation_Focus") VALUES (?, ?, ?, ?, ?)',
+        gen(),
+    )
+    con.commit()
+    con.execute("ANALYZE")
+    con.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--teachers", type=int, default=400)
+    parser.add_argument("--departments", type=int, default=25)
+    parser.add_argument("--focus-areas", type=int, default=12)
+    parser.add_argument("--db", help="SQLite file to (re)create; defaults to a temp file")
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(), "plans.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    url = f"sqlite:///{db_path}"
+    os.environ["SQLALCHEMY_DATABASE_URL"] = url
+
+    # EN: Import after the URL is set / BR: Importar depois de definir a URL
+    from alembic import command
+    from alembic.config import Config
+
+    from app.database import engine
+    from app import routes
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    cfg = Config(os.path.join(root, "alembic.ini"))
+    command.upgrade(cfg, "head")
+
+    t0 = time.perf_counter()
+    seed(db_path, args.rows, args.teachers, args.departments, args.focus_areas)
+    print(f"seeded {args.rows} observations in {time.perf_counter() - t0:.1f}s")
+
+    failures = 0
+    names = ("teacher_id", "department_id", "focus_area_id")
+    with engine.connect() as conn:
+        for size in range(len(names) + 1):
+            for combo in itertools.combinations(names, size):
+                values = {name: (3 if name in combo else None) for name in names}
+                filters = routes._observation_filters(**values)
+                for after in (None, ("2022-01-01 00:00:00.000000", 500_000)):
+                    q = routes._observation_list_query(filters, after).limit(routes.OBSERVATIONS_PAGE_SIZE + 1)
+                    sql = str(q.compile(engine, compile_kwargs={"literal_binds": True}))
+                    plan = [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]
+                    obs_steps = [p for p in plan if "Observations" in p and "Users" not in p]
+                    ok = (
+                        not any("TEMP B-TREE" in p for p in plan)
+                        and bool(obs_steps)
+                        and all("USING" in p and "INDEX" in p for p in obs_steps)
+                    )
+                    failures += not ok
+                    label = ",".join(combo) or "(none)"
+                    print(f"{'ok  ' if ok else 'FAIL'} filters={label:<40} cursor={'yes' if after else 'no ':<3} {' | '.join(plan)}")
+
+    print(f"{failures} failing plan(s)")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""EN: PDF render latency at different concurrency levels against a stub renderer.
+
+Compares a brand-new httpx.AsyncClient per call (the old create_pdf behaviour)
+with the shared, pooled and semaphore-capped client in app/renderer.py.
+
+BR: Latência de renderização em vários níveis de concorrência contra um renderer
+falso: cliente novo por chamada vs. cliente compartilhado de app/renderer.py.
+
+Usage / Uso:
+    python -m benchmarks.renderer_concurrency --latency 0.05 --levels 1,8,32,128
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+
+
+def _pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+async def _measure(call, concurrency: int, requests: int) -> dict:
+    latencies = []
+
+    async def one():
+        t0 = time.perf_counter()
+        await call()
+        latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    for start in range(0, requests, concurrency):
+        await asyncio.gather(*(one() for _ in range(min(concurrency, requests - start))))
+    wall = time.perf_counter() - t0
+    return {
+        "concurrency": concurrency,
+        "p50_ms": round(_pct(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(_pct(latencies, 0.95) * 1000, 1),
+        "mean_ms": round(statistics.mean(latencies) * 1000, 1),
+        "renders_per_s": round(requests / wall, 1),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.05, help="stub renderer latency (s)")
+    parser.add_argument("--levels", default="1,8,32,128")
+    parser.add_argument("--requests", type=int, default=256)
+    args = parser.parse_args()
+
+    from benchmarks.stubs import renderer_app, serve
+
+    base_url, server = serve(renderer_app(args.latency))
+    os.environ["RENDERER_URL"] = base_url
+
+    import httpx
+    from app import renderer
+
+    renderer.RENDERER_URL = base_url
+    html = "<h1>bench</h1>"
+
+    async def per_request_client():
+        async with httpx.AsyncClient(timeout=15) as client:
+            r = await client.post(f"{base_url}/render", json={"html": html})
+            return r.content
+
+    async def run() -> list:
+        results = []
+        await renderer.start()
+        try:
+            for level in (int(x) for x in args.levels.split(",")):
+                for name, call in (("per_request_client", per_request_client), ("shared_client", lambda: renderer.render_pdf(html))):
+                    row = await _measure(call, level, args.requests)
+                    results.append({"client": name, **row})
+        finally:
+            await renderer.stop()
+        return results
+
+    results = asyncio.run(run())
+    server.should_exit = True
+    print(json.dumps({"renderer_latency_s": args.latency, "max_concurrency": renderer.RENDERER_MAX_CONCURRENCY, "results": results}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""EN: PDF latency through a renderer incident, with and without the local fallback.
+
+Serves the stub renderer, then drives renderer.render_pdf at a fixed concurrency
+through three phases of --phase-seconds each: healthy, incident (the stub either
+answers after --incident-latency seconds or returns 503, --incident slow|down)
+and recovered. This runs once with LOCAL_RENDERER=off (the remote renderer only)
+and once with LOCAL_RENDERER=fallback (circuit breaker + process pool). For each
+phase it reports p50/p95/max, errors, how many renders ran locally and the
+breaker state at the end. The HTML is the real observation template.
+WeasyPrint must be installed for the fallback run.
+
+BR: Latência de PDF durante um incidente do renderer, com e sem a alternativa local.
+Três fases (saudável, incidente lento ou fora do ar, recuperado) com LOCAL_RENDERER=off
+e =fallback; reporta p50/p95/máx, erros, renderizações locais e o estado do disjuntor.
+
+Usage / Uso:
+    python -m benchmarks.renderer_fallback --incident slow --phase-seconds 20
+    python -m benchmarks.renderer_fallback --incident down --cooldown 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+
+def _pct(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] if values else None
+
+
+def _ms(seconds):
+    return None if seconds is None else round(seconds * 1000, 1)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--incident", choices=("slow", "down"), default="slow")
+    parser.add_argument("--latency", type=float, default=0.05, help="healthy stub renderer latency (s)")
+    parser.add_argument("--incident-latency", type=float, default=60, help="stub latency during a slow incident (s)")
+    parser.add_argument("--phase-seconds", type=float, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--cooldown", type=float, default=5, help="RENDERER_BREAKER_COOLDOWN for the run")
+    parser.add_argument("--modes", default="off,fallback")
+    args = parser.parse_args()
+
+    from benchmarks.stubs import renderer_app, serve
+    from benchmarks.pdf_html import _observations
+
+    stub = renderer_app(args.latency)
+    base_url, server = serve(stub)
+    os.environ["RENDERER_URL"] = base_url
+    os.environ["RENDERER_BREAKER_COOLDOWN"] = str(args.cooldown)
+
+    from app import local_renderer, renderer
+    from app.pdf_templates import DEFAULT_TEMPLATE_FILE, pdf_templates
+
+    if "fallback" in args.modes.split(",") and not local_renderer.available():
+        print("weasyprint is not installed (pip install -r requirements-local-renderer.txt)", file=sys.stderr)
+        return 2
+
+    html = pdf_templates.render(DEFAULT_TEMPLATE_FILE, _observations(1)[0])
+    local_calls = [0]
+    submit = local_renderer.submit
+
+    def counting_submit(h):
+        local_calls[0] += 1
+        return submit(h)
+
+    local_renderer.submit = counting_submit
+    phases = (
+        ("healthy", args.latency, 200),
+        ("incident", args.incident_latency if args.incident == "slow" else args.latency, 200 if args.incident == "slow" else 503),
+        ("recovered", args.latency, 200),
+    )
+
+    async def phase(name: str) -> dict:
+        latencies, errors = [], {}
+        local_before = local_calls[0]
+        deadline = time.perf_counter() + args.phase_seconds
+
+        async def worker():
+            while time.perf_counter() < deadline:
+                t0 = time.perf_counter()
+                try:
+                    await renderer.render_pdf(html)
+                except renderer.RendererError as e:
+                    errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+                latencies.append(time.perf_counter() - t0)
+
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        return {
+            "phase": name,
+            "requests": len(latencies),
+            "errors": errors,
+            "local_renders": local_calls[0] - local_before,
+            "p50_ms": _ms(_pct(latencies, 0.50)),
+            "p95_ms": _ms(_pct(latencies, 0.95)),
+            "max_ms": _ms(max(latencies, default=None)),
+            "breaker": renderer.breaker.state,
+        }
+
+    async def run(mode: str) -> list:
+        local_renderer.LOCAL_RENDERER = mode
+        renderer.breaker = renderer.CircuitBreaker(
+            renderer.RENDERER_BREAKER_WINDOW, renderer.RENDERER_BREAKER_MIN_CALLS,
+            renderer.RENDERER_BREAKER_ERROR_RATE, args.cooldown,
+        )
+        await renderer.start()
+        try:
+            if local_renderer.enabled():
+                # EN: Wait for the pool to import WeasyPrint / BR: Esperar o pool importar o WeasyPrint
+                await asyncio.wrap_future(submit(html))
+            rows = []
+            for name, latency, status in phases:
+                stub.state.latency, stub.state.status = latency, status
+                rows.append({"local_renderer": mode, **await phase(name)})
+                print(f"{mode}/{name}: done", file=sys.stderr)
+            return rows
+        finally:
+            await renderer.stop()
+
+    results = []
+    for mode in args.modes.split(","):
+        results.extend(asyncio.run(run(mode)))
+    server.should_exit = True
+    print(json.dumps({
+        "incident": args.incident,
+        "renderer_timeout_s": renderer.RENDERER_TIMEOUT,
+        "slow_cutoff_s": renderer.RENDERER_BREAKER_SLOW_SECONDS,
+        "cooldown_s": args.cooldown,
+        "local_workers": local_renderer.LOCAL_RENDERER_WORKERS,
+        "results": results,
+    }, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+"""EN: Throughput scaling of the multi-worker mode from 1 to N workers.
+
+Runs benchmarks/load.py once per worker count under gunicorn (gunicorn.conf.py,
+preloaded app, UvicornWorker) against the same synthetic dataset size and mix,
+and reports total requests/s, p95 and scaling efficiency
+(rps_N / (N * rps_1)) per worker count. The default mix is read-heavy with PDF
+renders, which is where a single process hurts most. Extra arguments after "--"
+go to load.py unchanged. Worker counts above the machine's core count only
+measure contention.
+
+BR: Escala de vazão do modo com vários workers, de 1 a N. Roda benchmarks/load.py
+uma vez por quantidade de workers sob gunicorn e reporta req/s total, p95 e
+eficiência (rps_N / (N * rps_1)). Argumentos após "--" vão direto ao load.py.
+
+Usage / Uso:
+    python -m benchmarks.scaling --workers 1,2,4 --seconds 20
+    python -m benchmarks.scaling --workers 1,2 -- --async-db
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+DEFAULT_MIX = "list=30,view=25,search=10,bootstrap=10,flags=5,analytics=5,create=5,edit=5,pdf=5"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", default=f"1,{os.cpu_count() or 1}", help="comma-separated worker counts")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--seconds", type=float, default=20)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("load_args", nargs=argparse.REMAINDER, help="extra load.py arguments after --")
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    extra = [a for a in args.load_args if a != "--"]
+    counts = sorted({int(n) for n in args.workers.split(",")})
+
+    results = []
+    for count in counts:
+        out = os.path.join(tempfile.mkdtemp(), "load.json")
+        cmd = [sys.executable, "-m", "benchmarks.load", "--workers", str(count), "--rows", str(args.rows),
+               "--seconds", str(args.seconds), "--concurrency", str(args.concurrency), "--mix", args.mix,
+               "--out", out, *extra]
+        print(f"workers={count}: {' '.join(cmd[2:])}", file=sys.stderr)
+        subprocess.run(cmd, cwd=root, check=True, stdout=subprocess.DEVNULL)
+        with open(out) as fh:
+            total = json.load(fh)["total"]
+        results.append({"workers": count, "rps": total.get("rps"), "p95_ms": total.get("p95_ms"), "errors": total.get("errors")})
+
+    base = next((r for r in results if r["workers"] == 1 and r["rps"]), None)
+    for row in results:
+        if base and row["rps"]:
+            row["speedup"] = round(row["rps"] / base["rps"], 2)
+            row["efficiency"] = round(row["rps"] / (row["workers"] * base["rps"]), 2)
+
+    print(json.dumps({"cpu_count": os.cpu_count(), "rows": args.rows, "mix": args.mix, "results": results}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""EN: Latency check for full-text search on the observation list (q=).
+
+Builds a fresh SQLite database through the Alembic migrations (so the FTS5
+table and its triggers are the migrated ones), seeds synthetic observations
+with feedback text (300k by default, indexed by the triggers as they go in)
+and times the first page and a cursor page of the real search query for a
+few terms, with and without a department filter.
+
+BR: Verificação de latência da busca de texto completo (q=). Cria um banco via
+migrações do Alembic, popula observações com texto de feedback e mede a
+primeira página e uma página com cursor da consulta real de busca.
+
+Usage / Uso:
+    python -m benchmarks.search --rows 300000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+_WORDS = (
+    "questioning cold calling pace pacing behaviour routines modelling feedback plenary "
+    "starter retrieval practice differentiation scaffolding challenge engagement seating "
+    "homework marking vocabulary oracy groupwork transitions expectations praise clarity "
+    "explanation misconceptions assessment independent timing resources worked examples"
+).split()
+
+
+def seed(db_path: str, rows: int, departments: int) -> None:
+    """EN: Raw inserts; the FTS triggers index each row / BR: Inserções brutas; os gatilhos FTS indexam cada linha"""
+    con = sqlite3.connect(db_path)
+    con.executemany('INSERT INTO "Departments" ("Department_Name") VALUES (?)', [(f"Dept {i}",) for i in range(departments)])
+    con.execute('INSERT INTO "Users" ("User_Forename", "User_Surname", "User_Email") VALUES (\'T\', \'Teacher\', \'t@example.org\')')
+    con.execute('INSERT INTO "FocusAreas" ("FocusArea_Name") VALUES (\'Focus\')')
+    rnd = random.Random(42)
+    start = datetime(2018, 9, 1)
+
+    # EN: Wide filler vocabulary, teaching terms sprinkled in (~3% of words), so
+    # term frequencies look like real feedback rather than a 40-word corpus
+    # BR: Vocabulário amplo de preenchimento com termos pedagógicos (~3% das
+    # palavras), para frequências parecidas com feedback real
+    filler = [f"w{i:05d}" for i in range(20_000)]
+
+    def sentence() -> str:
+        words = []
+        for _ in range(rnd.randint(6, 20)):
+            words.append(rnd.choice(_WORDS) if rnd.random() < 0.03 else filler[int(rnd.paretovariate(1.1)) % len(filler)])
+        return " ".join(words)
+
+    def gen():
+        for _ in range(rows):
+            when = start + timedelta(seconds=rnd.randrange(8 * 365 * 86400))
+            yield (
+                when.strftime("%Y-%m-%d %H:%M:%S.%f"),
+                rnd.randint(1, departments),
+                1,
+                "9K",
+                1,
+                sentence(),
+                sentence(),
+                sentence(),
+            )
+
+    con.executemany(
+        'INSERT INTO "Observations" ("Observation_Date", "Observation_Department", "Observation_Teacher",'
+        ' "Observation_Class", "Observation_Focus", "Observation_Strengths", "Observation_Weaknesses",'
+        ' "Observation_Comments") VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+        gen(),
+    )
+    con.commit()
+    con.execute("ANALYZE")
+    con.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=300_000)
+    parser.add_argument("--departments", type=int, default=25)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--db", help="SQLite file to (re)create; defaults to a temp file")
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(), "search.db")
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{db_path}"
+
+    # EN: Import after the URL is set / BR: Importar depois de definir a URL
+    from alembic import command
+    from alembic.config import Config
+    from sqlalchemy.orm import Session
+
+    from app.database import engine
+    from app import routes
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    command.upgrade(Config(os.path.join(root, "alembic.ini")), "head")
+
+    t0 = time.perf_counter()
+    seed(db_path, args.rows, args.departments)
+    print(f"seeded {args.rows} observations in {time.perf_counter() - t0:.1f}s")
+
+    limit = routes.OBSERVATIONS_PAGE_SIZE
+    print(f"{'query':<32} {'filter':<8} {'page':<7} {'rows':>5} {'p50 ms':>8} {'max ms':>8}")
+    with Session(engine) as db:
+        for text in ("cold calling", "questioning", "misconceptions worked examples", "pace"):
+            for dept in (None, 3):
+                filters = routes._observation_filters(None, dept, None)
+                after = None
+                for page in ("first", "cursor"):
+                    timings = []
+                    for _ in range(args.repeat):
+                        t = time.perf_counter()
+                        rows = db.execute(routes._search_query(text, filters, after).limit(limit + 1)).all()
+                        timings.append((time.perf_counter() - t) * 1000)
+                    print(
+                        f"{text:<32} {'dept' if dept else '-':<8} {page:<7} {len(rows):>5}"
+                        f" {statistics.median(timings):>8.1f} {max(timings):>8.1f}"
+                    )
+                    if len(rows) <= limit:
+                        break
+                    after = (rows[limit - 1].Rank, rows[limit - 1].Observation_ID)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""EN: Read/write throughput of SQLite with and without the connection profile.
+
+Runs concurrent writer threads (insert + commit, like POST /api/new) and reader
+threads (first page of the observation list) against a fresh database file,
+once with the default SQLite settings and once with the profile from
+app/database.py (WAL, synchronous=NORMAL, busy_timeout, mmap, cache, temp_store).
+
+BR: Vazão de leitura/escrita do SQLite com e sem o perfil de conexão.
+
+Usage / Uso:
+    python -m benchmarks.sqlite_profile --seconds 10 --writers 4 --readers 8
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+
+def run(profile: bool, seconds: float, writers: int, readers: int, seed_rows: int) -> dict:
+    from sqlalchemy import create_engine, insert
+    from sqlalchemy.exc import OperationalError
+    from sqlalchemy.orm import sessionmaker
+
+    from app import database
+    from app.models.models import Base, Department, FocusArea, Observation, User
+    from app import routes
+
+    path = os.path.join(tempfile.mkdtemp(), "profile.db")
+    engine = create_engine(f"sqlite:///{path}", **database._engine_kwargs())
+    if profile:
+        database.install_sqlite_profile(engine)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+
+    with Session() as db:
+        db.add_all([Department(Department_Name="Computing"), FocusArea(FocusArea_Name="Questioning")])
+        db.add(User(User_Forename="Bench", User_Surname="Mark", User_Email="bench@example.org"))
+        db.commit()
+        row = {"Observation_Department": 1, "Observation_Teacher": 1, "Observation_Class": "9K", "Observation_Focus": 1}
+        db.execute(insert(Observation), [row] * seed_rows)
+        db.commit()
+
+    stop = time.perf_counter() + seconds
+    counts = {"writes": 0, "reads": 0, "locked": 0}
+    lock = threading.Lock()
+
+    def writer():
+        while time.perf_counter() < stop:
+            with Session() as db:
+                try:
+                    db.add(Observation(**row))
+                    db.commit()
+                    key = "writes"
+                except OperationalError:
+                    db.rollback()
+                    key = "locked"
+            with lock:
+                counts[key] += 1
+
+    def reader():
+        while time.perf_counter() < stop:
+            with Session() as db:
+                try:
+                    db.execute(routes._observation_list_query([], None).limit(routes.OBSERVATIONS_PAGE_SIZE)).all()
+                    key = "reads"
+                except OperationalError:
+                    key = "locked"
+            with lock:
+                counts[key] += 1
+
+    threads = [threading.Thread(target=writer) for _ in range(writers)]
+    threads += [threading.Thread(target=reader) for _ in range(readers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    engine.dispose()
+
+    return {
+        "profile": "production" if profile else "off",
+        "writes_per_s": round(counts["writes"] / seconds, 1),
+        "reads_per_s": round(counts["reads"] / seconds, 1),
+        "locked_errors": counts["locked"],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seed-rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    results = [run(profile, args.seconds, args.writers, args.readers, args.seed_rows) for profile in (False, True)]
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
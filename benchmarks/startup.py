@@ -0,0 +1,138 @@
+"""EN: Time-to-healthy of the app on a cold and a warm database.
+
+Starts the app under uvicorn in a subprocess (optionally with several
+--workers), polls GET /health every 10 ms and records the time from spawn to the
+first 200. It then stops the server and reads each worker's "database ready" log
+line for the schema outcome and the milliseconds spent on schema + seed. Cold
+runs delete the SQLite file before every start; warm runs reuse it. Both
+DB_SCHEMA_MODE=check (the default) and the previous create_all are measured.
+After every run the core tables are checked for duplicate seed rows, and any
+worker traceback (e.g. two workers racing create_all) is counted.
+
+BR: Tempo até ficar saudável com banco frio e quente. Sobe a app com uvicorn num
+subprocesso, consulta /health a cada 10 ms e lê a linha "database ready" de cada
+worker (resultado do esquema e ms de esquema + seed), em DB_SCHEMA_MODE=check e
+no create_all anterior. Confere seeds duplicados e conta tracebacks.
+
+Usage / Uso:
+    python -m benchmarks.startup --workers 4 --repeat 5
+"""
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.stubs import free_port
+
+
+def _run(root: str, db_path: str, mode: str, workers: int) -> dict:
+    """EN: One start/stop cycle / BR: Um ciclo de subir/parar"""
+    import httpx
+
+    port = free_port()
+    env = dict(
+        os.environ,
+        SQLALCHEMY_DATABASE_URL=f"sqlite:///{db_path}",
+        DB_SCHEMA_MODE=mode,
+        OUTBOX_WORKER="0",
+        LOG_LEVEL="INFO",
+        LOG_FORMAT="json",
+    )
+    cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"]
+    if workers > 1:
+        cmd += ["--workers", str(workers)]
+
+    started = time.perf_counter()
+    server = subprocess.Popen(cmd, cwd=root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    healthy = None
+    deadline = started + 60
+    while time.perf_counter() < deadline and server.poll() is None:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                healthy = time.perf_counter() - started
+                break
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.01)
+    # EN: Let the remaining workers finish starting / BR: Deixar os outros workers terminarem de subir
+    time.sleep(0.5 if workers > 1 else 0)
+    server.terminate()
+    _, stderr = server.communicate(timeout=30)
+
+    ready, tracebacks = [], stderr.count("Traceback")
+    for line in stderr.splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if record.get("msg") == "database ready":
+            ready.append(record)
+
+    con = sqlite3.connect(db_path)
+    try:
+        seeded = {t: con.execute(f'SELECT count(*) FROM "{t}"').fetchone()[0] for t in ("Departments", "Users", "FocusAreas", "FlagTypes")}
+    except sqlite3.Error:
+        seeded = {}
+    finally:
+        con.close()
+
+    return {
+        "healthy_s": healthy,
+        "db_ms": [r.get("ms") for r in ready],
+        "schema": sorted({r.get("schema") for r in ready}),
+        "workers_ready": len(ready),
+        "tracebacks": tracebacks,
+        "seeded": seeded,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--modes", default="create_all,check", help="DB_SCHEMA_MODE values to compare")
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    workdir = tempfile.mkdtemp()
+    expected = {"Departments": 3, "Users": 8, "FocusAreas": 9, "FlagTypes": 2}
+
+    results = []
+    for mode in args.modes.split(","):
+        db_path = os.path.join(workdir, f"startup-{mode}.db")
+        for state in ("cold", "warm"):
+            runs = []
+            for _ in range(args.repeat):
+                if state == "cold":
+                    for suffix in ("", "-wal", "-shm"):
+                        if os.path.exists(db_path + suffix):
+                            os.remove(db_path + suffix)
+                runs.append(_run(root, db_path, mode, args.workers))
+            healthy = [r["healthy_s"] for r in runs if r["healthy_s"] is not None]
+            db_ms = [ms for r in runs for ms in r["db_ms"]]
+            results.append({
+                "mode": mode,
+                "database": state,
+                "workers": args.workers,
+                "healthy_ms_median": round(statistics.median(healthy) * 1000) if healthy else None,
+                "db_prepare_ms_median": round(statistics.median(db_ms), 1) if db_ms else None,
+                "db_prepare_ms_max": round(max(db_ms), 1) if db_ms else None,
+                "schema": sorted({s for r in runs for s in r["schema"]}),
+                "failed_starts": sum(1 for r in runs if r["healthy_s"] is None),
+                "workers_not_ready": sum(args.workers - r["workers_ready"] for r in runs),
+                "tracebacks": sum(r["tracebacks"] for r in runs),
+                "duplicate_seeds": sum(1 for r in runs if r["seeded"] and r["seeded"] != expected),
+            })
+            print(f"{mode}/{state}: done", file=sys.stderr)
+
+    print(json.dumps({"results": results}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
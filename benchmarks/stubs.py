@@ -0,0 +1,72 @@
+"""EN: Local stand-ins for the renderer and mailer services, with configurable latency.
+BR: Substitutos locais dos serviços renderer e mailer, com latência configurável."""
+import asyncio
+import socket
+import threading
+import time
+from typing import Tuple
+
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+# EN: Smallest valid-looking PDF body / BR: Menor corpo com cara de PDF válido
+FAKE_PDF = b"%PDF-1.4\n" + b"0" * 20_000 + b"\n%%EOF\n"
+
+
+def renderer_app(latency: float = 0.05) -> FastAPI:
+    """EN: POST /render -> application/pdf after `latency` seconds. app.state.latency and
+    app.state.status can be changed while serving to simulate an incident.
+    BR: POST /render -> PDF após `latency` segundos. app.state.latency e app.state.status
+    podem mudar durante a execução para simular um incidente."""
+    app = FastAPI()
+    app.state.calls = 0
+    app.state.latency = latency
+    app.state.status = 200
+
+    @app.post("/render")
+    async def render(request: Request):
+        await request.body()
+        app.state.calls += 1
+        await asyncio.sleep(app.state.latency)
+        if app.state.status != 200:
+            return Response(status_code=app.state.status)
+        return Response(content=FAKE_PDF, media_type="application/pdf")
+
+    return app
+
+
+def mailer_app(latency: float = 0.05, fail_every: int = 0) -> FastAPI:
+    """EN: POST /mail/observation -> 202; optionally fail every Nth call with 503
+    BR: POST /mail/observation -> 202; opcionalmente falha a cada N chamadas com 503"""
+    app = FastAPI()
+    app.state.calls = 0
+
+    @app.post("/mail/observation")
+    async def mail(request: Request):
+        await request.body()
+        app.state.calls += 1
+        await asyncio.sleep(latency)
+        if fail_every and app.state.calls % fail_every == 0:
+            return Response(status_code=503)
+        return Response(status_code=202)
+
+    return app
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serve(app, port: int = 0) -> Tuple[str, uvicorn.Server]:
+    """EN: Run an ASGI app on a background thread; returns (base_url, server)
+    BR: Executa uma app ASGI numa thread; retorna (base_url, server)"""
+    port = port or free_port()
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}", server
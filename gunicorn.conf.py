@@ -0,0 +1,50 @@
+"""EN: Gunicorn settings for the multi-worker deployment mode.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+The app is imported once in the master (preload_app), so workers fork with
+FastAPI, SQLAlchemy, pydantic and the route table already loaded. Each worker
+then runs the startup hooks itself: schema check and seed (idempotent, under
+SQLite's write lock), the renderer client, the outbox worker (rows are leased,
+so workers never double-send) and the ref-data cache watcher.
+Connections never cross a fork: post_fork drops any pooled connection the master
+may hold.
+
+BR: Configuração do Gunicorn para o modo com vários workers. A app é importada
+uma vez no master (preload_app) e os workers herdam tudo por fork; cada worker
+roda os próprios hooks de startup. post_fork descarta conexões herdadas.
+"""
+import multiprocessing
+import os
+
+# EN: Worker count: WEB_CONCURRENCY, defaulting to one per core
+# BR: Quantidade de workers: WEB_CONCURRENCY, padrão um por núcleo
+workers = int(os.getenv("WEB_CONCURRENCY", str(multiprocessing.cpu_count())))
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = os.getenv("BIND", "0.0.0.0:8000")
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") != "0"
+
+# EN: Bulk PDF exports stream for a while; graceful restarts let them finish
+# BR: Exportações de PDF em massa demoram; reinícios graciosos deixam terminar
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# EN: Recycle workers now and then (0 = never) / BR: Reciclar workers de tempos em tempos (0 = nunca)
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "0"))
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG") or None
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    """EN: Pooled SQLite connections must not be shared with the master; close=False
+    leaves the master's own connections untouched.
+    BR: Conexões SQLite do pool não podem ser compartilhadas com o master;
+    close=False não mexe nas conexões do próprio master."""
+    from app.database import async_engine, engine
+
+    engine.dispose(close=False)
+    if async_engine is not None:
+        async_engine.sync_engine.dispose(close=False)
@@ -0,0 +1,53 @@
+"""EN: Shared test setup: a throwaway SQLite database, the query budget plugin and
+an app client that has run startup (schema at the migration head, core seed).
+
+BR: Configuração comum dos testes: um banco SQLite descartável, o plugin de
+orçamento de consultas e um cliente da app que já rodou o startup.
+"""
+import os
+import tempfile
+
+import pytest
+
+# EN: Before importing app: the engine and settings are read at import time
+# BR: Antes de importar a app: o engine e as configurações são lidos na importação
+_workdir = tempfile.mkdtemp(prefix="focused-tests-")
+os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{os.path.join(_workdir, 'focused.db')}"
+os.environ["PDF_CACHE_DIR"] = os.path.join(_workdir, "pdf-cache")
+os.environ["OUTBOX_WORKER"] = "0"
+os.environ["RENDERER_URL"] = "http://127.0.0.1:9"
+# EN: No background pollers: they would run SQL inside query budgets / BR: Sem pollers em segundo plano: rodariam SQL dentro dos orçamentos
+os.environ["REF_CACHE_POLL_INTERVAL"] = "0"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+pytest_plugins = ["tests.query_budget", "pytester"]
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with TestClient(app) as c:
+        yield c
+
+
+@pytest.fixture
+def new_observation(client):
+    """EN: Create an observation through POST /api/new and return its ID
+    BR: Criar uma observação via POST /api/new e retornar o ID"""
+
+    def create(**fields) -> int:
+        body = {
+            "Observation_Teacher": 1,
+            "Observation_Department": 1,
+            "Observation_Class": "9X1",
+            "Observation_Focus": 1,
+            **fields,
+        }
+        r = client.post("/api/new", json=body)
+        assert r.status_code == 200, r.text
+        return r.json()["id"]
+
+    return create
@@ -0,0 +1,93 @@
+"""EN: pytest plugin: fail tests that run more SQL than their budget.
+
+Registered for this suite by tests/conftest.py (elsewhere:
+`pytest -p tests.query_budget`). It is test tooling, not part of the app
+package; app/query_profile.py is the runtime side. Then:
+
+    @pytest.mark.query_budget(4, max_repeats=1)
+    def test_view_observation(client):
+        client.get("/api/observations/1")
+
+    def test_list(client, query_budget):
+        client.get("/api/teachers")              # EN: not counted / BR: não contado
+        with query_budget(2):
+            client.get("/api/observations")
+
+`max_repeats` caps how often one statement shape (see query_profile.fingerprint)
+may run, which is what an N+1 loop trips. `--query-budget=N` and
+`--query-repeat-limit=N` set defaults for unmarked tests. Statements are counted
+process-wide, so the app's TestClient thread is included.
+
+BR: Plugin do pytest: falha testes que executam mais SQL que o orçamento.
+`max_repeats` limita quantas vezes uma mesma forma de consulta pode rodar (o que
+um laço N+1 estoura); `--query-budget` e `--query-repeat-limit` definem padrões.
+"""
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+
+import pytest
+
+from app.query_profile import QueryProfile, collect
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("query-budget", "SQL query budgets")
+    group.addoption("--query-budget", type=int, default=None,
+                    help="Default max SQL statements per test (unmarked tests).")
+    group.addoption("--query-repeat-limit", type=int, default=None,
+                    help="Default max runs of one statement shape per test (N+1 check).")
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "query_budget(max_queries=None, max_repeats=None): fail the test if it runs more SQL statements "
+        "than max_queries, or one statement shape more than max_repeats times",
+    )
+
+
+def _violations(current: QueryProfile, max_queries: Optional[int], max_repeats: Optional[int]) -> List[str]:
+    problems = []
+    if max_queries is not None and current.queries > max_queries:
+        problems.append(f"ran {current.queries} SQL statements, budget is {max_queries}")
+    if max_repeats is not None:
+        for shape, count in current.repeated(max_repeats + 1):
+            problems.append(f"ran one statement {count} times, limit is {max_repeats}: {shape}")
+    return problems
+
+
+def _check(current: QueryProfile, max_queries: Optional[int], max_repeats: Optional[int]) -> None:
+    problems = _violations(current, max_queries, max_repeats)
+    if problems:
+        pytest.fail("Query budget exceeded:\n" + "\n".join(problems) + "\n" + current.describe(), pytrace=False)
+
+
+@pytest.hookimpl(wrapper=True)
+def pytest_runtest_call(item):
+    max_queries = item.config.getoption("query_budget")
+    max_repeats = item.config.getoption("query_repeat_limit")
+    marker = item.get_closest_marker("query_budget")
+    if marker is not None:
+        max_queries = marker.kwargs.get("max_queries", marker.args[0] if marker.args else max_queries)
+        max_repeats = marker.kwargs.get("max_repeats", max_repeats)
+    if max_queries is None and max_repeats is None:
+        return (yield)
+
+    # EN: A test that already failed keeps its own error / BR: Um teste que já falhou mantém seu próprio erro
+    with collect() as current:
+        result = yield
+    _check(current, max_queries, max_repeats)
+    return result
+
+
+@pytest.fixture
+def query_budget():
+    """EN: Context manager budgeting only the block it wraps / BR: Gerenciador de contexto que limita só o bloco envolvido"""
+
+    @contextmanager
+    def budget(max_queries: Optional[int] = None, max_repeats: Optional[int] = None) -> Iterator[QueryProfile]:
+        with collect() as current:
+            yield current
+        _check(current, max_queries, max_repeats)
+
+    return budget
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+from sqlalchemy import func, select
+
+from app import analytics
+from app.database import SessionLocal
+from app.models.models import Observation
+
+WEEK = {"from_week": "2019-03-04", "to_week": "2019-03-10"}
+
+
+@pytest.fixture
+def summaries(client):
+    """EN: Start from summaries that match Observations (other tests write raw SQL)
+    BR: Partir de resumos que batem com Observations (outros testes gravam SQL bruto)"""
+    with SessionLocal() as s:
+        analytics.rebuild(s)
+
+
+def _weekly(client, focus_area_id: int) -> list:
+    r = client.get("/api/analytics/weekly", params={"department_id": 3, "focus_area_id": focus_area_id, **WEEK})
+    assert r.status_code == 200, r.text
+    return [(row["Week_Start"], row["Observation_Count"]) for row in r.json()]
+
+
+def test_weekly_counts_follow_writes(client, summaries):
+    rows = [{"Teacher_ID": 3, "Department_ID": 3, "FocusArea_ID": 8, "Class": "10A", "Date": day} for day in ("2019-03-05", "2019-03-09")]
+    report = client.post("/api/observations/import", params={"format": "ndjson"},
+                         content="".join(json.dumps(row) + "\n" for row in rows)).json()
+    assert report["inserted"] == 2
+    assert _weekly(client, 8) == [("2019-03-04", 2)]
+    [first] = client.get("/api/analytics/weekly", params={"department_id": 3, "focus_area_id": 8, **WEEK}).json()
+    assert (first["Department_Name"], first["FocusArea_Name"]) == ("French", "Memory")
+
+    with SessionLocal() as s:
+        first_id, second_id = s.scalars(
+            select(Observation.Observation_ID)
+            .where(Observation.Observation_Department == 3, Observation.Observation_Focus == 8,
+                   func.date(Observation.Observation_Date).between("2019-03-04", "2019-03-10"))
+            .order_by(Observation.Observation_ID)
+        ).all()[-2:]
+
+    assert client.put(f"/api/observations/{first_id}", json={"Observation_Focus": 9}).status_code == 200
+    assert _weekly(client, 8) == [("2019-03-04", 1)]
+    assert _weekly(client, 9) == [("2019-03-04", 1)]
+
+    assert client.delete(f"/api/observations/{second_id}").status_code == 200
+    assert sum(count for _week, count in _weekly(client, 8)) == 0
+
+    with SessionLocal() as s:
+        assert analytics.check(s)
+
+
+def test_teacher_coverage(client, summaries, new_observation):
+    new_observation(Observation_Teacher=4, Observation_Focus=2)
+    r = client.get("/api/analytics/teachers")
+    assert r.status_code == 200
+    coverage = {row["Teacher_ID"]: row for row in r.json()}
+    with SessionLocal() as s:
+        expected = s.scalar(select(func.count()).where(Observation.Observation_Teacher == 4))
+    assert coverage[4]["Observation_Count"] == expected
+    assert coverage[4]["Last_Observed"] is not None
+    counts = [row["Observation_Count"] for row in r.json()]
+    assert counts == sorted(counts)
+
+    focus_only = {row["Teacher_ID"]: row for row in client.get("/api/analytics/teachers", params={"focus_area_id": 2}).json()}
+    assert focus_only[4]["Focus_Areas_Covered"] == 1
@@ -0,0 +1,26 @@
+def test_bootstrap_matches_lookup_endpoints(client):
+    r = client.get("/api/bootstrap")
+    assert r.status_code == 200, r.text
+    data = r.json()
+    for name in ("teachers", "departments", "focus_areas", "flag_types"):
+        assert data[name] == client.get(f"/api/{name}").json(), name
+    assert data["observation"] is None
+
+    assert client.get("/api/bootstrap", headers={"If-None-Match": r.headers["ETag"]}).status_code == 304
+
+
+def test_bootstrap_with_observation(client, new_observation, query_budget):
+    observation_id = new_observation(Observation_Class="11Z", Observation_Focus=5)
+    client.get("/api/bootstrap")
+    # EN: Lists are cached, so only the observation is read / BR: As listas estão em cache, só a observação é lida
+    with query_budget(1):
+        r = client.get("/api/bootstrap", params={"observation_id": observation_id})
+    assert r.status_code == 200
+    assert "ETag" not in r.headers
+    observation = r.json()["observation"]
+    assert observation == client.get(f"/api/observations/{observation_id}").json()
+    assert observation["Observation_Class"] == "11Z"
+
+
+def test_bootstrap_unknown_observation(client):
+    assert client.get("/api/bootstrap", params={"observation_id": 999_999}).status_code == 404
@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+from app.database import SQLITE_PRAGMAS, engine
+
+
+def test_connections_get_the_sqlite_profile(client):
+    with engine.connect() as conn:
+        def pragma(name: str):
+            return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+        assert pragma("journal_mode") == "wal"
+        assert pragma("busy_timeout") == SQLITE_PRAGMAS["busy_timeout"]
+        assert pragma("synchronous") == 1  # EN: NORMAL / BR: NORMAL
+        assert pragma("cache_size") == SQLITE_PRAGMAS["cache_size"]
+        assert pragma("temp_store") == 2  # EN: MEMORY / BR: MEMORY
+    assert engine.pool.size() == int(os.getenv("DB_POOL_SIZE", "10"))
+
+
+_ASYNC_APP = """
+    from fastapi.testclient import TestClient
+
+    from app import database
+    from app.main import app
+
+    assert database.ASYNC_DB and database.get_session is database.get_async_db
+    with TestClient(app) as client:
+        body = {"Observation_Teacher": 1, "Observation_Department": 1, "Observation_Class": "7A", "Observation_Focus": 1}
+        observation_id = client.post("/api/new", json=body).json()["id"]
+        assert client.get(f"/api/observations/{observation_id}").status_code == 200
+        assert [row["Observation_ID"] for row in client.get("/api/observations").json()] == [observation_id]
+        assert client.post("/api/flags", json={"Observation": observation_id, "FlagType": 1, "FocusArea": 1}).status_code == 200
+        assert client.delete(f"/api/observations/{observation_id}").status_code == 200
+    print("ok")
+"""
+
+
+def test_routes_on_the_aiosqlite_path(tmp_path):
+    # EN: The driver is picked at import time, so this runs in its own process
+    # BR: O driver é escolhido na importação, então isto roda num processo próprio
+    env = {
+        **os.environ,
+        "SQLALCHEMY_DATABASE_URL": f"sqlite+aiosqlite:///{tmp_path / 'async.db'}",
+        "PDF_CACHE_DIR": str(tmp_path / "pdf-cache"),
+    }
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    result = subprocess.run([sys.executable, "-c", textwrap.dedent(_ASYNC_APP)], cwd=root, env=env,
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == "ok"
@@ -0,0 +1,42 @@
+import csv
+import io
+import json
+
+
+def test_csv_export(client, new_observation):
+    observation_id = new_observation(Observation_Teacher=3, Observation_Comments='Said "well done", then moved on')
+    r = client.get("/api/observations/export", params={"teacher_id": 3})
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "text/csv; charset=utf-8"
+    assert r.headers["content-disposition"].startswith('attachment; filename="observations-')
+
+    rows = list(csv.DictReader(io.StringIO(r.text)))
+    assert {row["Teacher_ID"] for row in rows} == {"3"}
+    [row] = [row for row in rows if row["Observation_ID"] == str(observation_id)]
+    assert row["Observation_Comments"] == 'Said "well done", then moved on'
+    assert (row["Teacher_Forename"], row["Teacher_Surname"]) == ("Peter", "Robinson")
+    # EN: Same order as the list / BR: Mesma ordem da listagem
+    listed = [item["Observation_ID"] for item in client.get("/api/observations", params={"teacher_id": 3, "limit": 1000}).json()]
+    assert [int(row["Observation_ID"]) for row in rows] == listed
+
+
+def test_ndjson_export_with_search(client, new_observation):
+    observation_id = new_observation(Observation_Strengths="pelican modelling")
+    r = client.get("/api/observations/export", params={"format": "ndjson", "q": "pelican"})
+    assert r.headers["content-type"] == "application/x-ndjson"
+    [record] = [json.loads(line) for line in r.text.splitlines()]
+    assert record["Observation_ID"] == observation_id
+    assert record["Observation_Strengths"] == "pelican modelling"
+    assert record["FocusArea_Name"] == "Synoptic"
+
+
+def test_empty_export_is_header_only(client):
+    r = client.get("/api/observations/export", params={"q": "nothingmatchesthis"})
+    assert r.text.splitlines() == [
+        "Observation_ID,Observation_Date,Teacher_ID,Teacher_Forename,Teacher_Surname,Department_ID,Department_Name,"
+        "FocusArea_ID,FocusArea_Name,Observation_Class,Observation_Strengths,Observation_Weaknesses,Observation_Comments"
+    ]
+
+
+def test_unknown_format(client):
+    assert client.get("/api/observations/export", params={"format": "xlsx"}).status_code == 422
@@ -0,0 +1,24 @@
+import pytest
+
+from app import routes
+
+
+@pytest.mark.parametrize("path, params", [
+    ("/api/observations", {"limit": 5}),
+    ("/api/observations", {"q": "wagtail"}),
+    ("/api/flags", {"status": "all", "limit": 5}),
+    ("/api/analytics/weekly", {}),
+    ("/api/analytics/teachers", {}),
+])
+def test_same_bytes_and_headers(client, new_observation, monkeypatch, path, params):
+    observation_id = new_observation(Observation_Comments="wagtail")
+    client.post("/api/flags", json={"Observation": observation_id, "FlagType": 2, "FocusArea": 1})
+
+    monkeypatch.setattr(routes, "FAST_JSON", False)
+    plain = client.get(path, params=params)
+    monkeypatch.setattr(routes, "FAST_JSON", True)
+    fast = client.get(path, params=params)
+
+    assert fast.status_code == plain.status_code == 200
+    assert fast.content == plain.content
+    assert fast.headers.get("X-Next-Cursor") == plain.headers.get("X-Next-Cursor")
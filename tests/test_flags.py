@@ -0,0 +1,48 @@
+import pytest
+
+
+@pytest.fixture
+def observation_id(new_observation):
+    return new_observation()
+
+
+def test_flag_round_trip(client, observation_id):
+    r = client.post("/api/flags", json={"Observation": observation_id, "FlagType": 1, "FocusArea": 2})
+    assert r.status_code == 200, r.text
+    flag_id = r.json()["id"]
+
+    r = client.put(f"/api/flags/{flag_id}", json={"Is_Open": False, "FocusArea": 3})
+    assert r.status_code == 200, r.text
+    flag = client.get(f"/api/flags/{flag_id}").json()
+    assert flag["Observation_ID"] == observation_id
+    assert flag["Is_Open"] is False
+    assert flag["Focus_Area"] == "Explanations"
+
+    closed = client.get("/api/flags", params={"status": "closed", "focus_area_id": 3}).json()
+    assert flag_id in [row["Flag_ID"] for row in closed]
+
+
+@pytest.mark.parametrize("field, detail", [
+    ("Observation", "Observation not found"),
+    ("FlagType", "Flag type not found"),
+    ("FocusArea", "Focus area not found"),
+])
+def test_create_flag_unknown_reference(client, observation_id, field, detail):
+    body = {"Observation": observation_id, "FlagType": 1, "FocusArea": 1, field: 999_999}
+    r = client.post("/api/flags", json=body)
+    assert r.status_code == 404
+    assert r.json()["detail"] == detail
+
+
+@pytest.mark.parametrize("field, detail", [("FlagType", "Flag type not found"), ("FocusArea", "Focus area not found")])
+def test_edit_flag_unknown_reference(client, observation_id, field, detail):
+    flag_id = client.post("/api/flags", json={"Observation": observation_id, "FlagType": 1, "FocusArea": 1}).json()["id"]
+    r = client.put(f"/api/flags/{flag_id}", json={field: 999_999})
+    assert r.status_code == 404
+    assert r.json()["detail"] == detail
+    assert client.get(f"/api/flags/{flag_id}").json()["Flag_Type"] == "Exemplary"
+
+
+@pytest.mark.parametrize("param", ["flag_type_id", "focus_area_id", "teacher_id"])
+def test_list_rejects_non_positive_ids(client, param):
+    assert client.get("/api/flags", params={param: 0}).status_code == 422
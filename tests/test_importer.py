@@ -0,0 +1,70 @@
+import json
+
+import pytest
+from sqlalchemy import text
+
+from app.database import engine
+
+
+def _ndjson(*records) -> str:
+    return "".join(json.dumps(record) + "\n" for record in records)
+
+
+def _count(marker: str) -> int:
+    with engine.connect() as conn:
+        return conn.execute(text('SELECT count(*) FROM "Observations" WHERE "Observation_Comments" = :m'), {"m": marker}).scalar()
+
+
+@pytest.fixture
+def reject_class(client):
+    """EN: A trigger that makes the database itself refuse rows with Observation_Class "REJECT"
+    BR: Um gatilho que faz o próprio banco recusar linhas com Observation_Class "REJECT" """
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            'CREATE TRIGGER "test_reject_class" BEFORE INSERT ON "Observations" '
+            "WHEN new.\"Observation_Class\" = 'REJECT' BEGIN SELECT RAISE(ABORT, 'rejected by test'); END"
+        )
+    yield "REJECT"
+    with engine.begin() as conn:
+        conn.exec_driver_sql('DROP TRIGGER "test_reject_class"')
+
+
+def test_rejected_chunk_is_retried_row_by_row(client, reject_class):
+    row = {"Teacher": "Chloe Chen", "Department": "Computing", "Focus": "Questioning", "Comments": "import-retry"}
+    body = _ndjson(row, {**row, "Class": "8B"}, {**row, "Class": reject_class}, {**row, "Class": "8C"})
+
+    r = client.post("/api/observations/import", params={"format": "ndjson"}, content=body)
+    assert r.status_code == 200, r.text
+    report = r.json()
+    assert report["chunks"] == 1
+    assert (report["received"], report["valid"], report["inserted"], report["failed"]) == (4, 3, 2, 2)
+    assert [error["line"] for error in report["errors"]] == [1, 3]
+    assert report["errors"][0]["errors"] == ["Observation_Class: Field required"]
+    assert report["errors"][1]["errors"] == ["database: rejected by test"]
+    assert _count("import-retry") == 2
+
+
+def test_csv_by_email_and_name(client):
+    csv_body = (
+        "Teacher_Email,Department_ID,Focus_Area,Class,Date,Comments\n"
+        "focused-app.user2@maildrop.cc,1,Feedback,7A,2024-02-01,import-csv\n"
+        "focused-app.user3@maildrop.cc,2,Memory,7B,2024-02-02,import-csv\n"
+        "nobody@example.org,2,Memory,7C,2024-02-03,import-csv\n"
+    )
+    r = client.post("/api/observations/import", content=csv_body, headers={"Content-Type": "text/csv"})
+    report = r.json()
+    assert (report["format"], report["inserted"], report["failed"]) == ("csv", 2, 1)
+    assert report["errors"] == [{"line": 4, "errors": ["Observation_Teacher: unknown name 'nobody@example.org'"]}]
+    assert _count("import-csv") == 2
+
+
+def test_dry_run_inserts_nothing(client):
+    body = _ndjson({"Teacher_ID": 1, "Department_ID": 1, "FocusArea_ID": 1, "Class": "9A", "Comments": "import-dry"})
+    report = client.post("/api/observations/import", params={"format": "ndjson", "dry_run": "true"}, content=body).json()
+    assert (report["valid"], report["inserted"]) == (1, 0)
+    assert _count("import-dry") == 0
+
+
+def test_unknown_format(client):
+    r = client.post("/api/observations/import", content="x", headers={"Content-Type": "text/plain"})
+    assert r.status_code == 415
@@ -0,0 +1,43 @@
+def _scrape(client) -> dict:
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = {}
+    for line in r.text.splitlines():
+        if line and not line.startswith("#"):
+            series, value = line.rsplit(" ", 1)
+            samples[series] = float(value)
+    return samples
+
+
+def test_requests_are_labelled_by_route_template(client, new_observation):
+    observation_id = new_observation()
+    route = "/api/observations/{observation_ID}"
+    ok = f'http_requests_total{{method="GET",route="{route}",status="200"}}'
+    missing = f'http_requests_total{{method="GET",route="{route}",status="404"}}'
+    before = _scrape(client)
+
+    client.get(f"/api/observations/{observation_id}")
+    client.get(f"/api/observations/{observation_id}")
+    client.get("/api/observations/999999")
+    after = _scrape(client)
+
+    assert after[ok] - before.get(ok, 0) == 2
+    assert after[missing] - before.get(missing, 0) == 1
+    assert not any(f"/api/observations/{observation_id}" in series for series in after)
+    count = f'http_request_duration_seconds_count{{method="GET",route="{route}"}}'
+    assert after[count] - before.get(count, 0) == 3
+
+
+def test_sql_per_request(client, new_observation):
+    observation_id = new_observation()
+    route = "/api/observations/{observation_ID}"
+    queries = f'db_queries_per_request_sum{{route="{route}"}}'
+    total = f'db_queries_total{{route="{route}"}}'
+    before = _scrape(client)
+    client.get(f"/api/observations/{observation_id}")
+    after = _scrape(client)
+
+    per_request = after[queries] - before.get(queries, 0)
+    assert per_request >= 1
+    assert after[total] - before.get(total, 0) == per_request
@@ -0,0 +1,58 @@
+import json
+
+from sqlalchemy import text
+
+
+def _pages(client, limit, **params):
+    """EN: Follow X-Next-Cursor to the end; returns the pages / BR: Seguir o X-Next-Cursor até o fim; retorna as páginas"""
+    pages, cursor = [], None
+    while True:
+        r = client.get("/api/observations", params={**params, "limit": limit, **({"cursor": cursor} if cursor else {})})
+        assert r.status_code == 200, r.text
+        pages.append([item["Observation_ID"] for item in r.json()])
+        cursor = r.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return pages
+
+
+def test_keyset_round_trip(client, new_observation):
+    from app.database import engine
+
+    ids = [new_observation(Observation_Teacher=7) for _ in range(7)]
+    # EN: Ties on the date are broken by ID / BR: Empates na data são desfeitos pelo ID
+    dates = ["2024-03-01 09:00:00", "2024-03-01 09:00:00", "2024-03-01 09:00:00",
+             "2023-11-20 14:30:00", "2025-01-10 08:15:00", "2023-11-20 14:30:00", "2024-03-01 09:00:00"]
+    with engine.begin() as conn:
+        for observation_id, when in zip(ids, dates):
+            conn.execute(text('UPDATE "Observations" SET "Observation_Date" = :d WHERE "Observation_ID" = :i'),
+                         {"d": when, "i": observation_id})
+    expected = [i for _, i in sorted(zip(dates, ids), key=lambda pair: (pair[0], pair[1]), reverse=True)]
+
+    pages = _pages(client, 3, teacher_id=7)
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert [i for page in pages for i in page] == expected
+
+
+def test_pages_match_stream(client, new_observation):
+    for teacher in (1, 2, 3):
+        new_observation(Observation_Teacher=teacher)
+    paged = [i for page in _pages(client, 4) for i in page]
+
+    r = client.get("/api/observations", params={"stream": "true"})
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    streamed = [json.loads(line)["Observation_ID"] for line in r.text.splitlines()]
+    assert paged == streamed
+    assert len(set(paged)) == len(paged)
+
+
+def test_last_page_has_no_cursor(client, new_observation):
+    new_observation(Observation_Teacher=8)
+    r = client.get("/api/observations", params={"teacher_id": 8, "limit": 1000})
+    assert r.status_code == 200
+    assert "X-Next-Cursor" not in r.headers
+
+
+def test_invalid_cursor(client):
+    r = client.get("/api/observations", params={"cursor": "not-a-cursor"})
+    assert r.status_code == 400
+    assert r.json()["detail"] == "Invalid cursor"
@@ -0,0 +1,162 @@
+import asyncio
+from datetime import timedelta
+
+import httpx
+import pytest
+from sqlalchemy import delete, update
+
+from app import mailer_client
+from app.database import SessionLocal
+from app.mailer_client import OutboxWorker, _claim_batch, _record_results, _utcnow
+from app.models.outbox import MailOutbox
+
+
+@pytest.fixture
+def outbox(client):
+    """EN: Empty outbox; returns a function that queues one email through POST /api/new?notify=true
+    BR: Outbox vazia; retorna uma função que enfileira um e-mail via POST /api/new?notify=true"""
+    with SessionLocal() as s:
+        s.execute(delete(MailOutbox))
+        s.commit()
+
+    def enqueue() -> int:
+        body = {"Observation_Teacher": 2, "Observation_Department": 1, "Observation_Class": "8M", "Observation_Focus": 4}
+        r = client.post("/api/new", params={"notify": "true"}, json=body)
+        assert r.status_code == 200, r.text
+        return r.json()["id"]
+
+    return enqueue
+
+
+def _row(observation_id: int) -> MailOutbox:
+    with SessionLocal() as s:
+        return s.query(MailOutbox).filter(MailOutbox.Observation_ID == observation_id).one()
+
+
+def _set(observation_id: int, **values) -> None:
+    with SessionLocal() as s:
+        s.execute(update(MailOutbox).where(MailOutbox.Observation_ID == observation_id).values(**values))
+        s.commit()
+
+
+def _worker(statuses: list, seen: list) -> OutboxWorker:
+    """EN: Worker whose mailer answers with the given statuses in turn / BR: Worker cujo mailer responde com os status dados, em ordem"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(statuses[min(len(seen), len(statuses)) - 1], text="mailer says no")
+
+    worker = OutboxWorker()
+    worker.url, worker.api_key = "http://mailer.test/mail/observation", "test-key"
+    worker._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return worker
+
+
+def test_claim_leases_rows(outbox):
+    observation_id = outbox()
+    [claimed] = _claim_batch(10)
+    assert claimed["key"] == f"observation-{observation_id}-{claimed['id']}"
+    assert _row(observation_id).Locked_Until > _utcnow()
+
+    # EN: Leased: a second worker gets nothing / BR: Reservada: um segundo worker não recebe nada
+    assert _claim_batch(10) == []
+
+    # EN: A crashed worker's lease runs out / BR: A reserva de um worker que caiu expira
+    _set(observation_id, Locked_Until=_utcnow() - timedelta(seconds=1))
+    assert [item["id"] for item in _claim_batch(10)] == [claimed["id"]]
+
+
+def test_retry_with_backoff_then_sent(outbox):
+    observation_id = outbox()
+    seen = []
+    worker = _worker([503, 202], seen)
+
+    before = _utcnow()
+    assert asyncio.run(worker.drain_once()) == 1
+    row = _row(observation_id)
+    assert (row.Status, row.Attempts, row.Locked_Until) == ("pending", 1, None)
+    assert row.Last_Error.startswith("status 503")
+    delay = (row.Next_Attempt_At - before).total_seconds()
+    low, high = mailer_client.OUTBOX_BACKOFF_BASE * 0.8, mailer_client.OUTBOX_BACKOFF_BASE * 1.2 + 1
+    assert low <= delay <= high
+
+    # EN: Not due yet / BR: Ainda não venceu
+    assert asyncio.run(worker.drain_once()) == 0
+
+    _set(observation_id, Next_Attempt_At=_utcnow() - timedelta(seconds=1))
+    assert asyncio.run(worker.drain_once()) == 1
+    row = _row(observation_id)
+    assert (row.Status, row.Attempts, row.Last_Error) == ("sent", 1, None)
+    assert row.Sent_At is not None
+    assert [r.headers["Idempotency-Key"] for r in seen] == [row.Idempotency_Key] * 2
+    assert seen[0].headers["X-API-KEY"] == "test-key"
+    assert (worker.sent, worker.retried) == (1, 1)
+
+
+def test_client_error_is_permanent(outbox):
+    observation_id = outbox()
+    worker = _worker([400], [])
+    asyncio.run(worker.drain_once())
+    row = _row(observation_id)
+    assert (row.Status, row.Attempts) == ("failed", 1)
+    assert worker.failed == 1
+
+
+def test_gives_up_after_max_attempts(outbox, monkeypatch):
+    monkeypatch.setattr(mailer_client, "OUTBOX_MAX_ATTEMPTS", 2)
+    observation_id = outbox()
+    worker = _worker([503], [])
+    for _ in range(2):
+        _set(observation_id, Next_Attempt_At=_utcnow() - timedelta(seconds=1))
+        asyncio.run(worker.drain_once())
+    row = _row(observation_id)
+    assert (row.Status, row.Attempts) == ("failed", 2)
+    assert asyncio.run(worker.drain_once()) == 0
+
+
+def test_pending_email_is_replaced_not_duplicated(client, outbox):
+    observation_id = outbox()
+
+    def rows() -> int:
+        with SessionLocal() as s:
+            return s.query(MailOutbox).filter(MailOutbox.Observation_ID == observation_id).count()
+
+    assert client.post(f"/api/observations/{observation_id}/email").status_code == 200
+    assert rows() == 1
+
+    # EN: Once a delivery was attempted the message is left alone / BR: Depois de uma tentativa a mensagem não é alterada
+    _set(observation_id, Attempts=1)
+    assert client.post(f"/api/observations/{observation_id}/email").status_code == 200
+    assert rows() == 2
+
+
+def test_resend_during_delivery_gets_its_own_row(client, outbox):
+    observation_id = outbox()
+    [claimed] = _claim_batch(10)
+
+    # EN: Edit + resend while the worker is sending the first email
+    # BR: Edição + reenvio enquanto o worker envia o primeiro e-mail
+    r = client.put(f"/api/observations/{observation_id}", json={"Observation_Comments": "edited", "resend_email": True})
+    assert r.status_code == 200, r.text
+    _record_results([{"id": claimed["id"], "token": claimed["token"], "ok": True}])
+
+    with SessionLocal() as s:
+        rows = s.query(MailOutbox).filter(MailOutbox.Observation_ID == observation_id).order_by(MailOutbox.Outbox_ID).all()
+    assert [(row.Status, row.Payload == claimed["payload"]) for row in rows] == [("sent", True), ("pending", False)]
+    assert "edited" in rows[1].Payload
+
+
+def test_stale_claim_cannot_record(outbox):
+    observation_id = outbox()
+    [stale] = _claim_batch(10)
+    _set(observation_id, Locked_Until=_utcnow() - timedelta(seconds=1))
+    [fresh] = _claim_batch(10)
+
+    _record_results([{"id": stale["id"], "token": stale["token"], "ok": True}])
+    row = _row(observation_id)
+    assert (row.Status, row.Claim_Token) == ("pending", fresh["token"])
+
+    _record_results([{"id": fresh["id"], "token": fresh["token"], "ok": False, "attempts": fresh["attempts"],
+                      "permanent": False, "error": "status 503"}])
+    row = _row(observation_id)
+    assert (row.Status, row.Attempts, row.Claim_Token) == ("pending", 1, None)
@@ -0,0 +1,223 @@
+import asyncio
+import io
+import os
+import time
+import zipfile
+from email.utils import formatdate
+
+import httpx
+import pytest
+
+from app import metrics, renderer, routes
+from app.main import app
+from app.pdf_cache import PdfCache, pdf_cache
+
+
+@pytest.fixture
+def render_calls(monkeypatch):
+    """EN: Stand-in renderer; returns the list of HTML it was asked to render
+    BR: Renderer substituto; retorna a lista de HTML que recebeu"""
+    calls = []
+
+    async def fake_render_pdf(html: str) -> bytes:
+        calls.append(html)
+        return b"%PDF-1.7 " + str(len(calls)).encode()
+
+    monkeypatch.setattr(renderer, "render_pdf", fake_render_pdf)
+    return calls
+
+
+def test_cache_hit_and_etag(client, new_observation, render_calls):
+    observation_id = new_observation(Observation_Comments="first version")
+
+    first = client.get(f"/api/pdf/{observation_id}")
+    assert first.status_code == 200, first.text
+    assert first.headers["content-type"] == "application/pdf"
+    assert "Last-Modified" in first.headers
+    etag = first.headers["ETag"]
+    assert len(render_calls) == 1
+
+    # EN: Same HTML: served from the disk cache / BR: Mesmo HTML: servido do cache em disco
+    second = client.get(f"/api/pdf/{observation_id}")
+    assert second.content == first.content
+    assert second.headers["ETag"] == etag
+    assert len(render_calls) == 1
+
+    for header in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        r = client.get(f"/api/pdf/{observation_id}", headers={"If-None-Match": header})
+        assert r.status_code == 304, header
+        assert r.content == b""
+        assert r.headers["ETag"] == etag
+    assert len(render_calls) == 1
+
+
+def test_last_modified_is_the_render_time(client, new_observation, render_calls):
+    observation_id = new_observation()
+    first = client.get(f"/api/pdf/{observation_id}")
+    # EN: Pretend it was rendered an hour ago / BR: Fingir que foi renderizado há uma hora
+    rendered = time.time() - 3600
+    os.utime(pdf_cache._path(observation_id, first.headers["ETag"].strip('"')), (rendered, rendered))
+
+    hits = [client.get(f"/api/pdf/{observation_id}").headers["Last-Modified"] for _ in range(2)]
+    assert hits == [formatdate(rendered, usegmt=True)] * 2
+    assert len(render_calls) == 1
+
+
+def test_lru_follows_reads_not_writes(tmp_path):
+    cache = PdfCache(str(tmp_path), max_bytes=20)
+    cache.put(1, "a", b"x" * 8)
+    cache.put(2, "b", b"x" * 8)
+    for observation_id, key, age in ((1, "a", 200), (2, "b", 100)):
+        path = cache._path(observation_id, key)
+        os.utime(path, (time.time() - age, time.time() - age))
+    written = cache.last_modified(1, "a")
+
+    assert cache.get(1, "a") is not None
+    cache.put(3, "c", b"x" * 8)
+    assert cache.get(2, "b") is None
+    assert cache.get(1, "a") is not None
+    assert cache.last_modified(1, "a") == written
+
+
+def test_edit_changes_etag(client, new_observation, render_calls):
+    observation_id = new_observation(Observation_Comments="before")
+    etag = client.get(f"/api/pdf/{observation_id}").headers["ETag"]
+
+    client.put(f"/api/observations/{observation_id}", json={"Observation_Comments": "after"})
+    r = client.get(f"/api/pdf/{observation_id}", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["ETag"] != etag
+    assert len(render_calls) == 2
+    assert "after" in render_calls[-1]
+
+
+@pytest.mark.parametrize("error, status", [
+    (renderer.RendererError("boom"), 502),
+    (renderer.RendererBusy("queue full"), 503),
+])
+def test_renderer_errors(client, new_observation, monkeypatch, error, status):
+    async def failing_render_pdf(html: str) -> bytes:
+        raise error
+
+    monkeypatch.setattr(renderer, "render_pdf", failing_render_pdf)
+    r = client.get(f"/api/pdf/{new_observation()}")
+    assert r.status_code == status
+    assert r.json()["detail"] == str(error)
+    if status == 503:
+        assert r.headers["Retry-After"] == "5"
+
+
+def test_unknown_observation_or_template(client, new_observation, render_calls):
+    assert client.get("/api/pdf/999999").status_code == 404
+    assert client.get(f"/api/pdf/{new_observation()}", params={"template": "missing"}).status_code == 404
+    assert render_calls == []
+
+
+def _burst(observation_id: int, fanout: int) -> list:
+    """EN: fanout concurrent GETs on one event loop / BR: fanout GETs simultâneos num único event loop"""
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+            return await asyncio.gather(*(c.get(f"/api/pdf/{observation_id}") for _ in range(fanout)))
+
+    return asyncio.run(run())
+
+
+def _pdf_counters() -> dict:
+    with metrics.pdf_requests._lock:
+        return {labels[0]: value for labels, value in metrics.pdf_requests._values.items()}
+
+
+@pytest.fixture
+def slow_render_calls(monkeypatch):
+    calls = []
+
+    async def slow_render_pdf(html: str) -> bytes:
+        calls.append(html)
+        await asyncio.sleep(0.2)
+        return b"%PDF-1.7 " + str(len(calls)).encode()
+
+    monkeypatch.setattr(renderer, "render_pdf", slow_render_pdf)
+    return calls
+
+
+def test_concurrent_requests_share_one_render(new_observation, slow_render_calls, monkeypatch):
+    monkeypatch.setattr(routes, "PDF_COALESCE", True)
+    observation_id = new_observation()
+    before = _pdf_counters()
+
+    responses = _burst(observation_id, 4)
+    assert [r.status_code for r in responses] == [200] * 4
+    assert len({r.content for r in responses}) == 1
+    assert len(slow_render_calls) == 1
+    after = _pdf_counters()
+    assert after.get("render", 0) - before.get("render", 0) == 1
+    assert after.get("coalesced", 0) - before.get("coalesced", 0) == 3
+    assert routes._pdf_in_flight == {}
+
+
+def test_coalescing_off_renders_each(new_observation, slow_render_calls, monkeypatch):
+    monkeypatch.setattr(routes, "PDF_COALESCE", False)
+    _burst(new_observation(), 3)
+    assert len(slow_render_calls) == 3
+
+
+def test_shared_render_error_reaches_every_caller(new_observation, monkeypatch):
+    calls = []
+
+    async def failing_render_pdf(html: str) -> bytes:
+        calls.append(html)
+        await asyncio.sleep(0.2)
+        raise renderer.RendererError("boom")
+
+    monkeypatch.setattr(routes, "PDF_COALESCE", True)
+    monkeypatch.setattr(renderer, "render_pdf", failing_render_pdf)
+    responses = _burst(new_observation(), 3)
+    assert [r.status_code for r in responses] == [502] * 3
+    assert len(calls) == 1
+    assert routes._pdf_in_flight == {}
+
+
+def test_bulk_zip(client, new_observation, monkeypatch):
+    async def render_pdf(html: str) -> bytes:
+        if "render-fails" in html:
+            raise renderer.RendererError("boom")
+        return b"%PDF-1.7 bulk"
+
+    monkeypatch.setattr(renderer, "render_pdf", render_pdf)
+    monkeypatch.setattr(routes, "BULK_EXPORT_PARALLELISM", 2)
+    good = [new_observation(Observation_Teacher=8, Observation_Focus=6) for _ in range(4)]
+    bad = new_observation(Observation_Teacher=8, Observation_Focus=6, Observation_Comments="render-fails")
+
+    r = client.get("/api/pdf/bulk", params={"teacher_id": 8, "focus_area_id": 6})
+    assert r.status_code == 200
+    assert r.headers["content-type"] == "application/zip"
+    archive = zipfile.ZipFile(io.BytesIO(r.content))
+    assert sorted(archive.namelist()) == sorted([f"observation_{i}.pdf" for i in good] + ["errors.txt"])
+    assert archive.read(f"observation_{good[0]}.pdf") == b"%PDF-1.7 bulk"
+    assert archive.read("errors.txt").decode() == f"observation_{bad}: boom\n"
+
+
+def test_bulk_nothing_to_export(client, render_calls):
+    assert client.get("/api/pdf/bulk", params={"teacher_id": 999_999}).status_code == 404
+    assert client.get("/api/pdf/bulk", params={"template": "missing"}).status_code == 404
+    assert render_calls == []
+
+
+def test_template_html_is_escaped(client, new_observation, render_calls):
+    observation_id = new_observation(Observation_Strengths="<img src=x onerror=alert(1)> & more")
+    client.get(f"/api/pdf/{observation_id}")
+    html = render_calls[-1]
+    assert "<img" not in html
+    assert "&lt;img src=x onerror=alert(1)&gt; &amp; more" in html
+    assert "Chloe Chen" in html
+
+
+def test_template_by_name_or_id(client, new_observation, render_calls):
+    observation_id = new_observation()
+    default = client.get(f"/api/pdf/{observation_id}")
+    by_name = client.get(f"/api/pdf/{observation_id}", params={"template": "Standard"})
+    by_id = client.get(f"/api/pdf/{observation_id}", params={"template": "1"})
+    assert default.headers["ETag"] == by_name.headers["ETag"] == by_id.headers["ETag"]
+    # EN: Same HTML, so one render / BR: Mesmo HTML, então uma renderização
+    assert len(render_calls) == 1
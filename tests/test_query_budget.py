@@ -0,0 +1,59 @@
+import pytest
+
+
+@pytest.mark.query_budget(4, max_repeats=1)
+def test_list_within_budget(client):
+    r = client.get("/api/observations?limit=5")
+    assert r.status_code == 200
+
+
+def test_fixture_budgets_only_the_block(client, new_observation, query_budget):
+    observation_id = new_observation(Observation_Class="10Y2")
+    with query_budget(3, max_repeats=1) as current:
+        r = client.get(f"/api/observations/{observation_id}")
+    assert r.status_code == 200
+    assert current.queries >= 1
+
+
+_OVER_BUDGET = """
+import pytest
+from sqlalchemy import create_engine, text
+
+engine = create_engine("sqlite://")
+
+
+@pytest.mark.query_budget(2)
+def test_too_many_statements():
+    with engine.connect() as conn:
+        for _ in range(3):
+            conn.execute(text("SELECT 1"))
+
+
+@pytest.mark.query_budget(max_repeats=1)
+def test_n_plus_one():
+    with engine.connect() as conn:
+        for i in range(2):
+            conn.execute(text(f"SELECT {i}"))
+
+
+def test_unmarked():
+    with engine.connect() as conn:
+        for _ in range(3):
+            conn.execute(text("SELECT 1"))
+"""
+
+
+def test_over_budget_fails(pytester):
+    pytester.makepyfile(_OVER_BUDGET)
+    result = pytester.runpytest("-p", "tests.query_budget")
+    result.assert_outcomes(passed=1, failed=2)
+    result.stdout.fnmatch_lines([
+        "*ran 3 SQL statements, budget is 2*",
+        "*ran one statement 2 times, limit is 1: SELECT ?*",
+    ])
+
+
+def test_default_budget_option(pytester):
+    pytester.makepyfile(_OVER_BUDGET)
+    result = pytester.runpytest("-p", "tests.query_budget", "--query-budget=2", "-k", "unmarked")
+    result.assert_outcomes(failed=1, deselected=2)
@@ -0,0 +1,41 @@
+"""EN: The observation list must walk an ix_Observations_* index even on a small,
+un-ANALYZEd table, where SQLite is most tempted to scan. The 1M-row run is
+benchmarks/query_plans.py.
+BR: A listagem deve percorrer um índice ix_Observations_* mesmo numa tabela
+pequena e sem ANALYZE. A execução com 1M de linhas é benchmarks/query_plans.py.
+"""
+import itertools
+
+import pytest
+
+from app import routes
+
+FILTERS = ("teacher_id", "department_id", "focus_area_id")
+COMBOS = [combo for size in range(len(FILTERS) + 1) for combo in itertools.combinations(FILTERS, size)]
+
+
+@pytest.fixture(scope="module")
+def engine(client):
+    from app.database import engine
+
+    return engine
+
+
+@pytest.mark.parametrize("after", [None, ("2022-01-01 00:00:00.000000", 3)], ids=["first-page", "cursor"])
+@pytest.mark.parametrize("combo", COMBOS, ids=lambda combo: ",".join(combo) or "none")
+def test_list_plan_uses_index(engine, new_observation, combo, after):
+    for teacher in (1, 2, 3):
+        new_observation(Observation_Teacher=teacher)
+    filters = routes._observation_filters(**{name: (1 if name in combo else None) for name in FILTERS})
+    q = routes._observation_list_query(filters, after).limit(routes.OBSERVATIONS_PAGE_SIZE + 1)
+    sql = str(q.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as conn:
+        plan = [row[-1] for row in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + sql)]
+
+    # EN: Unfiltered, "SCAN Observations USING INDEX ix_Observations_Date" is the list order itself
+    # BR: Sem filtro, "SCAN Observations USING INDEX ix_Observations_Date" já é a ordem da lista
+    steps = [step for step in plan if step.split()[1:2] == ["Observations"]]
+    assert steps, plan
+    assert "SCAN Observations" not in plan, plan
+    assert all("INDEX ix_Observations_" in step for step in steps), plan
+    assert not any("TEMP B-TREE" in step for step in plan), plan
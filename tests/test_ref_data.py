@@ -0,0 +1,54 @@
+import pytest
+
+from app.database import SessionLocal, engine
+from app.models.models import FocusArea
+from app.ref_cache import ref_cache, shared_version
+
+
+@pytest.mark.parametrize("path", ["/api/teachers", "/api/departments", "/api/focus_areas", "/api/flag_types"])
+def test_lookup_etag(client, path):
+    first = client.get(path)
+    assert first.status_code == 200, first.text
+    assert first.json()
+    assert first.headers["Cache-Control"].startswith("private, max-age=")
+    etag = first.headers["ETag"]
+
+    r = client.get(path, headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.content == b""
+    assert client.get(path).content == first.content
+
+
+def test_orm_write_invalidates(client, query_budget):
+    client.get("/api/focus_areas")
+    # EN: Served from memory: no SQL at all / BR: Servido da memória: nenhum SQL
+    with query_budget(0):
+        r = client.get("/api/focus_areas")
+    etag = r.headers["ETag"]
+
+    with SessionLocal() as s:
+        s.add(FocusArea(FocusArea_Name="Retrieval practice"))
+        s.commit()
+
+    r = client.get("/api/focus_areas", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.headers["ETag"] != etag
+    assert "Retrieval practice" in [row["FocusArea_Name"] for row in r.json()]
+
+
+def test_write_from_another_process_is_seen(client):
+    etag = client.get("/api/departments").headers["ETag"]
+    before = shared_version()
+    ref_cache.observe(before)
+    # EN: Raw SQL, as another worker or a script would write: only the trigger sees it
+    # BR: SQL bruto, como outro worker ou um script gravaria: só o gatilho percebe
+    with engine.begin() as conn:
+        conn.exec_driver_sql("""INSERT INTO "Departments" ("Department_Name") VALUES ('Latin')""")
+    assert shared_version() == before + 1
+    assert client.get("/api/departments").headers["ETag"] == etag
+
+    # EN: What the watcher does every REF_CACHE_POLL_INTERVAL (off in tests) / BR: O que o watcher faz a cada REF_CACHE_POLL_INTERVAL (desligado nos testes)
+    ref_cache.observe(shared_version())
+    r = client.get("/api/departments")
+    assert r.headers["ETag"] != etag
+    assert "Latin" in [row["Department_Name"] for row in r.json()]
@@ -0,0 +1,98 @@
+import asyncio
+
+import httpx
+import pytest
+
+from app import local_renderer, renderer
+
+
+@pytest.fixture
+def remote(monkeypatch):
+    """EN: Renderer client on a MockTransport with one slot; set .latency to slow it down
+    BR: Cliente do renderer num MockTransport com uma vaga; ajuste .latency para atrasá-lo"""
+
+    class Remote:
+        latency = 0.0
+        calls = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        Remote.calls += 1
+        await asyncio.sleep(Remote.latency)
+        return httpx.Response(200, content=b"%PDF-1.7 remote", headers={"content-type": "application/pdf"})
+
+    monkeypatch.setattr(renderer, "_client", httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://renderer"))
+    monkeypatch.setattr(renderer, "_slots", asyncio.Semaphore(1))
+    return Remote
+
+
+def test_breaker_opens_then_probes():
+    breaker = renderer.CircuitBreaker(window=4, min_calls=4, error_rate=0.5, cooldown=0)
+    for ok in (True, False, True):
+        breaker.record(breaker.allow(), ok)
+    assert breaker.state == "closed"
+    breaker.record(breaker.allow(), False)
+    assert breaker.state == "open"
+
+    # EN: cooldown 0: the next caller probes, others stay local / BR: cooldown 0: o próximo sonda, os demais ficam locais
+    assert breaker.allow() == "probe"
+    assert breaker.state == "half_open"
+    assert breaker.allow() is None
+    breaker.record("probe", False)
+    assert breaker.state == "open"
+    breaker.record(breaker.allow(), True)
+    assert breaker.state == "closed"
+
+
+def test_no_verdict_is_not_recorded():
+    breaker = renderer.CircuitBreaker(window=4, min_calls=1, error_rate=0.5, cooldown=60)
+    breaker.record(breaker.allow(), None)
+    assert breaker.state == "closed"
+    assert breaker.allow() == "call"
+
+
+def test_slot_wait_is_not_slowness(remote):
+    remote.latency = 0.2
+
+    async def run():
+        # EN: The second call waits ~0.2s for the slot, then takes 0.2s: 0.4s in all, under 0.3s each
+        # BR: A segunda chamada espera ~0.2s pela vaga e leva 0.2s: 0.4s no total, abaixo de 0.3s cada
+        return await asyncio.gather(*(renderer._render_remote("<p>x</p>", slow_after=0.3) for _ in range(2)))
+
+    assert asyncio.run(run()) == [b"%PDF-1.7 remote"] * 2
+
+
+def test_slow_call_is_cut(remote):
+    remote.latency = 0.5
+
+    async def run():
+        await renderer._render_remote("<p>x</p>", slow_after=0.1)
+
+    with pytest.raises(renderer.RendererError, match="slower than 0.1s"):
+        asyncio.run(run())
+
+
+def test_busy_falls_through_without_verdict(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(local_renderer, "enabled", lambda: True)
+    monkeypatch.setattr(renderer, "_client", object())
+    monkeypatch.setattr(renderer, "breaker", renderer.CircuitBreaker(window=4, min_calls=1, error_rate=0.5, cooldown=60))
+    monkeypatch.setattr(renderer.breaker, "record", lambda ticket, ok: recorded.append(ok))
+
+    async def busy(html, slow_after=None):
+        raise renderer.RendererBusy("queue full")
+
+    async def failing(html, slow_after=None):
+        raise renderer.RendererError("boom")
+
+    async def local(html):
+        return b"%PDF-1.7 local"
+
+    monkeypatch.setattr(renderer, "_render_local", local)
+    monkeypatch.setattr(renderer, "_render_remote", busy)
+    with pytest.raises(renderer.RendererBusy):
+        asyncio.run(renderer.render_pdf("<p>x</p>"))
+    assert recorded == [None]
+
+    monkeypatch.setattr(renderer, "_render_remote", failing)
+    assert asyncio.run(renderer.render_pdf("<p>x</p>")) == b"%PDF-1.7 local"
+    assert recorded == [None, False]
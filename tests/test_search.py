@@ -0,0 +1,53 @@
+def test_snippet_is_escaped_and_marked(client, new_observation):
+    observation_id = new_observation(
+        Observation_Strengths='Great <script>alert("x")</script> questioning & zebrafinch follow-up',
+    )
+    r = client.get("/api/observations", params={"q": "zebrafinch"})
+    assert r.status_code == 200, r.text
+    [item] = r.json()
+    assert item["Observation_ID"] == observation_id
+    snippet = item["Snippet"]
+    assert "<script>" not in snippet
+    assert "&lt;script&gt;alert(&quot;x&quot;)&lt;/script&gt;" in snippet
+    assert "&amp;" in snippet
+    assert "<mark>zebrafinch</mark>" in snippet
+
+
+def test_plain_list_has_no_snippet(client, new_observation):
+    new_observation(Observation_Teacher=6, Observation_Comments="zebrafinch")
+    r = client.get("/api/observations", params={"teacher_id": 6})
+    assert all("Snippet" not in item for item in r.json())
+
+
+def test_search_filters_and_pages(client, new_observation):
+    ids = {new_observation(Observation_Teacher=5, Observation_Comments=f"kestrel note {i}") for i in range(5)}
+    new_observation(Observation_Teacher=4, Observation_Comments="kestrel elsewhere")
+
+    seen, cursor = [], None
+    while True:
+        params = {"q": "kestrel", "teacher_id": 5, "limit": 2, **({"cursor": cursor} if cursor else {})}
+        r = client.get("/api/observations", params=params)
+        assert r.status_code == 200, r.text
+        seen += [item["Observation_ID"] for item in r.json()]
+        cursor = r.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+    assert sorted(seen) == sorted(ids)
+
+
+def test_punctuation_is_not_fts_syntax(client):
+    r = client.get("/api/observations", params={"q": 'AND "unbalanced (NEAR* -'})
+    assert r.status_code == 200
+    assert r.json() == []
+
+
+def test_search_updates_with_edits(client, new_observation):
+    observation_id = new_observation(Observation_Comments="osprey")
+    r = client.put(f"/api/observations/{observation_id}", json={"Observation_Comments": "heron"})
+    assert r.status_code == 200, r.text
+    assert client.get("/api/observations", params={"q": "osprey"}).json() == []
+    assert [item["Observation_ID"] for item in client.get("/api/observations", params={"q": "heron"}).json()] == [observation_id]
+
+
+def test_stream_rejects_search(client):
+    assert client.get("/api/observations", params={"q": "heron", "stream": "true"}).status_code == 400
@@ -0,0 +1,79 @@
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect
+
+from app import startup
+from app.seeds import seed_core
+
+
+@pytest.fixture
+def engine(tmp_path):
+    target = create_engine(f"sqlite:///{tmp_path / 'startup.db'}")
+    yield target
+    target.dispose()
+
+
+def _migrate(target, revision: str) -> None:
+    with target.begin() as conn:
+        config = Config(str(startup.ALEMBIC_CONFIG))
+        config.attributes["connection"] = conn
+        command.upgrade(config, revision)
+
+
+def _revisions(target) -> list:
+    with target.connect() as conn:
+        return [v for (v,) in conn.exec_driver_sql("SELECT version_num FROM alembic_version")]
+
+
+def test_fresh_database_is_created_at_head(engine):
+    head = startup.migration_head()
+    assert head is not None
+    assert startup.prepare_schema(engine) == "created"
+    assert _revisions(engine) == [head]
+    assert startup.prepare_schema(engine) == "current"
+
+
+def test_stamped_database_is_upgraded(engine):
+    _migrate(engine, "0005_analytics_summaries")
+    assert "Flag_Date" not in {c["name"] for c in inspect(engine).get_columns("Flags")}
+
+    assert startup.prepare_schema(engine) == "upgraded"
+    assert _revisions(engine) == [startup.migration_head()]
+    assert "Flag_Date" in {c["name"] for c in inspect(engine).get_columns("Flags")}
+
+
+def _unstamped_baseline(target) -> None:
+    _migrate(target, "0001_baseline")
+    with target.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE alembic_version")
+
+
+def test_unstamped_baseline_is_stamped_and_upgraded(engine):
+    _unstamped_baseline(engine)
+
+    assert startup.prepare_schema(engine) == "upgraded"
+    assert _revisions(engine) == [startup.migration_head()]
+    assert "MailOutbox" in inspect(engine).get_table_names()
+    assert startup.prepare_schema(engine) == "current"
+
+
+def test_unknown_unstamped_database_is_refused(engine):
+    _unstamped_baseline(engine)
+    with engine.begin() as conn:
+        conn.exec_driver_sql('CREATE TABLE "Extra" (id INTEGER PRIMARY KEY)')
+
+    with pytest.raises(startup.SchemaError, match="do not match 0001_baseline"):
+        startup.prepare_schema(engine)
+    # EN: Nothing was changed / BR: Nada foi alterado
+    assert "alembic_version" not in inspect(engine).get_table_names()
+    assert "MailOutbox" not in inspect(engine).get_table_names()
+
+
+def test_seed_runs_once_per_version(engine):
+    startup.prepare_schema(engine)
+    assert seed_core.seed(engine) is True
+    assert seed_core.seed(engine) is False
+    with engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA user_version").scalar() == seed_core.SEED_VERSION
+        assert conn.exec_driver_sql('SELECT count(*) FROM "Users"').scalar() == len(seed_core.TEACHERS)